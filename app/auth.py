@@ -1,13 +1,17 @@
+from typing import TYPE_CHECKING, Optional
 from fastapi import HTTPException, Security
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from supabase import create_client, Client
 from config import get_settings
+from app.services.db import InstrumentedClient
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 settings = get_settings()
 security = HTTPBearer()
 
-# Initialize Supabase client
-supabase: Client = create_client(settings.supabase_url, settings.supabase_service_key)
+# Built on first use; importing the supabase SDK is a large share of cold start
+_supabase: Optional["Client"] = None
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
     """
@@ -17,7 +21,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
     
     try:
         # Verify token with Supabase
-        user_response = supabase.auth.get_user(token)
+        user_response = get_supabase_client().auth.get_user(token)
         
         if not user_response or not user_response.user:
             raise HTTPException(status_code=401, detail="Invalid authentication credentials")
@@ -27,11 +31,15 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Could not validate credentials: {str(e)}")
 
-def get_supabase_client() -> Client:
+def get_supabase_client() -> "Client":
     """
-    Get Supabase client for database operations
+    Get Supabase client for database operations (wrapped so every query is timed)
     """
-    return supabase
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+        _supabase = InstrumentedClient(create_client(settings.supabase_url, settings.supabase_service_key))
+    return _supabase
 
 from cryptography.fernet import Fernet
 
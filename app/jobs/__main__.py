@@ -0,0 +1,107 @@
+"""
+Run the background jobs on their own, without the API:
+
+    python -m app.jobs                            # every job
+    python -m app.jobs deadline_checker auto_poster
+
+Deploy this as a separate service and set RUN_JOBS_IN_WEB=false on the web
+service, so the API can run many uvicorn workers while exactly one job
+worker does the notifying and posting. The worker refuses to start with the
+memory read cache or event broker, since the web processes could never see
+its invalidations or events; use the supabase backends.
+"""
+import argparse
+import asyncio
+import signal
+import sys
+from typing import List
+from app.jobs.runner import JOBS, start_jobs, stop_jobs
+from app.services import read_cache
+from app.services.log import configure_logging, get_logger, shutdown_logging
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger("app.jobs")
+
+
+def unshared_backends() -> List[str]:
+    """
+    Settings that keep the worker's writes in its own memory. Cache
+    invalidations and events from a separate worker must go through a
+    backend the web processes also read, or they never see them.
+    """
+    problems = []
+    if read_cache.backend() == "memory":
+        problems.append("READ_CACHE_BACKEND (use supabase or off)")
+    if settings.event_broker_backend == "memory":
+        problems.append("EVENT_BROKER_BACKEND (use supabase)")
+    return problems
+
+
+async def run_worker(names: List[str]) -> bool:
+    """Run the jobs until SIGINT/SIGTERM; False if one of them crashed"""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    if settings.worker_metrics_port:
+        from prometheus_client import start_http_server
+        start_http_server(settings.worker_metrics_port)
+        logger.info("worker_metrics_listening", port=settings.worker_metrics_port)
+
+    tasks = start_jobs(names)
+    logger.info("worker_started", jobs=list(tasks))
+
+    # Job loops handle their own errors, so a finished task means it crashed
+    stopped = asyncio.create_task(stop.wait())
+    done, _ = await asyncio.wait([stopped, *tasks.values()], return_when=asyncio.FIRST_COMPLETED)
+    crashed = False
+    for task in done:
+        if task is stopped:
+            continue
+        crashed = True
+        error = None if task.cancelled() else task.exception()
+        logger.error("job_crashed", job=task.get_name(), error=str(error) if error else "exited")
+
+    stopped.cancel()
+    await stop_jobs(tasks)
+    logger.info("worker_stopped", crashed=crashed)
+    return not crashed
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.jobs", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("jobs", nargs="*", metavar="JOB",
+                        help=f"Jobs to run (default: all of {', '.join(JOBS)})")
+    args = parser.parse_args()
+    unknown = [name for name in args.jobs if name not in JOBS]
+    if unknown:
+        parser.error(f"unknown job(s): {', '.join(unknown)}")
+
+    configure_logging()
+    problems = unshared_backends()
+    if problems:
+        logger.error("worker_backend_not_shared", settings=problems,
+                     detail="the web service would never see this worker's cache invalidations or events")
+        shutdown_logging()
+        sys.exit(2)
+    if read_cache.backend() == "sqlite":
+        logger.warning("worker_read_cache_sqlite",
+                       detail="invalidations only reach web processes sharing this host's sqlite file")
+    if settings.job_sampler_interval_ms > 0 and settings.job_sampler_store == "file":
+        logger.warning("worker_sampler_local", profile_dir=settings.profile_dir,
+                       detail="dumps stay in this container; set JOB_SAMPLER_STORE=supabase to serve them from the web service")
+
+    try:
+        ok = asyncio.run(run_worker(args.jobs or list(JOBS)))
+    finally:
+        shutdown_logging()
+    if not ok:
+        # Non-zero so the platform's ON_FAILURE restart policy brings the worker back
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
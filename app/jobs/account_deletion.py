@@ -0,0 +1,204 @@
+import asyncio
+import time
+from datetime import timedelta
+from typing import Optional
+from app.auth import get_supabase_client
+from config import get_settings
+from app.services.metrics import JOB_CYCLE_SECONDS, JOB_ITEMS_PROCESSED
+from app.services.log import get_logger
+from app.services.db import record_queries
+from app.services.clock import utcnow
+from app.services.read_cache import GOALS, POSTS, SOCIAL_ACCOUNTS, invalidate
+from app.services.ownership import forget_goals
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+ACTIVE_STATUSES = ["pending", "running"]
+
+# Set by enqueue_account_deletion so a new job starts without waiting for the next poll
+_wake: Optional[asyncio.Event] = None
+
+
+def _wake_event() -> asyncio.Event:
+    global _wake
+    if _wake is None:
+        _wake = asyncio.Event()
+    return _wake
+
+
+def enqueue_account_deletion(user_id: str) -> dict:
+    """
+    Record a deletion job for the user (or return the one already in progress)
+    and wake the runner
+    """
+    supabase = get_supabase_client()
+
+    existing = supabase.table("account_deletion_jobs")\
+        .select("id, status, step, deleted_rows, created_at")\
+        .eq("user_id", user_id)\
+        .in_("status", ACTIVE_STATUSES)\
+        .limit(1)\
+        .execute()
+
+    if existing.data:
+        job = existing.data[0]
+    else:
+        job = supabase.table("account_deletion_jobs").insert({
+            "user_id": user_id,
+            "status": "pending",
+        }).execute().data[0]
+
+    _wake_event().set()
+    return job
+
+
+def _progress(job_id: str, **fields):
+    supabase = get_supabase_client()
+    fields["updated_at"] = utcnow().isoformat()
+    supabase.table("account_deletion_jobs")\
+        .update(fields)\
+        .eq("id", job_id)\
+        .execute()
+
+
+def _claim(job: dict) -> bool:
+    """Move a job to running; only one worker wins the conditional update"""
+    supabase = get_supabase_client()
+
+    query = supabase.table("account_deletion_jobs")\
+        .update({
+            "status": "running",
+            "attempts": (job.get("attempts") or 0) + 1,
+            "updated_at": utcnow().isoformat()
+        })\
+        .eq("id", job["id"])\
+        .eq("status", job["status"])
+
+    if job["status"] == "running":
+        # Stale job from a crashed worker; only take it if nobody touched it since we looked
+        query = query.eq("updated_at", job["updated_at"])
+
+    return bool(query.execute().data)
+
+
+async def delete_account_data(job: dict):
+    """
+    Delete everything owned by the job's user in bounded chunks. Every step is
+    idempotent, so a job interrupted at any point resumes by running again.
+    """
+    supabase = get_supabase_client()
+    user_id = job["user_id"]
+    chunk_size = settings.account_deletion_chunk_size
+    deleted = job.get("deleted_rows") or 0
+
+    # Goals go one chunk at a time: their posts and selections first, then the goals
+    while True:
+        goals_response = supabase.table("goals")\
+            .select("id")\
+            .eq("user_id", user_id)\
+            .limit(chunk_size)\
+            .execute()
+
+        goal_ids = [goal["id"] for goal in goals_response.data]
+        if not goal_ids:
+            break
+
+        for table in ("generated_posts", "goal_social_selections"):
+            response = supabase.table(table)\
+                .delete()\
+                .in_("goal_id", goal_ids)\
+                .execute()
+            deleted += len(response.data)
+
+        response = supabase.table("goals")\
+            .delete()\
+            .in_("id", goal_ids)\
+            .execute()
+        deleted += len(response.data)
+        forget_goals(goal_ids)
+
+        _progress(job["id"], step="goals", deleted_rows=deleted)
+        # Let requests and the other jobs run between chunks
+        await asyncio.sleep(0)
+
+    for table in ("social_accounts", "user_devices"):
+        response = supabase.table(table)\
+            .delete()\
+            .eq("user_id", user_id)\
+            .execute()
+        deleted += len(response.data)
+        _progress(job["id"], step=table, deleted_rows=deleted)
+
+    # Reads cached between the request and now would otherwise outlive the data
+    invalidate(user_id, GOALS, SOCIAL_ACCOUNTS, POSTS)
+
+    try:
+        supabase.auth.admin.delete_user(user_id)
+    except Exception as e:
+        # Already gone after an earlier attempt is fine
+        if "not found" not in str(e).lower():
+            raise
+
+    _progress(
+        job["id"],
+        step="auth_user",
+        status="completed",
+        deleted_rows=deleted,
+        finished_at=utcnow().isoformat()
+    )
+
+
+async def process_account_deletions():
+    """
+    Run pending jobs and take over running ones whose worker stopped updating them
+    """
+    supabase = get_supabase_client()
+    stale_before = utcnow() - timedelta(seconds=settings.account_deletion_stale_seconds)
+
+    jobs_response = supabase.table("account_deletion_jobs")\
+        .select("id, user_id, status, attempts, deleted_rows, updated_at")\
+        .or_(f'status.eq.pending,and(status.eq.running,updated_at.lt."{stale_before.isoformat()}")')\
+        .order("created_at")\
+        .limit(10)\
+        .execute()
+
+    for job in jobs_response.data:
+        if not _claim(job):
+            continue
+
+        logger.info("account_deletion_job_started", job_id=job["id"], user_id=job["user_id"])
+        try:
+            await delete_account_data(job)
+            JOB_ITEMS_PROCESSED.labels("account_deletion", "completed").inc()
+            logger.info("account_deletion_job_completed", job_id=job["id"], user_id=job["user_id"])
+        except Exception as e:
+            attempts = (job.get("attempts") or 0) + 1
+            final = attempts >= settings.account_deletion_max_attempts
+            _progress(job["id"], status="failed" if final else "pending", error=str(e)[:500])
+            JOB_ITEMS_PROCESSED.labels("account_deletion", "failed" if final else "retried").inc()
+            logger.error("account_deletion_job_failed", job_id=job["id"], attempts=attempts, error=str(e), exc_info=True)
+
+
+async def run_account_deletions():
+    """
+    Process deletion jobs when woken by a new request, or every poll interval
+    to pick up retries and jobs left behind by a crashed worker
+    """
+    logger.info("account_deletion_started", interval_seconds=settings.account_deletion_poll_seconds)
+    wake = _wake_event()
+    while True:
+        # Cleared before the cycle so a job enqueued mid-cycle triggers another one right away
+        wake.clear()
+        started = time.perf_counter()
+        try:
+            with record_queries("job:account_deletion"):
+                await process_account_deletions()
+        except Exception as e:
+            logger.error("account_deletion_cycle_failed", error=str(e), exc_info=True)
+        JOB_CYCLE_SECONDS.labels("account_deletion").observe(time.perf_counter() - started)
+
+        try:
+            await asyncio.wait_for(wake.wait(), timeout=settings.account_deletion_poll_seconds)
+        except asyncio.TimeoutError:
+            pass
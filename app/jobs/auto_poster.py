@@ -1,10 +1,23 @@
 import asyncio
+import time
 from datetime import datetime, timedelta
-import httpx
-from app.auth import get_supabase_client, decrypt_token
+from app.services.outbound import outbound_client
+from app.auth import get_supabase_client
+from app.oauth.tokens import get_access_tokens
 from app.oauth.token_refresh import refresh_twitter_token
+from config import get_settings
+from app.services.metrics import JOB_CYCLE_SECONDS, JOB_ITEMS_PROCESSED
+from app.services.log import get_logger, goal_id_var
+from app.services.db import record_queries
+from app.services.clock import utcnow
+from app.services.read_cache import GOALS, POSTS, invalidate
+from app.services.events import GOAL_COMPLETED, publish_event
+from app.services.circuit_breaker import get_breaker
 
-async def post_to_platform(post, account):
+settings = get_settings()
+logger = get_logger(__name__)
+
+async def post_to_platform(post, account, access_token):
     """
     Post content to a specific platform
     Returns (success: bool, error_message: str or None)
@@ -12,24 +25,25 @@ async def post_to_platform(post, account):
     platform = account['platform']
     content = post['edited_content'] or post['content']
     
+    if not access_token:
+        return False, f"No access token for {platform} account"
+    
     try:
         if platform == 'twitter':
-            access_token = decrypt_token(account['access_token_encrypted'])
-            
-            async with httpx.AsyncClient() as client:
+            async with outbound_client("twitter") as client:
                 response = await client.post(
-                    "https://api.twitter.com/2/tweets",
+                    f"{settings.twitter_api_base_url}/2/tweets",
                     json={"text": content},
                     headers={"Authorization": f"Bearer {access_token}"}
                 )
                 
                 # Handle token expiry
                 if response.status_code == 401:
-                    print(f"Twitter token expired, refreshing...")
+                    logger.info("twitter_token_refresh", reason="401")
                     access_token = await refresh_twitter_token(account['id'])
                     
                     response = await client.post(
-                        "https://api.twitter.com/2/tweets",
+                        f"{settings.twitter_api_base_url}/2/tweets",
                         json={"text": content},
                         headers={"Authorization": f"Bearer {access_token}"}
                     )
@@ -40,9 +54,7 @@ async def post_to_platform(post, account):
                     return False, f"Status {response.status_code}: {response.text}"
         
         elif platform == 'linkedin':
-            access_token = decrypt_token(account['access_token_encrypted'])
-            
-            async with httpx.AsyncClient() as client:
+            async with outbound_client("linkedin") as client:
                 linkedin_payload = {
                     "author": f"urn:li:person:{account['platform_user_id']}",
                     "lifecycleState": "PUBLISHED",
@@ -56,7 +68,7 @@ async def post_to_platform(post, account):
                 }
                 
                 response = await client.post(
-                    "https://api.linkedin.com/v2/ugcPosts",
+                    f"{settings.linkedin_api_base_url}/v2/ugcPosts",
                     json=linkedin_payload,
                     headers={
                         "Authorization": f"Bearer {access_token}",
@@ -83,10 +95,10 @@ async def auto_post_expired_goals():
     supabase = get_supabase_client()
     
     # Find goals past deadline that haven't been completed
-    now = datetime.utcnow()
+    now = utcnow()
     
     goals_response = supabase.table("goals")\
-        .select("*")\
+        .select("id, user_id, deadline")\
         .eq("completed", False)\
         .lte("deadline", now.isoformat())\
         .execute()
@@ -96,21 +108,23 @@ async def auto_post_expired_goals():
     if not goals:
         return
     
-    print(f"🤖 Found {len(goals)} expired goals to auto-post")
+    logger.info("auto_poster_expired_goals", count=len(goals))
     
     for goal in goals:
-        print(f"📝 Auto-posting goal: {goal['title']} (ID: {goal['id']})")
+        goal_id_var.set(goal["id"])
+        logger.info("auto_posting_goal")
         
         # Get all posts for this goal
         posts_response = supabase.table("generated_posts")\
-            .select("*, social_accounts(*)")\
+            .select("id, content, edited_content, posted_at, social_accounts(id, platform, platform_user_id)")\
             .eq("goal_id", goal["id"])\
             .execute()
         
         posts = posts_response.data
         
         if not posts:
-            print(f"⚠️  No posts found for goal {goal['id']}, marking as completed anyway")
+            logger.warning("goal_without_posts", action="mark_completed")
+            JOB_ITEMS_PROCESSED.labels("auto_poster", "goal_without_posts").inc()
             supabase.table("goals")\
                 .update({
                     "completed": True,
@@ -118,8 +132,28 @@ async def auto_post_expired_goals():
                 })\
                 .eq("id", goal["id"])\
                 .execute()
+            invalidate(goal["user_id"], GOALS)
+            publish_event(goal["user_id"], GOAL_COMPLETED, goal_id=goal["id"], completed_at=now.isoformat(), auto_posted=True)
             continue
         
+        # Hold the goal for a later cycle while a platform it posts to is failing,
+        # rather than spending its posts on fail-fast errors; past the limit it
+        # completes as usual
+        unavailable = sorted({
+            post['social_accounts']['platform'] for post in posts
+            if not post.get('posted_at') and not get_breaker(post['social_accounts']['platform']).available()
+        })
+        deadline = datetime.fromisoformat(goal["deadline"].replace("Z", "+00:00")).replace(tzinfo=None)
+        if unavailable and now - deadline < timedelta(minutes=settings.circuit_max_defer_minutes):
+            logger.warning("auto_post_deferred", platforms=unavailable)
+            JOB_ITEMS_PROCESSED.labels("auto_poster", "deferred").inc()
+            continue
+        
+        # Tokens are only read now, for the accounts we're about to publish to
+        access_tokens = get_access_tokens([
+            post['social_accounts']['id'] for post in posts if not post.get('posted_at')
+        ])
+        
         # Track results
         all_success = True
         results = []
@@ -127,26 +161,28 @@ async def auto_post_expired_goals():
         for post in posts:
             # Skip if already posted
             if post.get('posted_at'):
-                print(f"  ℹ️  Post {post['id']} already posted, skipping")
+                logger.debug("post_already_published", post_id=post['id'])
                 continue
             
             account = post['social_accounts']
             platform = account['platform']
             
-            success, error = await post_to_platform(post, account)
+            success, error = await post_to_platform(post, account, access_tokens.get(account['id']))
             
             if success:
-                print(f"  ✅ Posted to {platform}")
+                logger.info("post_published", platform=platform)
                 # Mark post as posted
                 supabase.table("generated_posts")\
                     .update({"posted_at": now.isoformat()})\
                     .eq("id", post['id'])\
                     .execute()
                 results.append({"platform": platform, "success": True})
+                JOB_ITEMS_PROCESSED.labels("auto_poster", "post_published").inc()
             else:
-                print(f"  ❌ Failed to post to {platform}: {error}")
+                logger.warning("post_failed", platform=platform, error=error)
                 all_success = False
                 results.append({"platform": platform, "success": False, "error": error})
+                JOB_ITEMS_PROCESSED.labels("auto_poster", "post_failed").inc()
         
         # Mark goal as completed regardless of posting success
         # (This is the "lockin" - deadline means completion, no exceptions)
@@ -157,22 +193,26 @@ async def auto_post_expired_goals():
             })\
             .eq("id", goal["id"])\
             .execute()
+        invalidate(goal["user_id"], GOALS, POSTS)
+        publish_event(goal["user_id"], GOAL_COMPLETED, goal_id=goal["id"], completed_at=now.isoformat(), auto_posted=True)
         
-        status = "✅ fully posted" if all_success else "⚠️  partially posted"
-        print(f"  Goal {goal['id']} marked as completed ({status})")
+        JOB_ITEMS_PROCESSED.labels("auto_poster", "goal_completed").inc()
+        logger.info("goal_completed", fully_posted=all_success)
+    goal_id_var.set(None)
 
 async def run_auto_poster():
     """
     Run auto-poster every minute
     """
-    print("🚀 Auto-poster started, checking every minute...")
+    logger.info("auto_poster_started", interval_seconds=60)
     while True:
+        started = time.perf_counter()
         try:
-            await auto_post_expired_goals()
+            with record_queries("job:auto_poster"):
+                await auto_post_expired_goals()
         except Exception as e:
-            print(f"❌ Error in auto-poster: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error("auto_poster_cycle_failed", error=str(e), exc_info=True)
+        JOB_CYCLE_SECONDS.labels("auto_poster").observe(time.perf_counter() - started)
         
         # Wait 1 minute
         await asyncio.sleep(60)
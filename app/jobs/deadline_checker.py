@@ -1,7 +1,18 @@
 import asyncio
-from datetime import datetime, timedelta
+import time
+from datetime import timedelta
 from app.auth import get_supabase_client
-from app.services.notification_service import send_goal_notification
+from app.services.notification_service import send_deadline_summary_notification, send_goal_notification
+from app.services.metrics import JOB_CYCLE_SECONDS, JOB_ITEMS_PROCESSED
+from app.services.log import get_logger
+from app.services.db import record_queries
+from app.services.clock import utcnow
+from app.services.read_cache import GOALS, invalidate
+from app.services.circuit_breaker import get_breaker
+from config import get_settings
+
+settings = get_settings()
+logger = get_logger(__name__)
 
 async def check_deadlines():
     """
@@ -10,14 +21,14 @@ async def check_deadlines():
     supabase = get_supabase_client()
     
     # Calculate time window (2 hours from now, +/- 1 minute)
-    now = datetime.utcnow()
+    now = utcnow()
     target_time = now + timedelta(hours=2)
     window_start = target_time - timedelta(minutes=1)
     window_end = target_time + timedelta(minutes=1)
     
     # Find goals in the window that haven't been notified
     goals_response = supabase.table("goals")\
-        .select("*")\
+        .select("id, user_id, title, deadline")\
         .eq("completed", False)\
         .eq("notification_sent", False)\
         .gte("deadline", window_start.isoformat())\
@@ -26,59 +37,97 @@ async def check_deadlines():
     
     goals = goals_response.data
     
-    print(f"Found {len(goals)} goals hitting deadline in 2 hours")
+    logger.info("deadline_checker_due_goals", count=len(goals))
+    
+    if not goals:
+        return
+    
+    # APNs is failing; skip the sends (the goals stay un-notified and the next
+    # cycle retries while they are still inside the window)
+    if not get_breaker("apns").available():
+        logger.warning("notification_deferred", count=len(goals), reason="circuit_open")
+        JOB_ITEMS_PROCESSED.labels("deadline_checker", "deferred").inc(len(goals))
+        return
     
+    goals_by_user = {}
     for goal in goals:
-        # Get user's APNs token
-        device_response = supabase.table("user_devices")\
-            .select("apns_token")\
-            .eq("user_id", goal["user_id"])\
-            .single()\
-            .execute()
-        
-        if not device_response.data or not device_response.data.get("apns_token"):
-            print(f"No APNs token for user {goal['user_id']}, skipping")
-            continue
-        
-        apns_token = device_response.data["apns_token"]
-        
-        # Get first generated post for preview
+        goals_by_user.setdefault(goal["user_id"], []).append(goal)
+    
+    # APNs tokens for every user with a due goal
+    devices_response = supabase.table("user_devices")\
+        .select("user_id, apns_token")\
+        .in_("user_id", list(goals_by_user))\
+        .execute()
+    
+    apns_tokens = {d["user_id"]: d["apns_token"] for d in devices_response.data if d.get("apns_token")}
+    
+    min_goals = settings.push_coalesce_min_goals
+    singles = [
+        goal for user_id, user_goals in goals_by_user.items()
+        if user_id in apns_tokens and not (min_goals and len(user_goals) >= min_goals)
+        for goal in user_goals
+    ]
+    
+    # First generated post per goal, for the single-goal preview
+    previews = {}
+    if singles:
         posts_response = supabase.table("generated_posts")\
-            .select("content, edited_content")\
-            .eq("goal_id", goal["id"])\
-            .limit(1)\
+            .select("goal_id, content, edited_content")\
+            .in_("goal_id", [goal["id"] for goal in singles])\
             .execute()
+        for post in posts_response.data:
+            previews.setdefault(post["goal_id"], (post["edited_content"] or post["content"])[:100])
+    
+    for user_id, user_goals in goals_by_user.items():
+        apns_token = apns_tokens.get(user_id)
+        if not apns_token:
+            logger.info("no_apns_token", user_id=user_id, goals=len(user_goals))
+            JOB_ITEMS_PROCESSED.labels("deadline_checker", "no_device").inc(len(user_goals))
+            continue
         
-        preview = ""
-        if posts_response.data:
-            post = posts_response.data[0]
-            preview = (post["edited_content"] or post["content"])[:100]
-        
-        # Send notification
-        success = await send_goal_notification(
-            apns_token,
-            goal["title"],
-            goal["id"],
-            preview
-        )
+        if min_goals and len(user_goals) >= min_goals:
+            # Several goals due in this window: one summary push instead of one each
+            user_goals.sort(key=lambda goal: goal["deadline"])
+            collapse_id = f"deadlines-{target_time:%Y%m%d%H%M}"
+            sent = await send_deadline_summary_notification(
+                apns_token, user_goals, collapse_id, max_titles=settings.push_coalesce_max_titles
+            )
+            _record_sent(supabase, user_id, [goal["id"] for goal in user_goals] if sent else [])
+            if sent:
+                JOB_ITEMS_PROCESSED.labels("deadline_checker", "coalesced").inc(len(user_goals) - 1)
+            continue
         
-        if success:
-            # Mark as notified
-            supabase.table("goals")\
-                .update({"notification_sent": True})\
-                .eq("id", goal["id"])\
-                .execute()
+        for goal in user_goals:
+            sent = await send_goal_notification(apns_token, goal["title"], goal["id"], previews.get(goal["id"], ""))
+            _record_sent(supabase, user_id, [goal["id"]] if sent else [])
+
+def _record_sent(supabase, user_id: str, goal_ids: list):
+    """Mark goals notified after a successful push (empty list = the push failed)"""
+    if not goal_ids:
+        JOB_ITEMS_PROCESSED.labels("deadline_checker", "failed").inc()
+        return
+    
+    supabase.table("goals")\
+        .update({"notification_sent": True})\
+        .in_("id", goal_ids)\
+        .execute()
+    invalidate(user_id, GOALS)
+    JOB_ITEMS_PROCESSED.labels("deadline_checker", "notified").inc(len(goal_ids))
+    JOB_ITEMS_PROCESSED.labels("deadline_checker", "push_sent").inc()
 
 async def run_scheduler():
     """
     Run deadline checker every minute
     """
-    print("Scheduler running, checking deadlines every minute...")
+    logger.info("deadline_checker_started", interval_seconds=60)
     while True:
+        started = time.perf_counter()
         try:
-            await check_deadlines()
+            with record_queries("job:deadline_checker"):
+                await check_deadlines()
         except Exception as e:
-            print(f"Error in deadline checker: {e}")
+            logger.error("deadline_checker_cycle_failed", error=str(e), exc_info=True)
+        JOB_CYCLE_SECONDS.labels("deadline_checker").observe(time.perf_counter() - started)
         
         # Wait 1 minute
         await asyncio.sleep(60)
\ No newline at end of file
@@ -0,0 +1,217 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Set, Tuple
+from starlette.concurrency import run_in_threadpool
+from app.auth import get_supabase_client
+from config import get_settings
+from app.services.clock import utcnow
+from app.services.db import record_queries
+from app.services.events import POSTS_GENERATED, publish_event
+from app.services.log import get_logger, goal_id_var
+from app.services.metrics import GENERATION_QUEUE_DEPTH, GENERATION_WAIT_SECONDS, JOB_CYCLE_SECONDS, JOB_ITEMS_PROCESSED
+from app.services.post_generation import generate_posts_for_goal
+from app.services.circuit_breaker import CircuitOpenError, get_breaker
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Set while run_post_generation is running in this process
+_queue: Optional[asyncio.Queue] = None
+_queued: Set[str] = set()
+
+
+def enqueue_generation(goal_id: str, user_id: str):
+    """
+    Persist a pending generation job and hand it to this process's workers if
+    there is room. Otherwise it waits in the table until a worker (here or in
+    `python -m app.jobs`) has capacity.
+    """
+    enqueue_generations([goal_id], user_id)
+
+
+def enqueue_generations(goal_ids: List[str], user_id: str):
+    """enqueue_generation for several goals with one insert"""
+    if not goal_ids:
+        return
+
+    supabase = get_supabase_client()
+
+    jobs = supabase.table("generation_jobs").insert([
+        {"goal_id": goal_id, "user_id": user_id, "status": "pending"}
+        for goal_id in goal_ids
+    ]).execute().data
+
+    for job in jobs:
+        _offer(job)
+
+
+def _offer(job: dict) -> bool:
+    if _queue is None or _queue.full() or job["id"] in _queued:
+        return False
+    _queued.add(job["id"])
+    _queue.put_nowait(job)
+    GENERATION_QUEUE_DEPTH.set(_queue.qsize())
+    return True
+
+
+def _update(job_id: str, **fields):
+    supabase = get_supabase_client()
+    fields["updated_at"] = utcnow().isoformat()
+    supabase.table("generation_jobs")\
+        .update(fields)\
+        .eq("id", job_id)\
+        .execute()
+
+
+def _runnable() -> Tuple[str, str]:
+    """or_() filters for jobs a worker may take: pending (or stale running) and not backing off"""
+    now = utcnow()
+    stale_before = now - timedelta(seconds=settings.generation_stale_seconds)
+    return (
+        f'status.eq.pending,and(status.eq.running,updated_at.lt."{stale_before.isoformat()}")',
+        f'next_attempt_at.is.null,next_attempt_at.lte."{now.isoformat()}"',
+    )
+
+
+def _retry_at(attempts: int) -> str:
+    """Exponential backoff: the first retry waits the base delay, each later one twice as long"""
+    delay = settings.generation_retry_base_seconds * 2 ** (attempts - 1)
+    return (utcnow() + timedelta(seconds=delay)).isoformat()
+
+
+def _claim(job_id: str) -> Optional[dict]:
+    """Move a runnable job to running; None if another worker got it or it is backing off"""
+    supabase = get_supabase_client()
+    status, due = _runnable()
+
+    claimed = supabase.table("generation_jobs")\
+        .update({"status": "running", "updated_at": utcnow().isoformat()})\
+        .eq("id", job_id)\
+        .or_(status)\
+        .or_(due)\
+        .execute()
+
+    return claimed.data[0] if claimed.data else None
+
+
+async def _run_job(job: dict):
+    if not get_breaker("openai").available():
+        # Leave it pending; the refill re-queues it once OpenAI recovers
+        JOB_ITEMS_PROCESSED.labels("post_generation", "deferred").inc()
+        return
+
+    claimed = _claim(job["id"])
+    if claimed is None:
+        return
+
+    goal_id_var.set(claimed["goal_id"])
+    GENERATION_WAIT_SECONDS.observe((utcnow() - _naive(claimed["created_at"])).total_seconds())
+    attempts = (claimed.get("attempts") or 0) + 1
+
+    try:
+        with record_queries("job:post_generation"):
+            # LLM and database calls block, so they run in the threadpool; the
+            # worker count bounds how many are in flight
+            result = await run_in_threadpool(generate_posts_for_goal, claimed["goal_id"], claimed["user_id"])
+    except asyncio.CancelledError:
+        # Shutting down: hand the job back so the next worker starts it immediately
+        _update(claimed["id"], status="pending")
+        raise
+    except CircuitOpenError as e:
+        # OpenAI was never called, so this isn't an attempt; retry once the breaker may admit calls
+        retry_at = (utcnow() + timedelta(seconds=e.retry_after)).isoformat()
+        _update(claimed["id"], status="pending", next_attempt_at=retry_at)
+        JOB_ITEMS_PROCESSED.labels("post_generation", "deferred").inc()
+        logger.info("post_generation_deferred", retry_after=round(e.retry_after, 1))
+        return
+    except Exception as e:
+        final = attempts >= settings.generation_max_attempts
+        _update(
+            claimed["id"],
+            status="failed" if final else "pending",
+            attempts=attempts,
+            error=str(e)[:500],
+            next_attempt_at=None if final else _retry_at(attempts),
+        )
+        JOB_ITEMS_PROCESSED.labels("post_generation", "failed" if final else "retried").inc()
+        logger.error("post_generation_failed", attempts=attempts, error=str(e), exc_info=True)
+        return
+    finally:
+        goal_id_var.set(None)
+
+    generated = result[1] if result else 0
+    _update(claimed["id"], status="completed", attempts=attempts, finished_at=utcnow().isoformat())
+    JOB_ITEMS_PROCESSED.labels("post_generation", "completed").inc()
+    logger.info("posts_generated", goal_id=claimed["goal_id"], count=generated)
+    publish_event(claimed["user_id"], POSTS_GENERATED, goal_id=claimed["goal_id"], count=generated)
+
+
+def _naive(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+async def _worker():
+    while True:
+        job = await _queue.get()
+        GENERATION_QUEUE_DEPTH.set(_queue.qsize())
+        try:
+            await _run_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("post_generation_worker_error", job_id=job["id"], error=str(e), exc_info=True)
+        finally:
+            _queued.discard(job["id"])
+            _queue.task_done()
+
+
+def _refill():
+    """Queue persisted jobs: new ones that didn't fit, retries that are due, and ones a dead process left running"""
+    free = _queue.maxsize - _queue.qsize()
+    if free <= 0 or not get_breaker("openai").available():
+        return
+
+    supabase = get_supabase_client()
+    status, due = _runnable()
+
+    jobs_response = supabase.table("generation_jobs")\
+        .select("id, goal_id, user_id, created_at")\
+        .or_(status)\
+        .or_(due)\
+        .order("created_at")\
+        .limit(free + len(_queued))\
+        .execute()
+
+    for job in jobs_response.data:
+        _offer(job)
+
+
+async def run_post_generation():
+    """
+    Fixed pool of generation workers fed by a bounded queue. Requests enqueue
+    directly; every poll interval the queue is topped up from generation_jobs.
+    """
+    global _queue
+    _queue = asyncio.Queue(maxsize=settings.generation_queue_size)
+    workers = [asyncio.create_task(_worker()) for _ in range(settings.generation_workers)]
+    logger.info("post_generation_started", workers=settings.generation_workers, queue_size=settings.generation_queue_size)
+
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                with record_queries("job:post_generation_refill"):
+                    _refill()
+            except Exception as e:
+                logger.error("post_generation_refill_failed", error=str(e), exc_info=True)
+            GENERATION_QUEUE_DEPTH.set(_queue.qsize())
+            JOB_CYCLE_SECONDS.labels("post_generation").observe(time.perf_counter() - started)
+
+            await asyncio.sleep(settings.generation_poll_seconds)
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        _queue = None
+        _queued.clear()
@@ -0,0 +1,50 @@
+import asyncio
+from typing import Dict, Iterable, Optional
+from app.jobs.deadline_checker import run_scheduler
+from app.jobs.auto_poster import run_auto_poster
+from app.jobs.account_deletion import run_account_deletions
+from app.jobs.post_generation import run_post_generation
+from app.services.log import get_logger
+from app.services.profiling import start_job_sampler, stop_job_sampler
+
+logger = get_logger(__name__)
+
+# Every background job; run in the web process or by `python -m app.jobs`
+JOBS = {
+    "deadline_checker": run_scheduler,
+    "auto_poster": run_auto_poster,
+    "account_deletion": run_account_deletions,
+    "post_generation": run_post_generation,
+}
+
+
+async def _run(name: str, delay: float):
+    if delay:
+        await asyncio.sleep(delay)
+    await JOBS[name]()
+
+
+def start_jobs(names: Optional[Iterable[str]] = None, delay: float = 0) -> Dict[str, asyncio.Task]:
+    """
+    Start the named jobs (all by default) as tasks on the running loop, and the
+    stack sampler if `job_sampler_interval_ms` is set.
+    `delay` holds back their first cycle, which builds the Supabase client
+    and runs blocking queries on the event loop.
+    """
+    start_job_sampler()
+    tasks = {}
+    for name in names or JOBS:
+        if name not in JOBS:
+            raise ValueError(f"Unknown job: {name}")
+        tasks[name] = asyncio.create_task(_run(name, delay), name=f"job:{name}")
+        logger.info("job_started", job=name)
+    return tasks
+
+
+async def stop_jobs(tasks: Dict[str, asyncio.Task]):
+    """Cancel the jobs and wait for them to unwind"""
+    for name, task in tasks.items():
+        task.cancel()
+        logger.info("job_stopped", job=name)
+    await asyncio.gather(*tasks.values(), return_exceptions=True)
+    stop_job_sampler()
@@ -0,0 +1,289 @@
+import cProfile
+import gzip
+import threading
+import time
+from app.services.db import QueryRecorder, _recorder_var, report_queries
+from app.services.log import goal_id_var, new_request_id, request_id_var
+from app.services.metrics import HTTP_REQUEST_SECONDS
+from app.services.profiling import new_profile_id, profiling_enabled, save_request_profile, verify_profile_token
+
+
+def route_template(scope) -> str:
+    """
+    Rebuild the route template (/goals/goals/{goal_id}/posts) from the matched
+    path params; works the same for routes inside included routers
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    params = {str(v): k for k, v in scope.get("path_params", {}).items()}
+    segments = scope["path"].split("/")
+    return "/".join(f"{{{params[seg]}}}" if seg in params else seg for seg in segments)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request latency per route template
+    (e.g. /goals/goals/{goal_id}/posts) so label cardinality stays bounded
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500, "recorded": False}
+
+        def record():
+            status["recorded"] = True
+            HTTP_REQUEST_SECONDS.labels(
+                scope["method"], route_template(scope), str(status["code"])
+            ).observe(time.perf_counter() - started)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                # Event streams stay open for minutes; time them to the headers instead
+                headers = message.get("headers", [])
+                if any(k == b"content-type" and v.startswith(b"text/event-stream") for k, v in headers):
+                    record()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not status["recorded"]:
+                record()
+
+
+class QueryRecorderMiddleware:
+    """
+    Record the Supabase queries issued while handling each request and flag
+    query shapes repeated within it (likely N+1)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        recorder = QueryRecorder(scope["path"])
+        state = {"start": None, "reported": False}
+
+        def report(raise_repeated: bool):
+            state["reported"] = True
+            recorder.scope = f"{scope['method']} {route_template(scope)}"
+            report_queries(recorder, raise_repeated=raise_repeated)
+
+        async def send_wrapper(message):
+            # Hold the headers back until the body is complete, so that with
+            # n_plus_one_raise the error replaces the response instead of
+            # surfacing after it was sent
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+            if message["type"] == "http.response.body" and state["start"] is not None:
+                if not message.get("more_body", False):
+                    report(raise_repeated=True)
+                await send(state["start"])
+                state["start"] = None
+            await send(message)
+
+        token = _recorder_var.set(recorder)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _recorder_var.reset(token)
+            if not state["reported"]:
+                # Streamed responses are already on their way; only log
+                report(raise_repeated=False)
+
+
+class RequestContextMiddleware:
+    """
+    Assign each request a correlation ID (from X-Request-ID or generated),
+    expose it to the logger and echo it back in the response headers
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or new_request_id()
+
+        request_token = request_id_var.set(request_id)
+        goal_token = goal_id_var.set(None)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(request_token)
+            goal_id_var.reset(goal_token)
+
+
+class ProfilingMiddleware:
+    """
+    Run a request carrying a valid X-Profile token under cProfile and save the
+    result to profile_dir; the response names it in X-Profile-Id. cProfile
+    follows the event-loop thread, so it also sees whatever else the loop runs
+    meanwhile (and not threadpool work); one profiled request at a time.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._active = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        # /debug takes the same token to list and download profiles; those aren't profiled
+        if scope["type"] != "http" or not profiling_enabled() or scope["path"].startswith("/debug/"):
+            await self.app(scope, receive, send)
+            return
+
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                token = value.decode("latin-1")
+                break
+        if token is None or not verify_profile_token(token) or not self._active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = new_profile_id()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode("latin-1"))]
+            await send(message)
+
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.disable()
+            self._active.release()
+            save_request_profile(profile_id, profiler, scope["method"], scope["path"], time.perf_counter() - started)
+
+
+try:
+    import brotli
+except ImportError:  # optional; gzip only without it
+    brotli = None
+
+
+def _accepted_encodings(header: str) -> dict:
+    """'gzip;q=0.8, br' -> {"gzip": 0.8, "br": 1.0}"""
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+    return accepted
+
+
+def choose_encoding(header: str) -> str:
+    """Preferred content coding we support for an Accept-Encoding header, or "identity" """
+    accepted = _accepted_encodings(header)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_quality = "identity", 0.0
+    for encoding in candidates:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionMiddleware:
+    """
+    Compress complete responses with brotli or gzip, negotiated from
+    Accept-Encoding, once they reach minimum_size bytes. Streaming responses
+    (more_body) and already-encoded ones pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    def _compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept) if accept else "identity"
+        if encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal start, started
+            if message["type"] == "http.response.start":
+                # Hold the start until the first body chunk decides whether we compress
+                start = message
+                return
+            if message["type"] != "http.response.body" or started:
+                await send(message)
+                return
+            started = True
+
+            headers = list(start.get("headers", []))
+            body = message.get("body", b"")
+            already_encoded = any(k.lower() == b"content-encoding" for k, _ in headers)
+            if message.get("more_body") or already_encoded or len(body) < self.minimum_size:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = self._compress(encoding, body)
+            headers = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+            headers += [
+                (b"content-encoding", encoding.encode()),
+                (b"content-length", str(len(compressed)).encode()),
+                (b"vary", b"Accept-Encoding"),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
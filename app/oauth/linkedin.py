@@ -1,18 +1,20 @@
-import httpx
+from app.services.outbound import outbound_client
 import secrets
 from datetime import datetime, timedelta
 from config import get_settings
 from app.auth import get_supabase_client, encrypt_token
+from app.services.state_store import get_state_store
+from app.services.read_cache import GOALS, SOCIAL_ACCOUNTS, invalidate
 
 settings = get_settings()
-_state_storage = {}
+_state_store = get_state_store("linkedin_oauth")
 
 def get_authorization_url(user_id: str) -> str:
     """
     Generate LinkedIn OAuth authorization URL
     """
     state = secrets.token_urlsafe(32)
-    _state_storage[state] = user_id
+    _state_store.set(state, user_id)
     
     base_url = "https://www.linkedin.com/oauth/v2/authorization"
     params = {
@@ -30,16 +32,14 @@ async def handle_callback(code: str, state: str, user_id: str):
     """
     Exchange authorization code for access token
     """
-    # Verify state
-    if state not in _state_storage or _state_storage[state] != user_id:
+    # Verify state (pop so each state can only be used once)
+    if _state_store.pop(state) != user_id:
         raise Exception("Invalid state")
     
-    del _state_storage[state]
-    
     supabase = get_supabase_client()
     
     # Exchange code for token
-    async with httpx.AsyncClient() as client:
+    async with outbound_client("linkedin") as client:
         token_response = await client.post(
             "https://www.linkedin.com/oauth/v2/accessToken",
             data={
@@ -58,9 +58,9 @@ async def handle_callback(code: str, state: str, user_id: str):
         token_data = token_response.json()
     
     # Get user info
-    async with httpx.AsyncClient() as client:
+    async with outbound_client("linkedin") as client:
         user_response = await client.get(
-            "https://api.linkedin.com/v2/userinfo",
+            f"{settings.linkedin_api_base_url}/v2/userinfo",
             headers={"Authorization": f"Bearer {token_data['access_token']}"}
         )
         
@@ -87,8 +87,16 @@ async def handle_callback(code: str, state: str, user_id: str):
         "token_expires_at": token_expires_at.isoformat(),
     }
     
+    supabase.table("social_accounts")\
+        .upsert(social_account_data, on_conflict="user_id,platform", returning="minimal")\
+        .execute()
+    invalidate(user_id, SOCIAL_ACCOUNTS, GOALS)
+    
+    # Read the row back without the encrypted token columns; this is returned to the client
     response = supabase.table("social_accounts")\
-        .upsert(social_account_data, on_conflict="user_id,platform")\
+        .select("id, user_id, platform, platform_user_id, username, connected_at")\
+        .eq("user_id", user_id)\
+        .eq("platform", "linkedin")\
         .execute()
     
     return response.data[0] if response.data else None
\ No newline at end of file
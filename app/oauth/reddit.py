@@ -3,16 +3,17 @@ import secrets
 from datetime import datetime, timedelta
 from config import get_settings
 from app.auth import get_supabase_client, encrypt_token
+from app.services.state_store import get_state_store
 
 settings = get_settings()
-_state_storage = {}
+_state_store = get_state_store("reddit_oauth")
 
 def get_authorization_url(user_id: str) -> str:
     """
     Generate Reddit OAuth authorization URL
     """
     state = secrets.token_urlsafe(32)
-    _state_storage[state] = user_id
+    _state_store.set(state, user_id)
     
     base_url = "https://www.reddit.com/api/v1/authorize"
     params = {
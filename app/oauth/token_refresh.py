@@ -1,6 +1,7 @@
-import httpx
+from app.services.outbound import outbound_client
 from datetime import datetime
-from app.auth import get_supabase_client, decrypt_token, encrypt_token
+from app.auth import get_supabase_client, encrypt_token
+from app.oauth.tokens import get_refresh_token
 from config import get_settings
 
 settings = get_settings()
@@ -11,20 +12,12 @@ async def refresh_twitter_token(social_account_id: str):
     """
     supabase = get_supabase_client()
     
-    # Get account
-    account_response = supabase.table("social_accounts")\
-        .select("*")\
-        .eq("id", social_account_id)\
-        .single()\
-        .execute()
-    
-    account = account_response.data
-    refresh_token = decrypt_token(account['refresh_token_encrypted'])
+    refresh_token = get_refresh_token(social_account_id)
     
     # Refresh token
-    async with httpx.AsyncClient() as client:
+    async with outbound_client("twitter") as client:
         response = await client.post(
-            "https://api.twitter.com/2/oauth2/token",
+            f"{settings.twitter_api_base_url}/2/oauth2/token",
             data={
                 "refresh_token": refresh_token,
                 "grant_type": "refresh_token",
@@ -0,0 +1,41 @@
+from typing import Dict, List
+from app.auth import get_supabase_client, decrypt_token
+
+# The only place encrypted tokens are read. Everything else selects explicit,
+# token-free columns and calls these right before talking to the platform.
+
+
+def get_access_tokens(social_account_ids: List[str]) -> Dict[str, str]:
+    """
+    Decrypted access tokens keyed by social account id (one query for all)
+    """
+    if not social_account_ids:
+        return {}
+    
+    supabase = get_supabase_client()
+    
+    response = supabase.table("social_accounts")\
+        .select("id, access_token_encrypted")\
+        .in_("id", list(dict.fromkeys(social_account_ids)))\
+        .execute()
+    
+    return {
+        row["id"]: decrypt_token(row["access_token_encrypted"])
+        for row in response.data
+        if row.get("access_token_encrypted")
+    }
+
+
+def get_refresh_token(social_account_id: str) -> str:
+    """
+    Decrypted refresh token for one social account
+    """
+    supabase = get_supabase_client()
+    
+    response = supabase.table("social_accounts")\
+        .select("refresh_token_encrypted")\
+        .eq("id", social_account_id)\
+        .single()\
+        .execute()
+    
+    return decrypt_token(response.data["refresh_token_encrypted"])
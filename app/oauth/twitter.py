@@ -1,4 +1,4 @@
-import httpx
+from app.services.outbound import outbound_client
 import secrets
 import hashlib
 import base64
@@ -6,12 +6,13 @@ from datetime import datetime, timedelta
 from typing import Dict
 from config import get_settings
 from app.auth import get_supabase_client, encrypt_token
+from app.services.state_store import get_state_store
+from app.services.read_cache import GOALS, SOCIAL_ACCOUNTS, invalidate
 
 settings = get_settings()
 
-# In-memory storage for PKCE challenges (use Redis in production)
-_pkce_storage: Dict[str, Dict[str, str]] = {}
-_state_storage: Dict[str, str] = {}
+# OAuth state -> {user_id, verifier}; expires if the flow is abandoned
+_state_store = get_state_store("twitter_oauth")
 
 def generate_code_verifier() -> str:
     """Generate a random code verifier for PKCE"""
@@ -28,17 +29,16 @@ def get_authorization_url(user_id: str) -> str:
     """
     # Generate state for CSRF protection
     state = secrets.token_urlsafe(32)
-    _state_storage[state] = user_id
     
     # Generate PKCE parameters
     code_verifier = generate_code_verifier()
     code_challenge = generate_code_challenge(code_verifier)
     
     # Store verifier for later use in callback
-    _pkce_storage[state] = {
+    _state_store.set(state, {
         'verifier': code_verifier,
         'user_id': user_id
-    }
+    })
     
     # Build authorization URL
     base_url = "https://twitter.com/i/oauth2/authorize"
@@ -59,27 +59,19 @@ async def handle_callback(code: str, state: str, user_id: str):
     """
     Exchange authorization code for access token and store in database
     """
-    # Verify state
-    if state not in _state_storage or _state_storage[state] != user_id:
+    # Verify state (pop so each state can only be used once)
+    pkce_data = _state_store.pop(state)
+    if not pkce_data or pkce_data['user_id'] != user_id:
         raise Exception("Invalid state - possible CSRF attack")
     
-    # Get PKCE verifier
-    if state not in _pkce_storage:
-        raise Exception("PKCE verifier not found")
-    
-    pkce_data = _pkce_storage[state]
     code_verifier = pkce_data['verifier']
     
-    # Clean up used state and verifier
-    del _state_storage[state]
-    del _pkce_storage[state]
-    
     supabase = get_supabase_client()
     
     # Exchange code for access token
-    async with httpx.AsyncClient() as client:
+    async with outbound_client("twitter") as client:
         token_response = await client.post(
-            "https://api.twitter.com/2/oauth2/token",
+            f"{settings.twitter_api_base_url}/2/oauth2/token",
             data={
                 "code": code,
                 "grant_type": "authorization_code",
@@ -99,9 +91,9 @@ async def handle_callback(code: str, state: str, user_id: str):
         token_data = token_response.json()
     
     # Get user info from Twitter
-    async with httpx.AsyncClient() as client:
+    async with outbound_client("twitter") as client:
         user_response = await client.get(
-            "https://api.twitter.com/2/users/me",
+            f"{settings.twitter_api_base_url}/2/users/me",
             headers={
                 "Authorization": f"Bearer {token_data['access_token']}"
             }
@@ -132,8 +124,16 @@ async def handle_callback(code: str, state: str, user_id: str):
     }
     
     # Upsert (insert or update if exists)
+    supabase.table("social_accounts")\
+        .upsert(social_account_data, on_conflict="user_id,platform", returning="minimal")\
+        .execute()
+    invalidate(user_id, SOCIAL_ACCOUNTS, GOALS)
+    
+    # Read the row back without the encrypted token columns; this is returned to the client
     response = supabase.table("social_accounts")\
-        .upsert(social_account_data, on_conflict="user_id,platform")\
+        .select("id, user_id, platform, platform_user_id, username, connected_at")\
+        .eq("user_id", user_id)\
+        .eq("platform", "twitter")\
         .execute()
     
     return response.data[0] if response.data else None
@@ -146,9 +146,9 @@ async def refresh_access_token(refresh_token_encrypted: str) -> Dict[str, any]:
     
     refresh_token = decrypt_token(refresh_token_encrypted)
     
-    async with httpx.AsyncClient() as client:
+    async with outbound_client("twitter") as client:
         response = await client.post(
-            "https://api.twitter.com/2/oauth2/token",
+            f"{settings.twitter_api_base_url}/2/oauth2/token",
             data={
                 "refresh_token": refresh_token,
                 "grant_type": "refresh_token",
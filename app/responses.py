@@ -0,0 +1,14 @@
+from typing import Any
+import orjson
+from starlette.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    Default response class: orjson instead of json.dumps.
+    (FastAPI's own ORJSONResponse is deprecated in favour of typed routes;
+    routes without a return type still go through this.)
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
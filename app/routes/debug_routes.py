@@ -0,0 +1,44 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import FileResponse, PlainTextResponse
+from app.services.profiling import (
+    get_sampler, list_profiles, profile_file, profiling_enabled, stored_dump, verify_profile_token
+)
+
+router = APIRouter()
+
+def require_profile_token(x_profile: Optional[str] = Header(None)):
+    """Same signed token as profiled requests; the routes don't exist while profiling is off"""
+    if not profiling_enabled():
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not verify_profile_token(x_profile):
+        raise HTTPException(status_code=403, detail="Invalid profile token")
+
+@router.get("/profiles", dependencies=[Depends(require_profile_token)])
+async def get_profiles():
+    """
+    Saved request profiles (req-*.prof / req-*.txt) and job sampler dumps
+    (jobs-*.folded), newest first
+    """
+    return {"profiles": list_profiles()}
+
+@router.get("/profiles/sampler", dependencies=[Depends(require_profile_token)])
+async def get_sampler_stacks():
+    """Folded stacks collected by this process's sampler since its last flush"""
+    sampler = get_sampler()
+    if sampler is None:
+        raise HTTPException(status_code=404, detail="The stack sampler isn't running in this process")
+    return PlainTextResponse(sampler.folded())
+
+@router.get("/profiles/{name}", dependencies=[Depends(require_profile_token)])
+async def download_profile(name: str):
+    """Download one profile or sampler dump from GET /debug/profiles"""
+    path = profile_file(name)
+    if path is None and name.endswith(".folded"):
+        folded = stored_dump(name)
+        if folded is not None:
+            return PlainTextResponse(folded, headers={"Content-Disposition": f'attachment; filename="{name}"'})
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/octet-stream" if name.endswith(".prof") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
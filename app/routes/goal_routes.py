@@ -1,20 +1,46 @@
 import os
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 
-import httpx
 from app.auth import get_current_user, get_supabase_client
-from pydantic import BaseModel
-from openai import OpenAI
+from pydantic import BaseModel, Field
 from config import get_settings
-from app.auth import decrypt_token
+from app.services.outbound import outbound_client
+from app.services.log import get_logger, goal_id_var
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.etag import not_modified, set_etag, weak_etag
+from app.services.read_cache import GOALS, POSTS, SOCIAL_ACCOUNTS, current_version, invalidate, lookup
+from app.services.single_flight import single_flight
+from app.services.rate_limit import rate_limit
+from app.services.ownership import remember_goal_owner, require_goal_owner, require_post_owner
+from app.services.post_generation import generate_posts_for_goal
+from app.jobs.post_generation import enqueue_generation, enqueue_generations
+from app.services.events import GOAL_COMPLETED, GOAL_POSTPONED, format_sse, get_event_broker, publish_event
 
 settings = get_settings()
 router = APIRouter()
+logger = get_logger(__name__)
 
-# Use settings instead of os.getenv
-client = OpenAI(api_key=settings.openai_api_key)
+# Goal columns the history endpoint may return
+HISTORY_FIELDS = {
+    "id", "title", "description", "deadline", "original_deadline",
+    "completed", "completed_at", "total_postponed_minutes", "created_at",
+}
+HISTORY_SUMMARY_FIELDS = {"id", "title", "deadline", "completed_at"}
+HISTORY_MAX_LIMIT = 100
+
+# Items per batch request
+BATCH_MAX_ITEMS = 50
+
+# Columns returned to clients (explicit so new columns aren't shipped by accident)
+GOAL_COLUMNS = (
+    "id, user_id, title, description, deadline, original_deadline, completed, "
+    "completed_at, notification_sent, total_postponed_minutes, created_at, updated_at"
+)
+POST_COLUMNS = "id, goal_id, social_account_id, content, edited_content, posted_at, created_at, updated_at"
 
 class GoalCreate(BaseModel):
     title: str
@@ -22,6 +48,20 @@ class GoalCreate(BaseModel):
     deadline: datetime
     selected_social_account_ids: List[str]
 
+class GoalBatchCreate(BaseModel):
+    goals: List[GoalCreate] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+class PostEdit(BaseModel):
+    post_id: str
+    edited_content: str
+
+class PostBatchEdit(BaseModel):
+    posts: List[PostEdit] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+def _failed(index: int, status: int, error: str, **fields) -> dict:
+    """Per-item result for a batch item that wasn't written"""
+    return {"index": index, **fields, "success": False, "status": status, "error": error}
+
 class Goal(BaseModel):
     id: str
     title: str
@@ -30,66 +70,9 @@ class Goal(BaseModel):
     completed: bool
     created_at: datetime
 
-async def generate_posts_background(goal_id: str, user_id: str):
-    """
-    Background task to generate AI posts after goal creation
-    """
-    supabase = get_supabase_client()
-    
-    try:
-        # Get goal with social selections
-        goal_response = supabase.table("goals")\
-            .select("*, goal_social_selections(social_accounts(id, platform, username))")\
-            .eq("id", goal_id)\
-            .eq("user_id", user_id)\
-            .single()\
-            .execute()
-        
-        goal = goal_response.data
-        
-        # Generate posts for each platform
-        for selection in goal['goal_social_selections']:
-            account = selection['social_accounts']
-            platform = account['platform']
-            
-            # Generate with AI
-            prompt = f"""Generate a celebratory social media post for {platform} announcing completion of this goal:
-
-Title: {goal['title']}
-Description: {goal['description']}
-
-Requirements for {platform}:
-- Authentic and personal tone
-- 1-3 sentences
-- Include relevant emoji
-- No generic corporate speak
-{"- Keep under 280 characters" if platform == "twitter" else ""}
-"""
-            
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=100
-            )
-            
-            content = response.choices[0].message.content
-            
-            # Store in database
-            supabase.table("generated_posts").insert({
-                "goal_id": goal_id,
-                "social_account_id": account['id'],
-                "content": content,
-            }).execute()
-        
-        print(f"Successfully generated posts for goal {goal_id}")
-    
-    except Exception as e:
-        print(f"Failed to generate posts for goal {goal_id}: {e}")
-
 @router.post("/goals")
 async def create_goal(
     goal_data: GoalCreate,
-    background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user)
 ):
     supabase = get_supabase_client()
@@ -112,20 +95,88 @@ async def create_goal(
     ]
     
     supabase.table("goal_social_selections").insert(selections).execute()
+    invalidate(current_user.id, GOALS)
+    remember_goal_owner(goal["id"], current_user.id)
     
-    # Queue background task to generate posts
-    background_tasks.add_task(generate_posts_background, goal["id"], current_user.id)
+    # Generated by the worker pool; persisted, so it survives a restart
+    enqueue_generation(goal["id"], current_user.id)
     
     return {"success": True, "goal": goal}
 
-@router.get("/goals")
-async def get_goals(current_user = Depends(get_current_user)):
+@router.post("/goals/batch")
+async def create_goals(
+    batch: GoalBatchCreate,
+    current_user = Depends(get_current_user)
+):
+    """
+    Create several goals with one insert each for goals, selections and
+    generation jobs. Results come back per item, in request order; an item
+    selecting a social account the user doesn't own is rejected on its own.
+    """
+    supabase = get_supabase_client()
+    
+    # Ownership of every selected account in one query
+    account_ids = list(dict.fromkeys(
+        account_id for goal_data in batch.goals for account_id in goal_data.selected_social_account_ids
+    ))
+    owned = set()
+    if account_ids:
+        accounts_response = supabase.table("social_accounts")\
+            .select("id")\
+            .eq("user_id", current_user.id)\
+            .in_("id", account_ids)\
+            .execute()
+        owned = {account["id"] for account in accounts_response.data}
+    
+    results = []
+    accepted = []
+    for index, goal_data in enumerate(batch.goals):
+        if set(goal_data.selected_social_account_ids) <= owned:
+            accepted.append(index)
+            results.append(None)
+        else:
+            results.append(_failed(index, 404, "Social account not found"))
+    
+    if not accepted:
+        return {"results": results}
+    
+    goals_response = supabase.table("goals").insert([
+        {
+            "user_id": current_user.id,
+            "title": batch.goals[index].title,
+            "description": batch.goals[index].description,
+            "deadline": batch.goals[index].deadline.isoformat(),
+            "original_deadline": batch.goals[index].deadline.isoformat(),
+        }
+        for index in accepted
+    ]).execute()
+    
+    # Rows come back in insert order
+    selections = []
+    for index, goal in zip(accepted, goals_response.data):
+        selections.extend(
+            {"goal_id": goal["id"], "social_account_id": account_id}
+            for account_id in batch.goals[index].selected_social_account_ids
+        )
+        remember_goal_owner(goal["id"], current_user.id)
+        results[index] = {"index": index, "success": True, "goal": goal}
+    
+    if selections:
+        supabase.table("goal_social_selections").insert(selections).execute()
+    invalidate(current_user.id, GOALS)
+    
+    enqueue_generations([goal["id"] for goal in goals_response.data], current_user.id)
+    
+    return {"results": results}
+
+def _load_goals(user_id: str) -> list:
+    """Open goals with their social selections"""
     supabase = get_supabase_client()
     
     # Get goals with postponement data
     goals_response = supabase.table("goals")\
-        .select("*")\
-        .eq("user_id", current_user.id)\
+        .select(GOAL_COLUMNS)\
+        .eq("user_id", user_id)\
         .eq("completed", False)\
         .order("deadline")\
         .execute()
@@ -134,8 +185,9 @@ async def get_goals(current_user = Depends(get_current_user)):
     
     # For each goal, get its social selections
     for goal in goals:
+        remember_goal_owner(goal["id"], user_id)
         selections_response = supabase.table("goal_social_selections")\
-            .select("*, social_accounts(platform, username)")\
+            .select("goal_id, social_account_id, social_accounts(platform, username)")\
             .eq("goal_id", goal["id"])\
             .execute()
         
@@ -143,93 +195,207 @@ async def get_goals(current_user = Depends(get_current_user)):
     
     return goals
 
+def _goal_versions(user_id: str) -> list:
+    """Row versions only - enough to answer If-None-Match without reading full goals"""
+    supabase = get_supabase_client()
+    
+    versions_response = supabase.table("goals")\
+        .select("id, updated_at, goal_social_selections(social_accounts(id, updated_at))")\
+        .eq("user_id", user_id)\
+        .eq("completed", False)\
+        .execute()
+    
+    return versions_response.data
 
-@router.get("/goals/{goal_id}/posts")
-async def get_goal_posts(
-    goal_id: str,
+@router.get("/goals")
+async def get_goals(
+    request: Request,
+    response: Response,
     current_user = Depends(get_current_user)
-):
+) -> List[Dict[str, Any]]:
+    # Served from the per-user read cache; writes to goals invalidate it
+    cached = lookup(current_user.id, GOALS)
+    
+    if cached.value is None:
+        # Identical concurrent requests (app resume, pull to refresh) share one fetch.
+        # The cache key carries the version, so requests after a write start a new one.
+        flight_key = (current_user.id, cached.key) if cached.key else None
+        etag = weak_etag(await single_flight("goal_versions", flight_key, _goal_versions, current_user.id))
+        unchanged = not_modified(request, etag)
+        if unchanged:
+            return unchanged
+        
+        goals = await single_flight("goals", flight_key, _load_goals, current_user.id)
+        cached.fill({"etag": etag, "goals": goals})
+    
+    unchanged = not_modified(request, cached.value["etag"])
+    if unchanged:
+        return unchanged
+    
+    set_etag(response, cached.value["etag"])
+    return cached.value["goals"]
+
+
+@router.get("/goals/events")
+async def goal_events(current_user = Depends(get_current_user)):
     """
-    Get generated posts for a goal
+    Server-sent events for the user's goals (posts_generated, goal_completed,
+    goal_postponed). Clients load /goals once per connection and then apply
+    events instead of polling; events published while disconnected are not replayed.
+    """
+    subscription = get_event_broker().subscribe(current_user.id)
+    
+    async def stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = await subscription.get(timeout=settings.event_heartbeat_seconds)
+                # Comment lines keep proxies from closing an idle connection
+                yield format_sse(message) if message else ": keepalive\n\n"
+        finally:
+            subscription.close()
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _post_versions(goal_id: str, user_id: str) -> Optional[list]:
+    """
+    Row versions only - enough to answer If-None-Match without reading the posts.
+    Read through the user's goal, which doubles as the ownership check; None if
+    the goal isn't theirs.
     """
     supabase = get_supabase_client()
     
-    # Verify goal belongs to user
     goal_response = supabase.table("goals")\
-        .select("id")\
+        .select("id, generated_posts(id, updated_at, social_accounts(id, updated_at))")\
         .eq("id", goal_id)\
-        .eq("user_id", current_user.id)\
-        .single()\
+        .eq("user_id", user_id)\
+        .limit(1)\
         .execute()
     
     if not goal_response.data:
-        raise HTTPException(status_code=404, detail="Goal not found")
+        return None
+    
+    remember_goal_owner(goal_id, user_id)
+    return goal_response.data[0]["generated_posts"]
+
+def _load_posts(goal_id: str) -> list:
+    """Posts with social account info"""
+    supabase = get_supabase_client()
     
-    # Get posts with social account info
     posts_response = supabase.table("generated_posts")\
-        .select("*, social_accounts(platform, username)")\
+        .select(f"{POST_COLUMNS}, social_accounts(platform, username)")\
         .eq("goal_id", goal_id)\
         .execute()
     
     return posts_response.data
 
-@router.post("/goals/{goal_id}/generate-posts")
+@router.get("/goals/{goal_id}/posts")
+async def get_goal_posts(
+    goal_id: str,
+    request: Request,
+    response: Response,
+    current_user = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
+    """
+    Get generated posts for a goal
+    """
+    # Identical concurrent requests share one fetch of each query. The posts embed
+    # the accounts, so writes to either start new fetches; the posts fetch is
+    # also keyed by the etag it has to match.
+    version = current_version(current_user.id, POSTS, SOCIAL_ACCOUNTS)
+    flight_key = (current_user.id, goal_id, version) if version else None
+    versions = await single_flight("post_versions", flight_key, _post_versions, goal_id, current_user.id)
+    if versions is None:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    
+    etag = weak_etag(versions)
+    unchanged = not_modified(request, etag)
+    if unchanged:
+        return unchanged
+    
+    posts = await single_flight("goal_posts", flight_key and flight_key + (etag,), _load_posts, goal_id)
+    
+    set_etag(response, etag)
+    return posts
+
+@router.post("/goals/{goal_id}/generate-posts", dependencies=[Depends(rate_limit("generate_posts"))])
 async def generate_posts(
     goal_id: str,
+    force: bool = False,
+    current_user = Depends(get_current_user)
+):
+    """
+    Posts for each selected account, generating only the missing ones.
+    force=true regenerates the unpublished posts (and drops their edits).
+    """
+    # LLM calls block; keep them off the event loop
+    result = await run_in_threadpool(generate_posts_for_goal, goal_id, current_user.id, force)
+    
+    if result is None:
+        raise HTTPException(status_code=404, detail="Goal not found")
+    
+    posts, generated = result
+    return {"posts": posts, "generated": generated}
+
+
+
+@router.patch("/posts/batch")
+async def update_posts(
+    batch: PostBatchEdit,
     current_user = Depends(get_current_user)
 ):
+    """
+    Update the edited content of several posts: ownership is checked for the
+    whole batch in one query and the edits are written in one update
+    (update_post_edits). Results come back per item, in request order.
+    """
     supabase = get_supabase_client()
     
-    # Get goal
-    goal_response = supabase.table("goals")\
-        .select("*, goal_social_selections(social_accounts(id, platform, username))")\
-        .eq("id", goal_id)\
-        .eq("user_id", current_user.id)\
-        .single()\
+    post_ids = list(dict.fromkeys(edit.post_id for edit in batch.posts))
+    posts_response = supabase.table("generated_posts")\
+        .select("id, goal_id, goals(user_id)")\
+        .in_("id", post_ids)\
         .execute()
     
-    goal = goal_response.data
+    posts = {post["id"]: post for post in posts_response.data}
     
-    # Generate posts for each platform
-    generated = []
-    for selection in goal['goal_social_selections']:
-        account = selection['social_accounts']
-        platform = account['platform']
-        
-        # Generate with AI
-        prompt = f"""Generate a celebratory social media post for {platform} announcing completion of this goal:
-
-Title: {goal['title']}
-Description: {goal['description']}
-
-Requirements for {platform}:
-- Authentic and personal tone
-- 1-3 sentences
-- Include relevant emoji
-- No generic corporate speak
-{"- Keep under 280 characters" if platform == "twitter" else ""}
-"""
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100
-        )
-        
-        content = response.choices[0].message.content
-        
-        # Store in database
-        post_response = supabase.table("generated_posts").insert({
-            "goal_id": goal_id,
-            "social_account_id": account['id'],
-            "content": content,
+    results = []
+    edits = {}
+    for index, edit in enumerate(batch.posts):
+        post = posts.get(edit.post_id)
+        if post is None:
+            results.append(_failed(index, 404, "Post not found", post_id=edit.post_id))
+        elif post["goals"]["user_id"] != current_user.id:
+            results.append(_failed(index, 403, "Unauthorized", post_id=edit.post_id))
+        elif edit.post_id in edits:
+            results.append(_failed(index, 409, "Post appears more than once in the batch", post_id=edit.post_id))
+        else:
+            remember_goal_owner(post["goal_id"], current_user.id)
+            edits[edit.post_id] = edit.edited_content
+            results.append({"index": index, "post_id": edit.post_id, "success": True})
+    
+    if edits:
+        updated = supabase.rpc("update_post_edits", {
+            "edits": [{"id": post_id, "edited_content": content} for post_id, content in edits.items()]
         }).execute()
         
-        generated.append(post_response.data[0])
-    
-    return {"posts": generated}
-
-
+        updated_posts = {post["id"]: post for post in updated.data}
+        for i, result in enumerate(results):
+            if not result["success"]:
+                continue
+            if result["post_id"] in updated_posts:
+                result["post"] = updated_posts[result["post_id"]]
+            else:
+                # Deleted since the ownership check
+                results[i] = _failed(result["index"], 404, "Post not found", post_id=result["post_id"])
+        invalidate(current_user.id, POSTS)
+    
+    return {"results": results}
 
 @router.patch("/posts/{post_id}")
 async def update_post(
@@ -243,39 +409,23 @@ async def update_post(
     supabase = get_supabase_client()
     
     # Verify post belongs to user's goal
-    post_response = supabase.table("generated_posts")\
-        .select("goal_id")\
-        .eq("id", post_id)\
-        .single()\
-        .execute()
-    
-    if not post_response.data:
-        raise HTTPException(status_code=404, detail="Post not found")
-    
-    goal_response = supabase.table("goals")\
-        .select("id")\
-        .eq("id", post_response.data["goal_id"])\
-        .eq("user_id", current_user.id)\
-        .single()\
-        .execute()
-    
-    if not goal_response.data:
-        raise HTTPException(status_code=403, detail="Unauthorized")
+    require_post_owner(post_id, current_user.id)
     
     # Update the post
     response = supabase.table("generated_posts")\
         .update({"edited_content": edited_content})\
         .eq("id", post_id)\
         .execute()
+    invalidate(current_user.id, POSTS)
     
     return {"success": True, "post": response.data[0]}
 
 
 
-from app.auth import decrypt_token
+from app.oauth.tokens import get_access_tokens
 from app.oauth.token_refresh import refresh_twitter_token
 
-@router.post("/goals/{goal_id}/post-now")
+@router.post("/goals/{goal_id}/post-now", dependencies=[Depends(rate_limit("post_now"))])
 async def post_now(
     goal_id: str,
     current_user = Depends(get_current_user)
@@ -284,77 +434,66 @@ async def post_now(
     Post all generated posts for a goal and mark as completed
     """
     supabase = get_supabase_client()
+    goal_id_var.set(goal_id)
     
-    # Get goal and verify ownership
-    goal_response = supabase.table("goals")\
-        .select("id, title")\
-        .eq("id", goal_id)\
-        .eq("user_id", current_user.id)\
-        .single()\
-        .execute()
-    
-    if not goal_response.data:
-        raise HTTPException(status_code=404, detail="Goal not found")
+    require_goal_owner(goal_id, current_user.id)
     
     # Get all posts for this goal
     posts_response = supabase.table("generated_posts")\
-        .select("*, social_accounts(*)")\
+        .select("id, content, edited_content, social_accounts(id, platform, platform_user_id)")\
         .eq("goal_id", goal_id)\
         .execute()
     
     posts = posts_response.data
     results = []
     
+    # Tokens are only read now, right before publishing
+    access_tokens = get_access_tokens([post['social_accounts']['id'] for post in posts])
+    
     for post in posts:
         account = post['social_accounts']
         platform = account['platform']
         content = post['edited_content'] or post['content']
         
-        print(f"DEBUG: Processing post for platform: {platform}")
+        logger.debug("post_now_processing", platform=platform, post_id=post['id'])
         
         try:
+            access_token = access_tokens.get(account['id'])
+            if not access_token:
+                raise Exception(f"No access token for {platform} account")
+            
             if platform == 'twitter':
-                print(f"DEBUG: Decrypting Twitter token...")
-                access_token = decrypt_token(account['access_token_encrypted'])
-                print(f"DEBUG: Token decrypted, posting to Twitter...")
-                
-                async with httpx.AsyncClient() as client:
+                async with outbound_client("twitter") as client:
                     response = await client.post(
-                        "https://api.twitter.com/2/tweets",
+                        f"{settings.twitter_api_base_url}/2/tweets",
                         json={"text": content},
                         headers={"Authorization": f"Bearer {access_token}"}
                     )
                     
-                    print(f"DEBUG: Twitter response: {response.status_code}")
-                    print(f"DEBUG: Twitter response body: {response.text}")
+                    logger.debug("twitter_response", status=response.status_code, body=response.text)
                     
                     # If 401, try refreshing token once
                     if response.status_code == 401:
-                        print(f"Twitter 401, refreshing token...")
+                        logger.info("twitter_token_refresh", reason="401")
                         access_token = await refresh_twitter_token(account['id'])
                         
                         # Retry with new token
                         response = await client.post(
-                            "https://api.twitter.com/2/tweets",
+                            f"{settings.twitter_api_base_url}/2/tweets",
                             json={"text": content},
                             headers={"Authorization": f"Bearer {access_token}"}
                         )
-                        print(f"DEBUG: Twitter retry response: {response.status_code}")
-                        print(f"DEBUG: Twitter retry body: {response.text}")
+                        logger.debug("twitter_retry_response", status=response.status_code, body=response.text)
                     
                     if response.status_code == 201:
                         results.append({"platform": platform, "success": True})
-                        print(f"✓ Twitter post successful")
+                        logger.info("post_published", platform=platform)
                     else:
-                        print(f"✗ Twitter post failed: {response.status_code} - {response.text}")
+                        logger.warning("post_failed", platform=platform, status=response.status_code, body=response.text)
                         results.append({"platform": platform, "success": False, "error": response.text})
             
             elif platform == 'linkedin':
-                print(f"DEBUG: Posting to LinkedIn...")
-                access_token = decrypt_token(account['access_token_encrypted'])
-                print(f"DEBUG: LinkedIn token decrypted")
-                
-                async with httpx.AsyncClient() as client:
+                async with outbound_client("linkedin") as client:
                     linkedin_payload = {
                         "author": f"urn:li:person:{account['platform_user_id']}",
                         "lifecycleState": "PUBLISHED",
@@ -367,10 +506,10 @@ async def post_now(
                         "visibility": {"com.linkedin.ugc.MemberNetworkVisibility": "PUBLIC"}
                     }
                     
-                    print(f"DEBUG: LinkedIn payload: {linkedin_payload}")
+                    logger.debug("linkedin_payload", payload=linkedin_payload)
                     
                     response = await client.post(
-                        "https://api.linkedin.com/v2/ugcPosts",
+                        f"{settings.linkedin_api_base_url}/v2/ugcPosts",
                         json=linkedin_payload,
                         headers={
                             "Authorization": f"Bearer {access_token}",
@@ -379,14 +518,13 @@ async def post_now(
                         }
                     )
                     
-                    print(f"DEBUG: LinkedIn response status: {response.status_code}")
-                    print(f"DEBUG: LinkedIn response body: {response.text}")
+                    logger.debug("linkedin_response", status=response.status_code, body=response.text)
                     
                     if response.status_code in [200, 201]:
                         results.append({"platform": platform, "success": True})
-                        print(f"✓ LinkedIn post successful")
+                        logger.info("post_published", platform=platform)
                     else:
-                        print(f"✗ LinkedIn post failed: {response.status_code} - {response.text}")
+                        logger.warning("post_failed", platform=platform, status=response.status_code, body=response.text)
                         results.append({"platform": platform, "success": False, "error": response.text})
             
             # Mark post as posted
@@ -396,9 +534,7 @@ async def post_now(
                 .execute()
         
         except Exception as e:
-            print(f"✗ Exception posting to {platform}: {str(e)}")
-            import traceback
-            traceback.print_exc()
+            logger.error("post_failed", platform=platform, error=str(e), exc_info=True)
             results.append({"platform": platform, "success": False, "error": str(e)})
             
     # Mark goal as completed
@@ -409,13 +545,19 @@ async def post_now(
         })\
         .eq("id", goal_id)\
         .execute()
+    invalidate(current_user.id, GOALS, POSTS)
     
     updated_goal = supabase.table("goals")\
-    .select("*")\
+    .select(GOAL_COLUMNS)\
     .eq("id", goal_id)\
     .single()\
     .execute()
 
+    publish_event(
+        current_user.id, GOAL_COMPLETED,
+        goal_id=goal_id, completed_at=updated_goal.data["completed_at"], auto_posted=False
+    )
+    
     return {
         "success": True, 
         "results": results,
@@ -442,18 +584,19 @@ async def postpone_goal(
             detail="Postponement must be between 1 and 120 minutes"
         )
     
-    # Get goal and verify ownership
+    # Filtering on the user makes this read the ownership check as well
     goal_response = supabase.table("goals")\
-        .select("*")\
+        .select("id, deadline, completed, total_postponed_minutes")\
         .eq("id", goal_id)\
         .eq("user_id", current_user.id)\
-        .single()\
+        .limit(1)\
         .execute()
     
     if not goal_response.data:
         raise HTTPException(status_code=404, detail="Goal not found")
     
-    goal = goal_response.data
+    remember_goal_owner(goal_id, current_user.id)
+    goal = goal_response.data[0]
     
     # Check if goal is already completed
     if goal['completed']:
@@ -492,6 +635,13 @@ async def postpone_goal(
         })\
         .eq("id", goal_id)\
         .execute()
+    invalidate(current_user.id, GOALS)
+    publish_event(
+        current_user.id, GOAL_POSTPONED,
+        goal_id=goal_id,
+        deadline=new_deadline.isoformat(),
+        total_postponed_minutes=total_postponed + minutes
+    )
     
     return {
         "success": True,
@@ -503,17 +653,73 @@ async def postpone_goal(
     }
     
 @router.get("/goals/history")
-async def get_completed_goals(current_user = Depends(get_current_user)):
+async def get_completed_goals(
+    response: Response,
+    limit: int = Query(50, ge=1, le=HISTORY_MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    summary: bool = False,
+    current_user = Depends(get_current_user)
+) -> List[Dict[str, Any]]:
     """
-    Get completed goals with their posts
+    Get completed goals with their posts, newest first, one page at a time.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page;
+    `fields` picks goal columns (comma separated) and `summary` skips the
+    connected-account details.
     """
     supabase = get_supabase_client()
     
-    goals_response = supabase.table("goals")\
-        .select("*, goal_social_selections(social_accounts(platform, username))")\
+    try:
+        after = decode_cursor(cursor, 2)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if fields:
+        columns = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = sorted(set(columns) - HISTORY_FIELDS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    else:
+        columns = sorted(HISTORY_FIELDS)
+    if summary:
+        columns = [c for c in columns if c in HISTORY_SUMMARY_FIELDS] or sorted(HISTORY_SUMMARY_FIELDS)
+    # The cursor is built from these, so they're always fetched
+    select_columns = list(dict.fromkeys(["id", "completed_at"] + columns))
+    select = ", ".join(select_columns)
+    if not summary:
+        select += ", goal_social_selections(social_accounts(platform, username))"
+    
+    query = supabase.table("goals")\
+        .select(select)\
         .eq("user_id", current_user.id)\
         .eq("completed", True)\
+        .filter("completed_at", "not.is", "null")
+    
+    if after:
+        completed_at, goal_id = after
+        query = query.or_(
+            f'completed_at.lt."{completed_at}",'
+            f'and(completed_at.eq."{completed_at}",id.lt.{goal_id})'
+        )
+    
+    # One extra row tells us whether there's a next page
+    goals_response = query\
         .order("completed_at", desc=True)\
+        .order("id", desc=True)\
+        .limit(limit + 1)\
         .execute()
     
-    return goals_response.data
\ No newline at end of file
+    goals = goals_response.data
+    
+    if len(goals) > limit:
+        goals = goals[:limit]
+        last = goals[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last["completed_at"], last["id"])
+    
+    # Drop the cursor columns the caller didn't ask for
+    hidden = [c for c in ("id", "completed_at") if c not in columns]
+    for goal in goals:
+        for column in hidden:
+            goal.pop(column, None)
+    
+    return goals
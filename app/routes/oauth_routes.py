@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from app.auth import get_current_user, get_supabase_client
 from app.oauth import linkedin, twitter
 from app.models import OAuthCallbackRequest
+from app.services.rate_limit import rate_limit
 
 router = APIRouter()
 
@@ -59,7 +60,7 @@ async def twitter_callback(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Twitter OAuth callback failed: {str(e)}")
 
-@router.post("/twitter/complete")
+@router.post("/twitter/complete", dependencies=[Depends(rate_limit("oauth_complete"))])
 async def twitter_complete(
     code: str,
     state: str,
@@ -121,7 +122,7 @@ async def linkedin_callback(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"LinkedIn OAuth callback failed: {str(e)}")
 
-@router.post("/linkedin/complete")
+@router.post("/linkedin/complete", dependencies=[Depends(rate_limit("oauth_complete"))])
 async def linkedin_complete(
     code: str,
     state: str,
@@ -1,24 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import List
 from app.auth import get_current_user, get_supabase_client
 from app.models import SocialAccount
+from app.services.etag import not_modified, set_etag, weak_etag
+from app.services.read_cache import GOALS, SOCIAL_ACCOUNTS, invalidate, lookup
 
 router = APIRouter()
 
 @router.get("/accounts", response_model=List[SocialAccount])
-async def get_social_accounts(current_user = Depends(get_current_user)):
+async def get_social_accounts(
+    request: Request,
+    response: Response,
+    current_user = Depends(get_current_user)
+):
     """
     Get all connected social accounts for the current user
     """
     supabase = get_supabase_client()
     
     try:
-        response = supabase.table("social_accounts")\
-            .select("id, user_id, platform, platform_user_id, username, connected_at")\
-            .eq("user_id", current_user.id)\
-            .execute()
+        # Served from the per-user read cache; OAuth completion and disconnect invalidate it
+        cached = lookup(current_user.id, SOCIAL_ACCOUNTS)
+        
+        if cached.value is None:
+            versions_response = supabase.table("social_accounts")\
+                .select("id, updated_at")\
+                .eq("user_id", current_user.id)\
+                .execute()
+            
+            etag = weak_etag(versions_response.data)
+            unchanged = not_modified(request, etag)
+            if unchanged:
+                return unchanged
+            
+            accounts_response = supabase.table("social_accounts")\
+                .select("id, user_id, platform, platform_user_id, username, connected_at")\
+                .eq("user_id", current_user.id)\
+                .execute()
+            
+            cached.fill({"etag": etag, "accounts": accounts_response.data})
         
-        return response.data
+        unchanged = not_modified(request, cached.value["etag"])
+        if unchanged:
+            return unchanged
+        
+        set_etag(response, cached.value["etag"])
+        return cached.value["accounts"]
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch social accounts: {str(e)}")
@@ -41,6 +68,9 @@ async def disconnect_social_account(
             .eq("platform", platform)\
             .execute()
         
+        # Goals embed the account's platform/username too
+        invalidate(current_user.id, SOCIAL_ACCOUNTS, GOALS)
+        
         return {"success": True, "message": f"{platform} disconnected successfully"}
     
     except Exception as e:
@@ -3,8 +3,12 @@ from datetime import datetime
 from app.auth import get_current_user, get_supabase_client
 from pydantic import BaseModel
 from typing import Dict
+from app.services.log import get_logger
+from app.services.read_cache import GOALS, SOCIAL_ACCOUNTS, invalidate
+from app.jobs.account_deletion import enqueue_account_deletion
 
 router = APIRouter()
+logger = get_logger(__name__)
 
 class APNsTokenRequest(BaseModel):
     apns_token: str
@@ -29,60 +33,49 @@ async def update_apns_token(
     
     return {"success": True}
 
-@router.delete("/user/account")
+@router.delete("/user/account", status_code=202)
 async def delete_account(current_user = Depends(get_current_user)):
+    """
+    Start deleting the account in the background. Poll the returned
+    status_url until status is "completed".
+    """
+    try:
+        job = enqueue_account_deletion(current_user.id)
+    except Exception as e:
+        logger.error("account_deletion_failed", user_id=current_user.id, error=str(e), exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to delete account: {str(e)}")
+    
+    invalidate(current_user.id, GOALS, SOCIAL_ACCOUNTS)
+    
+    return {
+        "success": True,
+        "job_id": job["id"],
+        "status": job["status"],
+        "status_url": f"/api/user/account/deletion/{job['id']}"
+    }
+
+@router.get("/user/account/deletion/{job_id}")
+async def get_account_deletion_status(job_id: str):
+    """
+    Deletion job status. Unauthenticated on purpose: the user's token stops
+    working once the auth user is deleted, and the job id is an unguessable UUID.
+    """
     supabase = get_supabase_client()
     
     try:
-        # Get all goal IDs for this user first
-        goals_response = supabase.table("goals")\
-            .select("id")\
-            .eq("user_id", current_user.id)\
-            .execute()
-        
-        goal_ids = [goal['id'] for goal in goals_response.data]
-        
-        if goal_ids:
-            # Delete generated posts for these goals
-            supabase.table("generated_posts")\
-                .delete()\
-                .in_("goal_id", goal_ids)\
-                .execute()
-            
-            # Delete goal_social_selections
-            supabase.table("goal_social_selections")\
-                .delete()\
-                .in_("goal_id", goal_ids)\
-                .execute()
-        
-        # Delete goals
-        supabase.table("goals")\
-            .delete()\
-            .eq("user_id", current_user.id)\
+        job_response = supabase.table("account_deletion_jobs")\
+            .select("id, status, step, deleted_rows, created_at, finished_at")\
+            .eq("id", job_id)\
+            .limit(1)\
             .execute()
-        
-        # Delete social accounts
-        supabase.table("social_accounts")\
-            .delete()\
-            .eq("user_id", current_user.id)\
-            .execute()
-        
-        # Delete device tokens
-        supabase.table("user_devices")\
-            .delete()\
-            .eq("user_id", current_user.id)\
-            .execute()
-        
-        # Delete user from auth
-        supabase.auth.admin.delete_user(current_user.id)
-        
-        return {"success": True, "message": "Account deleted successfully"}
-        
-    except Exception as e:
-        print(f"Error deleting account: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Failed to delete account: {str(e)}")
+    except Exception:
+        # Malformed UUIDs are rejected by Postgres
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    
+    if not job_response.data:
+        raise HTTPException(status_code=404, detail="Deletion job not found")
+    
+    return job_response.data[0]
 
 # Keep old endpoint for backwards compatibility during transition
 @router.post("/user/fcm-token")
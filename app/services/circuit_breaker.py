@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+from config import get_settings
+from app.services.log import get_logger
+from app.services.metrics import CIRCUIT_STATE
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Gauge values for lockin_circuit_state
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a service whose breaker is open"""
+
+    def __init__(self, service: str, retry_after: float):
+        super().__init__(f"{service} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.service = service
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Failure-rate breaker over the last `window` calls to one service.
+
+    closed:    calls go through; opens when at least `min_calls` of the window
+               have completed and the failure rate reaches `failure_rate`
+    open:      calls fail fast with CircuitOpenError for `open_seconds`
+    half_open: one probe call goes through; success closes, failure reopens
+    """
+
+    def __init__(self, service: str, failure_rate: float, min_calls: int, window: int, open_seconds: float):
+        self.service = service
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._outcomes: deque = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(service).set(_STATE_VALUES[CLOSED])
+
+    def _set_state(self, state: str):
+        if state != self._state:
+            logger.warning("circuit_state_changed", service=self.service, previous=self._state, state=state)
+        self._state = state
+        CIRCUIT_STATE.labels(self.service).set(_STATE_VALUES[state])
+
+    def _retry_after(self) -> float:
+        return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._retry_after() == 0:
+                return HALF_OPEN
+            return self._state
+
+    def available(self) -> bool:
+        """False while open; jobs check this to defer work instead of failing it"""
+        return self.state != OPEN
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError; every admitted call must be followed by record()"""
+        with self._lock:
+            if self._state == OPEN:
+                retry_after = self._retry_after()
+                if retry_after > 0:
+                    raise CircuitOpenError(self.service, retry_after)
+                self._set_state(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError(self.service, self.open_seconds)
+                self._probing = True
+
+    def record(self, success: bool):
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+                if success:
+                    self._outcomes.clear()
+                    self._set_state(CLOSED)
+                else:
+                    self._opened_at = time.monotonic()
+                    self._set_state(OPEN)
+                return
+
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate:
+                self._opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release(self):
+        """Give back an admitted call that ended without an outcome (e.g. cancelled)"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probing = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(service: str) -> CircuitBreaker:
+    """Breaker for an external service (twitter, linkedin, apns, openai, ...)"""
+    breaker = _breakers.get(service)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(service)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    service,
+                    failure_rate=settings.circuit_failure_rate,
+                    min_calls=settings.circuit_min_calls,
+                    window=settings.circuit_window,
+                    open_seconds=settings.circuit_open_seconds,
+                )
+                _breakers[service] = breaker
+    return breaker
@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Callable, Optional
+
+# Background jobs read time through here so benchmarks can run them on a simulated clock
+_now: Callable[[], datetime] = datetime.utcnow
+
+
+def utcnow() -> datetime:
+    """Current naive UTC time (same convention as datetime.utcnow)"""
+    return _now()
+
+
+def set_clock(now: Optional[Callable[[], datetime]]):
+    """Replace the time source; pass None to restore the system clock"""
+    global _now
+    _now = now or datetime.utcnow
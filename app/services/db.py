@@ -0,0 +1,200 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from config import get_settings
+from app.services.log import get_logger
+from app.services.metrics import DB_QUERY_SECONDS
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Params that change the query structure; everything else is a filter whose value is dropped
+_STRUCTURAL_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+
+def _operation(builder) -> str:
+    """Map the pending PostgREST request to select/insert/upsert/update/delete/rpc"""
+    request = getattr(builder, "request", builder)
+    method = getattr(request, "http_method", "GET")
+    if method in ("GET", "HEAD"):
+        return "select"
+    if method == "PATCH":
+        return "update"
+    if method == "DELETE":
+        return "delete"
+    prefer = request.headers.get("Prefer", "") if hasattr(request, "headers") else ""
+    return "upsert" if "resolution=" in prefer else "insert"
+
+
+def _shape(table: str, operation: str, builder) -> str:
+    """
+    Query shape with filter values stripped, e.g.
+    select goal_social_selections?goal_id=eq&select=*,social_accounts(platform,username)
+    """
+    request = getattr(builder, "request", builder)
+    params = getattr(request, "params", None)
+    parts = []
+    for key, value in (params.multi_items() if params is not None else []):
+        if key in _STRUCTURAL_PARAMS:
+            parts.append(f"{key}={value}")
+        else:
+            parts.append(f"{key}={value.split('.', 1)[0]}")
+    return f"{operation} {table}?{'&'.join(sorted(parts))}"
+
+
+def _row_count(response) -> int:
+    data = getattr(response, "data", None)
+    if isinstance(data, list):
+        return len(data)
+    return 0 if data is None else 1
+
+
+@dataclass
+class QueryRecord:
+    table: str
+    operation: str
+    shape: str
+    rows: int
+    seconds: float
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+@dataclass
+class QueryRecorder:
+    """Queries executed within one request or job cycle"""
+    scope: str
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def query_count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(q.seconds for q in self.queries)
+
+    def repeated_shapes(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Shapes executed at least `threshold` times - likely N+1 loops"""
+        threshold = threshold or settings.n_plus_one_threshold
+        counts = Counter(q.shape for q in self.queries)
+        return {shape: n for shape, n in counts.items() if n >= threshold}
+
+
+_recorder_var: ContextVar[Optional[QueryRecorder]] = ContextVar("query_recorder", default=None)
+
+
+def report_queries(recorder: QueryRecorder, raise_repeated: bool = True):
+    """
+    Log the query summary and any suspected N+1 shapes for a finished scope;
+    with n_plus_one_raise (and raise_repeated) they raise NPlusOneError
+    """
+    if not recorder.queries:
+        return
+
+    logger.debug(
+        "query_summary",
+        scope=recorder.scope,
+        queries=recorder.query_count,
+        rows=sum(q.rows for q in recorder.queries),
+        db_ms=round(recorder.total_seconds * 1000, 1),
+    )
+
+    repeated = recorder.repeated_shapes()
+    for shape, count in repeated.items():
+        logger.warning("n_plus_one_suspected", scope=recorder.scope, shape=shape, count=count)
+
+    if repeated and settings.n_plus_one_raise and raise_repeated:
+        raise NPlusOneError(f"{recorder.scope}: repeated query shapes {repeated}")
+
+
+@contextmanager
+def record_queries(scope: str):
+    """
+    Record every query executed in this context (a request, a job cycle or a test):
+
+        with record_queries("test_get_goals") as recorder:
+            ...
+        assert not recorder.repeated_shapes()
+    """
+    recorder = QueryRecorder(scope)
+    token = _recorder_var.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorder_var.reset(token)
+        report_queries(recorder)
+
+
+class InstrumentedQuery:
+    """
+    Wraps a postgrest request builder so every chained call keeps the wrapper
+    and execute() is timed per table/operation
+    """
+
+    def __init__(self, table: str, builder, operation: str = None):
+        self._table = table
+        self._builder = builder
+        self._operation = operation
+
+    def __getattr__(self, name):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            # Properties such as `not_` return the builder itself; keep it wrapped
+            if hasattr(attr, "execute"):
+                return InstrumentedQuery(self._table, attr, self._operation)
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return InstrumentedQuery(self._table, result, self._operation)
+            return result
+
+        return chained
+
+    def execute(self):
+        operation = self._operation or _operation(self._builder)
+        started = time.perf_counter()
+        response = None
+        try:
+            response = self._builder.execute()
+            return response
+        finally:
+            elapsed = time.perf_counter() - started
+            DB_QUERY_SECONDS.labels(self._table, operation).observe(elapsed)
+            recorder = _recorder_var.get()
+            if recorder is not None:
+                recorder.queries.append(QueryRecord(
+                    table=self._table,
+                    operation=operation,
+                    shape=_shape(self._table, operation, self._builder),
+                    rows=_row_count(response),
+                    seconds=elapsed,
+                ))
+
+
+class InstrumentedClient:
+    """
+    Thin wrapper around the Supabase client. table()/rpc() return instrumented
+    builders; everything else (auth, storage, ...) is passed through untouched.
+    """
+
+    def __init__(self, client):
+        self._client = client
+
+    def table(self, table_name: str) -> InstrumentedQuery:
+        return InstrumentedQuery(table_name, self._client.table(table_name))
+
+    from_ = table
+
+    def rpc(self, fn: str, params: dict = None, **kwargs) -> InstrumentedQuery:
+        return InstrumentedQuery(f"rpc:{fn}", self._client.rpc(fn, params or {}, **kwargs), "rpc")
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
@@ -0,0 +1,48 @@
+import hashlib
+import json
+from typing import Any, Optional
+from fastapi import Request, Response
+
+# Clients must revalidate every time; the ETag makes that a 304 when nothing changed
+CACHE_CONTROL = "private, no-cache"
+
+
+def _canonical(value: Any) -> Any:
+    # Embedded rows come back in no guaranteed order
+    if isinstance(value, list):
+        return sorted((_canonical(v) for v in value), key=lambda v: json.dumps(v, sort_keys=True, default=str))
+    if isinstance(value, dict):
+        return {k: _canonical(v) for k, v in value.items()}
+    return value
+
+
+def weak_etag(versions: Any) -> str:
+    """
+    Weak validator over row versions, e.g. [{"id": ..., "updated_at": ...}].
+    Weak because the body's byte representation isn't what's hashed.
+    """
+    raw = json.dumps(_canonical(versions), sort_keys=True, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match uses weak comparison, so W/ prefixes are ignored"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == wanted for tag in header.split(","))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """304 response when the client already has this version, else None"""
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+    return None
+
+
+def set_etag(response: Response, etag: str):
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
@@ -0,0 +1,237 @@
+import asyncio
+import contextvars
+import itertools
+import threading
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Set
+import orjson
+from app.auth import get_supabase_client
+from config import get_settings
+from app.services.clock import utcnow
+from app.services.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Event names published to GET /goals/goals/events
+POSTS_GENERATED = "posts_generated"
+GOAL_COMPLETED = "goal_completed"
+GOAL_POSTPONED = "goal_postponed"
+
+# Ids behind the newest one seen that each poll reads again. BIGSERIAL ids are
+# taken at insert but become visible at commit, so a slower transaction can
+# show up below ids already delivered.
+REREAD_IDS = 100
+
+
+class Subscription:
+    """
+    One open event stream. Messages are handed over with call_soon_threadsafe,
+    so publishers may run on any thread. A slow client loses its oldest events
+    rather than growing the queue without bound.
+    """
+
+    def __init__(self, broker: "EventBroker", user_id: str):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.event_queue_size)
+        self.loop = asyncio.get_running_loop()
+
+    def deliver(self, message: Dict[str, Any]):
+        self.loop.call_soon_threadsafe(self._put, message)
+
+    def _put(self, message: Dict[str, Any]):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next message, or None if nothing arrived within timeout"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventBroker(ABC):
+    """
+    Fans out per-user events to the streams open in this process.
+    Subclasses decide how events travel between processes.
+    """
+
+    def __init__(self):
+        self._subscriptions: Dict[str, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]):
+        """Deliver an event to the user's streams, in this process and (per backend) others"""
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscribed_users(self) -> List[str]:
+        with self._lock:
+            return list(self._subscriptions)
+
+    def _fan_out(self, message: Dict[str, Any]):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(message["user_id"], ()))
+        for subscription in subscriptions:
+            subscription.deliver(message)
+
+
+class MemoryEventBroker(EventBroker):
+    """
+    In-process only: reaches streams served by the same process that publishes.
+    Fine for a single web process that also runs the jobs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._ids = itertools.count(1)
+
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]):
+        self._fan_out({"id": str(next(self._ids)), "user_id": user_id, "event": event, "data": data})
+
+
+class SupabaseEventBroker(EventBroker):
+    """
+    Events go through the user_events table so the job worker (python -m app.jobs)
+    and every uvicorn worker see them. Each process runs one poller, only while
+    streams are open here; it reads new rows by id alone (a user filter would put
+    every subscribed user in the URL) and fan-out skips users without a stream.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._last_id: Optional[int] = None
+        # Rows at or below this id predate the poller and are never delivered
+        self._floor = 0
+        # Ids delivered within the re-read window, so re-read rows aren't sent twice
+        self._delivered: Set[int] = set()
+        self._poller: Optional[asyncio.Task] = None
+        self._last_pruned = 0.0
+
+    def publish(self, user_id: str, event: str, data: Dict[str, Any]):
+        supabase = get_supabase_client()
+        supabase.table("user_events").insert({
+            "user_id": user_id,
+            "event": event,
+            "data": data,
+        }).execute()
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = super().subscribe(user_id)
+        if self._poller is None or self._poller.done():
+            # Fresh context so the poller doesn't inherit this request's id and query recorder
+            self._poller = contextvars.Context().run(asyncio.create_task, self._poll())
+        return subscription
+
+    def _fetch(self) -> List[Dict[str, Any]]:
+        """Rows not delivered yet, oldest first"""
+        supabase = get_supabase_client()
+
+        if self._last_id is None:
+            # Start from the newest row; streams only carry events from after they opened
+            latest = supabase.table("user_events")\
+                .select("id")\
+                .order("id", desc=True)\
+                .limit(1)\
+                .execute()
+            self._last_id = self._floor = latest.data[0]["id"] if latest.data else 0
+            self._delivered.clear()
+
+        # At most REREAD_IDS of these are old, so the limit always leaves room for new rows
+        rows = supabase.table("user_events")\
+            .select("id, user_id, event, data")\
+            .gt("id", max(self._floor, self._last_id - REREAD_IDS))\
+            .order("id")\
+            .limit(500)\
+            .execute()\
+            .data
+
+        fresh = [row for row in rows if row["id"] not in self._delivered]
+        if rows:
+            self._last_id = max(self._last_id, rows[-1]["id"])
+        window_start = self._last_id - REREAD_IDS
+        self._delivered = {i for i in self._delivered if i > window_start}
+        self._delivered.update(row["id"] for row in fresh)
+        return fresh
+
+    def _prune(self):
+        loop_time = asyncio.get_running_loop().time()
+        if loop_time - self._last_pruned < 60:
+            return
+        self._last_pruned = loop_time
+
+        cutoff = utcnow() - timedelta(seconds=settings.event_retention_seconds)
+        supabase = get_supabase_client()
+        supabase.table("user_events")\
+            .delete()\
+            .lt("created_at", cutoff.isoformat())\
+            .execute()
+
+    async def _poll(self):
+        while True:
+            if not self.subscribed_users():
+                # Resume from the newest row when the next stream opens
+                self._last_id = None
+                return
+            try:
+                for row in self._fetch():
+                    self._fan_out({**row, "id": str(row["id"])})
+                self._prune()
+            except Exception as e:
+                logger.warning("event_poll_failed", error=str(e))
+            await asyncio.sleep(settings.event_poll_seconds)
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_event_broker() -> EventBroker:
+    """The configured broker (`event_broker_backend`: memory or supabase)"""
+    global _broker
+    if _broker is None:
+        if settings.event_broker_backend == "memory":
+            _broker = MemoryEventBroker()
+        elif settings.event_broker_backend == "supabase":
+            _broker = SupabaseEventBroker()
+        else:
+            raise ValueError(f"Unknown event broker backend: {settings.event_broker_backend}")
+    return _broker
+
+
+def set_event_broker(broker: Optional[EventBroker]):
+    """Swap the broker (None goes back to the configured one)"""
+    global _broker
+    _broker = broker
+
+
+def publish_event(user_id: str, event: str, **data):
+    """Publish to the user's open streams; a failed publish never fails the caller"""
+    try:
+        get_event_broker().publish(user_id, event, data)
+    except Exception as e:
+        logger.warning("event_publish_failed", user_id=user_id, event_name=event, error=str(e))
+
+
+def format_sse(message: Dict[str, Any]) -> str:
+    """One server-sent event frame"""
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {orjson.dumps(message['data']).decode()}\n\n"
@@ -0,0 +1,132 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+from config import get_settings
+
+settings = get_settings()
+
+# Correlation IDs, captured at the call site and attached to every record
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+goal_id_var: ContextVar[Optional[str]] = ContextVar("goal_id", default=None)
+
+_RESERVED_KWARGS = {"exc_info", "stack_info", "stacklevel", "extra"}
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, event, correlation IDs and fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            payload["request_id"] = request_id
+        goal_id = getattr(record, "goal_id", None)
+        if goal_id:
+            payload["goal_id"] = goal_id
+        payload.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep only a fraction of DEBUG records (log_debug_sample_rate) so chatty
+    per-post events don't flood the pipeline. Applied before enqueueing.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue records without formatting them; JSON encoding and the write
+    happen on the listener thread, off the event loop
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class StructuredLogger(logging.LoggerAdapter):
+    """
+    logger.info("post_failed", platform="twitter", status=401)
+    Keyword arguments become JSON fields.
+    """
+
+    def process(self, msg, kwargs):
+        fields = {k: kwargs.pop(k) for k in list(kwargs) if k not in _RESERVED_KWARGS}
+        kwargs["extra"] = {
+            "fields": fields,
+            "request_id": request_id_var.get(),
+            "goal_id": fields.pop("goal_id", None) or goal_id_var.get(),
+        }
+        return msg, kwargs
+
+
+def configure_logging():
+    """
+    Route the root logger through a queue to a JSON stdout writer thread.
+    Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(-1)
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter(settings.log_debug_sample_rate))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.log_level.upper())
+    # Per-request client chatter; our own outbound logs carry the useful fields
+    for noisy in ("httpx", "httpcore", "hpack", "h2"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def get_logger(name: str) -> StructuredLogger:
+    return StructuredLogger(logging.getLogger(name), {})
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
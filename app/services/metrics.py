@@ -0,0 +1,98 @@
+import os
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    REGISTRY,
+)
+
+# Buckets tuned for API/DB calls (ms range) up to slow upstreams (tens of seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "lockin_http_request_duration_seconds",
+    "Latency of API requests by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+DB_QUERY_SECONDS = Histogram(
+    "lockin_db_query_duration_seconds",
+    "Latency of Supabase queries by table and operation",
+    ["table", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+
+OUTBOUND_REQUEST_SECONDS = Histogram(
+    "lockin_outbound_request_duration_seconds",
+    "Latency of calls to external services",
+    ["service"],
+    buckets=LATENCY_BUCKETS,
+)
+
+OUTBOUND_RESPONSES = Counter(
+    "lockin_outbound_responses_total",
+    "Responses from external services by status code ('error' for transport failures)",
+    ["service", "status"],
+)
+
+JOB_CYCLE_SECONDS = Histogram(
+    "lockin_job_cycle_duration_seconds",
+    "Duration of one background job cycle",
+    ["job"],
+    buckets=LATENCY_BUCKETS + (60.0, 120.0),
+)
+
+JOB_ITEMS_PROCESSED = Counter(
+    "lockin_job_items_processed_total",
+    "Items handled by background jobs by outcome",
+    ["job", "outcome"],
+)
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "lockin_single_flight_calls_total",
+    "Coalesced reads: 'leader' ran the fetch, 'shared' awaited another request's",
+    ["name", "role"],
+)
+
+RATE_LIMITED = Counter(
+    "lockin_rate_limited_total",
+    "Requests rejected with 429 by the per-user rate limits",
+    ["route"],
+)
+
+CIRCUIT_STATE = Gauge(
+    "lockin_circuit_state",
+    "Circuit breaker state per external service: 0 closed, 1 half-open, 2 open",
+    ["service"],
+    multiprocess_mode="max",
+)
+
+GENERATION_QUEUE_DEPTH = Gauge(
+    "lockin_generation_queue_depth",
+    "Post generation jobs queued in this process, waiting for a worker",
+    multiprocess_mode="livesum",
+)
+
+GENERATION_WAIT_SECONDS = Histogram(
+    "lockin_generation_wait_seconds",
+    "Time from enqueueing a post generation job to a worker starting it",
+    buckets=LATENCY_BUCKETS + (60.0, 300.0, 900.0),
+)
+
+
+def metrics_payload() -> tuple:
+    """
+    Render all metrics in the Prometheus text format.
+    With PROMETHEUS_MULTIPROC_DIR set (uvicorn --workers N) samples from every worker are merged.
+    """
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -1,14 +1,23 @@
-import httpx
+from app.services.outbound import outbound_client
 import jwt
 import time
 import base64
 import os
+from typing import Dict, List
+from app.services.log import get_logger
+
+logger = get_logger(__name__)
 
 # APNs configuration
 APNS_KEY_ID = os.getenv("APNS_KEY_ID")
 APNS_TEAM_ID = os.getenv("APNS_TEAM_ID")
 APNS_KEY_BASE64 = os.getenv("APNS_KEY_BASE64")
 APNS_BUNDLE_ID = "cloud.lockin.app"
+APNS_PRODUCTION_URL = os.getenv("APNS_PRODUCTION_URL", "https://api.push.apple.com")
+APNS_SANDBOX_URL = os.getenv("APNS_SANDBOX_URL", "https://api.sandbox.push.apple.com")
+
+# Deadline pushes group under one thread in Notification Center
+DEADLINE_THREAD_ID = "goal-deadlines"
 
 def generate_apns_token():
     """Generate JWT token for APNs authentication"""
@@ -36,29 +45,67 @@ async def send_goal_notification(apns_token: str, goal_title: str, goal_id: str,
     Send push notification via APNs
     Automatically tries production first, falls back to sandbox if BadDeviceToken
     """
+    payload = {
+        "aps": {
+            "alert": {
+                "title": "Goal deadline in 2 hours",
+                "body": goal_title,
+                "subtitle": preview_text[:100] if preview_text else ""
+            },
+            "sound": "default",
+            "badge": 1,
+            "mutable-content": 1,
+            "category": "GOAL_DEADLINE",
+            "thread-id": DEADLINE_THREAD_ID
+        },
+        "goal_id": goal_id,
+        "type": "goal_deadline"
+    }
+    
+    return await _send_with_fallback(apns_token, payload, collapse_id=f"goal-{goal_id}", goal_id=goal_id)
+
+async def send_deadline_summary_notification(apns_token: str, goals: List[Dict], collapse_id: str, max_titles: int = 3):
+    """
+    One push for several goals due in the same window. Shares the deadline thread
+    with single notifications; collapse_id replaces an earlier summary for the same window.
+    """
+    titles = [goal["title"] for goal in goals[:max_titles]]
+    body = ", ".join(titles)
+    if len(goals) > len(titles):
+        body += f" and {len(goals) - len(titles)} more"
+    
+    payload = {
+        "aps": {
+            "alert": {
+                "title": f"{len(goals)} goals due in 2 hours",
+                "body": body
+            },
+            "sound": "default",
+            "badge": len(goals),
+            "mutable-content": 1,
+            "category": "GOAL_DEADLINE",
+            "thread-id": DEADLINE_THREAD_ID
+        },
+        # goal_id keeps older app versions deep-linking to the first goal
+        "goal_id": goals[0]["id"],
+        "goal_ids": [goal["id"] for goal in goals],
+        "type": "goal_deadline_summary"
+    }
+    
+    return await _send_with_fallback(apns_token, payload, collapse_id=collapse_id, goal_id=goals[0]["id"])
+
+async def _send_with_fallback(apns_token: str, payload: Dict, collapse_id: str, goal_id: str):
     # Try production first (for App Store/TestFlight users)
-    success = await _send_to_apns(
-        apns_token, 
-        goal_title, 
-        goal_id, 
-        preview_text,
-        server="api.push.apple.com"
-    )
+    success = await _send_to_apns(apns_token, payload, collapse_id, goal_id, server=APNS_PRODUCTION_URL)
     
     if not success:
         # If production fails with BadDeviceToken, try sandbox (for development)
-        print("Production failed, trying sandbox APNs...")
-        success = await _send_to_apns(
-            apns_token,
-            goal_title,
-            goal_id,
-            preview_text,
-            server="api.sandbox.push.apple.com"
-        )
+        logger.info("apns_sandbox_fallback", goal_id=goal_id)
+        success = await _send_to_apns(apns_token, payload, collapse_id, goal_id, server=APNS_SANDBOX_URL)
     
     return success
 
-async def _send_to_apns(apns_token: str, goal_title: str, goal_id: str, preview_text: str, server: str):
+async def _send_to_apns(apns_token: str, payload: Dict, collapse_id: str, goal_id: str, server: str):
     """
     Internal function to send to specific APNs server
     """
@@ -66,34 +113,18 @@ async def _send_to_apns(apns_token: str, goal_title: str, goal_id: str, preview_
         # Generate JWT auth token
         auth_token = generate_apns_token()
         
-        # Prepare notification payload
-        payload = {
-            "aps": {
-                "alert": {
-                    "title": "Goal deadline in 2 hours",
-                    "body": goal_title,
-                    "subtitle": preview_text[:100] if preview_text else ""
-                },
-                "sound": "default",
-                "badge": 1,
-                "mutable-content": 1,
-                "category": "GOAL_DEADLINE"
-            },
-            "goal_id": goal_id,
-            "type": "goal_deadline"
-        }
-        
         # APNs HTTP/2 endpoint
-        url = f"https://{server}/3/device/{apns_token}"
+        url = f"{server}/3/device/{apns_token}"
         
         headers = {
             "authorization": f"bearer {auth_token}",
             "apns-topic": APNS_BUNDLE_ID,
             "apns-priority": "10",
-            "apns-push-type": "alert"
+            "apns-push-type": "alert",
+            "apns-collapse-id": collapse_id[:64]
         }
         
-        async with httpx.AsyncClient(http2=True) as client:
+        async with outbound_client("apns", http2=True) as client:
             response = await client.post(
                 url,
                 json=payload,
@@ -102,20 +133,20 @@ async def _send_to_apns(apns_token: str, goal_title: str, goal_id: str, preview_
             )
             
             if response.status_code == 200:
-                print(f"Successfully sent notification via {server} to {apns_token[:20]}...")
+                logger.info("apns_sent", server=server, goal_id=goal_id, device=apns_token[:20])
                 return True
             elif response.status_code == 400:
                 error_data = response.json()
                 if error_data.get("reason") == "BadDeviceToken":
-                    print(f"BadDeviceToken on {server}, token may be for other environment")
+                    logger.info("apns_bad_device_token", server=server, goal_id=goal_id)
                     return False
                 else:
-                    print(f"Failed to send notification on {server}: {response.status_code} - {response.text}")
+                    logger.warning("apns_failed", server=server, goal_id=goal_id, status=response.status_code, body=response.text)
                     return False
             else:
-                print(f"Failed to send notification on {server}: {response.status_code} - {response.text}")
+                logger.warning("apns_failed", server=server, goal_id=goal_id, status=response.status_code, body=response.text)
                 return False
     
     except Exception as e:
-        print(f"Error sending APNs notification to {server}: {e}")
+        logger.error("apns_error", server=server, goal_id=goal_id, error=str(e))
         return False
\ No newline at end of file
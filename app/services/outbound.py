@@ -0,0 +1,99 @@
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+import httpx
+from app.services.metrics import OUTBOUND_REQUEST_SECONDS, OUTBOUND_RESPONSES
+from app.services.circuit_breaker import CircuitOpenError, get_breaker
+
+# Benchmarks route outbound calls to in-process fakes by installing a factory here
+_transport_factory: Optional[Callable[[str], httpx.AsyncBaseTransport]] = None
+
+
+def _record(service: str, started: float, status: str):
+    OUTBOUND_REQUEST_SECONDS.labels(service).observe(time.perf_counter() - started)
+    OUTBOUND_RESPONSES.labels(service, status).inc()
+
+
+def _admit(service: str):
+    """Fail fast while the service's breaker is open"""
+    try:
+        get_breaker(service).before_call()
+    except CircuitOpenError:
+        OUTBOUND_RESPONSES.labels(service, "circuit_open").inc()
+        raise
+
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    """
+    Async transport that records latency and status for one external service
+    and feeds its circuit breaker (transport errors and 5xx count as failures)
+    """
+
+    def __init__(self, service: str, transport: httpx.AsyncBaseTransport):
+        self.service = service
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _admit(self.service)
+        breaker = get_breaker(self.service)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            _record(self.service, started, "error")
+            breaker.record(False)
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        _record(self.service, started, str(response.status_code))
+        breaker.record(response.status_code < 500)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+@contextmanager
+def track_outbound(service: str):
+    """
+    Record latency/status around an SDK call that manages its own HTTP client (OpenAI),
+    behind the service's circuit breaker
+
+        with track_outbound("openai"):
+            client.chat.completions.create(...)
+    """
+    _admit(service)
+    breaker = get_breaker(service)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        status = getattr(e, "status_code", None)
+        _record(service, started, str(status) if status else "error")
+        # 4xx means the request was bad, not that the service is down
+        breaker.record(status is not None and status < 500)
+        raise
+    except BaseException:
+        breaker.release()
+        raise
+    _record(service, started, "200")
+    breaker.record(True)
+
+
+def outbound_client(service: str, http2: bool = False, **kwargs) -> httpx.AsyncClient:
+    """
+    Create an httpx.AsyncClient for calls to an external service
+    (twitter, linkedin, apns, ...) with latency/status metrics attached
+    """
+    if _transport_factory is not None:
+        inner = _transport_factory(service)
+    else:
+        inner = httpx.AsyncHTTPTransport(http2=http2)
+    return httpx.AsyncClient(transport=InstrumentedAsyncTransport(service, inner), **kwargs)
+
+
+def set_transport_factory(factory: Optional[Callable[[str], httpx.AsyncBaseTransport]]):
+    """Override the transport used for every outbound service (None restores the network)"""
+    global _transport_factory
+    _transport_factory = factory
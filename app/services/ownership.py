@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from typing import Iterable, Optional
+from fastapi import HTTPException
+from app.auth import get_supabase_client
+from config import get_settings
+
+settings = get_settings()
+
+
+class _LRU:
+    """Small per-process LRU for mappings that never change once written"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+# A goal never changes owner and a post never moves to another goal, so hits
+# need no revalidation; only deletions have to be forgotten
+_goal_owners = _LRU(settings.ownership_cache_size)
+_post_goals = _LRU(settings.ownership_cache_size)
+
+
+def remember_goal_owner(goal_id: str, user_id: str):
+    _goal_owners.set(goal_id, user_id)
+
+
+def forget_goals(goal_ids: Iterable[str]):
+    for goal_id in goal_ids:
+        _goal_owners.delete(goal_id)
+
+
+def goal_owner(goal_id: str) -> Optional[str]:
+    """Owner of a goal, or None if it doesn't exist"""
+    user_id = _goal_owners.get(goal_id)
+    if user_id is not None:
+        return user_id
+
+    supabase = get_supabase_client()
+    goal_response = supabase.table("goals")\
+        .select("user_id")\
+        .eq("id", goal_id)\
+        .limit(1)\
+        .execute()
+
+    if not goal_response.data:
+        return None
+
+    user_id = goal_response.data[0]["user_id"]
+    _goal_owners.set(goal_id, user_id)
+    return user_id
+
+
+def post_owner(post_id: str) -> Optional[tuple]:
+    """(goal_id, user_id) for a post in one joined query, or None if it doesn't exist"""
+    goal_id = _post_goals.get(post_id)
+    user_id = _goal_owners.get(goal_id) if goal_id else None
+    if user_id is not None:
+        return goal_id, user_id
+
+    supabase = get_supabase_client()
+    post_response = supabase.table("generated_posts")\
+        .select("goal_id, goals(user_id)")\
+        .eq("id", post_id)\
+        .limit(1)\
+        .execute()
+
+    if not post_response.data:
+        return None
+
+    post = post_response.data[0]
+    goal_id, user_id = post["goal_id"], post["goals"]["user_id"]
+    _post_goals.set(post_id, goal_id)
+    _goal_owners.set(goal_id, user_id)
+    return goal_id, user_id
+
+
+def require_goal_owner(goal_id: str, user_id: str):
+    """404 unless the goal exists and belongs to the user"""
+    if goal_owner(goal_id) != user_id:
+        raise HTTPException(status_code=404, detail="Goal not found")
+
+
+def require_post_owner(post_id: str, user_id: str) -> str:
+    """Goal id of the post; 404 if it doesn't exist, 403 if it isn't the user's"""
+    owner = post_owner(post_id)
+    if owner is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    goal_id, owner_id = owner
+    if owner_id != user_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    return goal_id
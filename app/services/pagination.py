@@ -0,0 +1,26 @@
+import base64
+import json
+from typing import List, Optional
+
+
+def encode_cursor(*values) -> str:
+    """Opaque keyset cursor for the last row of a page"""
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], size: int) -> Optional[List]:
+    """Inverse of encode_cursor; raises ValueError for anything we didn't issue"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError("Invalid cursor")
+    # Values go into a PostgREST or=(...) filter; refuse anything that could break out of it
+    if any(c in v for v in values for c in ',()"\\'):
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,100 @@
+from typing import List, Optional, Tuple
+from app.auth import get_supabase_client
+from config import get_settings
+from app.services.outbound import track_outbound
+from app.services.read_cache import POSTS, invalidate
+
+settings = get_settings()
+
+# Post fields returned by generation (and used to decide what to skip)
+POST_COLUMNS = "id, goal_id, social_account_id, content, edited_content, posted_at"
+
+# Built on first use; the openai SDK import alone is the slowest part of startup
+_openai_client = None
+
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        from openai import OpenAI
+        _openai_client = OpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None
+        )
+    return _openai_client
+
+
+def generate_post_content(goal: dict, platform: str) -> str:
+    """One celebratory post for the platform (blocking OpenAI call)"""
+    prompt = f"""Generate a celebratory social media post for {platform} announcing completion of this goal:
+
+Title: {goal['title']}
+Description: {goal['description']}
+
+Requirements for {platform}:
+- Authentic and personal tone
+- 1-3 sentences
+- Include relevant emoji
+- No generic corporate speak
+{"- Keep under 280 characters" if platform == "twitter" else ""}
+"""
+
+    with track_outbound("openai"):
+        response = get_openai_client().chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=100
+        )
+
+    return response.choices[0].message.content
+
+
+def generate_posts_for_goal(goal_id: str, user_id: str, force: bool = False) -> Optional[Tuple[List[dict], int]]:
+    """
+    Make sure the goal has one post per selected social account and return
+    (posts, number generated), or None if the goal doesn't exist for the user.
+
+    Accounts that already have a post cost no LLM call, so repeated requests and
+    resumed jobs are free; force=True regenerates them, except posts already
+    published. Writes upsert on (goal_id, social_account_id), so concurrent
+    generations for a goal leave one row per account.
+    """
+    supabase = get_supabase_client()
+
+    goal_response = supabase.table("goals")\
+        .select(f"id, title, description, goal_social_selections(social_accounts(id, platform)), generated_posts({POST_COLUMNS})")\
+        .eq("id", goal_id)\
+        .eq("user_id", user_id)\
+        .limit(1)\
+        .execute()
+
+    if not goal_response.data:
+        # Goal deleted since the job was queued
+        return None
+
+    goal = goal_response.data[0]
+    existing = {post["social_account_id"]: post for post in goal["generated_posts"]}
+
+    posts = []
+    generated = 0
+    for selection in goal["goal_social_selections"]:
+        account = selection["social_accounts"]
+        post = existing.get(account["id"])
+        if post is not None and (not force or post["posted_at"]):
+            posts.append(post)
+            continue
+
+        content = generate_post_content(goal, account["platform"])
+
+        post = supabase.table("generated_posts").upsert({
+            "goal_id": goal_id,
+            "social_account_id": account["id"],
+            "content": content,
+            "edited_content": None,
+        }, on_conflict="goal_id,social_account_id").execute().data[0]
+        posts.append(post)
+        generated += 1
+
+    if generated:
+        invalidate(user_id, POSTS)
+    return posts, generated
@@ -0,0 +1,292 @@
+"""
+Admin-only profiling.
+
+Requests carrying a valid X-Profile token run under cProfile (see
+ProfilingMiddleware); the stack sampler records where the job process spends
+wall-clock time. Both are served from /debug/profiles: request profiles and,
+by default, sampler dumps are files in `profile_dir`; with
+`job_sampler_store = "supabase"` the dumps go to the job_profiles table
+instead, so a separate job worker's samples reach the web service.
+Mint a token with:
+
+    python -m app.services.profiling --ttl 600
+"""
+import argparse
+import cProfile
+import hashlib
+import hmac
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from config import get_settings
+from app.services.log import get_logger
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Profile file names as listed and downloaded (no path separators)
+PROFILE_NAME = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+REPO_ROOT = str(Path(__file__).resolve().parents[2]) + os.sep
+
+
+def profiling_enabled() -> bool:
+    return bool(settings.profiling_secret)
+
+
+def _signature(expires: int) -> str:
+    return hmac.new(settings.profiling_secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+
+
+def sign_profile_token(ttl_seconds: int) -> str:
+    """"<expires>.<hmac>" token for the X-Profile header, valid for ttl_seconds"""
+    expires = int(time.time()) + ttl_seconds
+    return f"{expires}.{_signature(expires)}"
+
+
+def verify_profile_token(token: Optional[str]) -> bool:
+    if not profiling_enabled() or not token:
+        return False
+    expires, _, signature = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(signature, _signature(int(expires)))
+
+
+def _profile_dir() -> Path:
+    path = Path(settings.profile_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def _prune():
+    """Keep the newest `profile_keep` files"""
+    files = sorted(_profile_dir().iterdir(), key=lambda f: f.stat().st_mtime, reverse=True)
+    for old in files[settings.profile_keep:]:
+        old.unlink(missing_ok=True)
+
+
+def new_profile_id() -> str:
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def save_request_profile(profile_id: str, profiler: cProfile.Profile, method: str, path: str, seconds: float):
+    """
+    Write req-<id>.prof (pstats dump, for snakeviz or pstats) and req-<id>.txt
+    (the slowest functions by cumulative time, with their callees)
+    """
+    directory = _profile_dir()
+    profiler.dump_stats(str(directory / f"req-{profile_id}.prof"))
+
+    text = io.StringIO()
+    text.write(f"{method} {path} {seconds * 1000:.1f}ms\n\n")
+    stats = pstats.Stats(profiler, stream=text)
+    stats.sort_stats("cumulative").print_stats(60)
+    stats.print_callees(30)
+    (directory / f"req-{profile_id}.txt").write_text(text.getvalue())
+
+    _prune()
+    logger.info("request_profiled", profile_id=profile_id, path=path, duration_ms=round(seconds * 1000, 1))
+
+
+def _stored_dumps() -> bool:
+    return settings.job_sampler_store == "supabase"
+
+
+def save_sampler_dump(name: str, folded: str):
+    """Keep one sampler dump, in profile_dir or the job_profiles table"""
+    if not _stored_dumps():
+        (_profile_dir() / name).write_text(folded)
+        _prune()
+        return
+
+    from app.auth import get_supabase_client
+    supabase = get_supabase_client()
+    supabase.table("job_profiles")\
+        .insert({"name": name, "folded": folded, "bytes": len(folded.encode())})\
+        .execute()
+    old = supabase.table("job_profiles")\
+        .select("name")\
+        .order("created_at", desc=True)\
+        .range(settings.profile_keep, settings.profile_keep + 100)\
+        .execute()
+    if old.data:
+        supabase.table("job_profiles")\
+            .delete()\
+            .in_("name", [row["name"] for row in old.data])\
+            .execute()
+
+
+def stored_dump(name: str) -> Optional[str]:
+    """A sampler dump from the job_profiles table, or None"""
+    if not _stored_dumps():
+        return None
+    from app.auth import get_supabase_client
+    response = get_supabase_client().table("job_profiles")\
+        .select("folded")\
+        .eq("name", name)\
+        .execute()
+    return response.data[0]["folded"] if response.data else None
+
+
+def list_profiles() -> List[Dict]:
+    profiles = []
+    if Path(settings.profile_dir).is_dir():
+        profiles = [
+            {"name": f.name, "bytes": f.stat().st_size, "modified": int(f.stat().st_mtime)}
+            for f in _profile_dir().iterdir()
+        ]
+    if _stored_dumps():
+        from app.auth import get_supabase_client
+        response = get_supabase_client().table("job_profiles")\
+            .select("name, bytes, created_at")\
+            .order("created_at", desc=True)\
+            .execute()
+        profiles += [
+            {
+                "name": row["name"],
+                "bytes": row["bytes"],
+                "modified": int(datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")).timestamp()),
+            }
+            for row in response.data
+        ]
+    return sorted(profiles, key=lambda p: p["modified"], reverse=True)
+
+
+def profile_file(name: str) -> Optional[Path]:
+    """A file in profile_dir by name, or None"""
+    if not PROFILE_NAME.match(name):
+        return None
+    path = Path(settings.profile_dir) / name
+    return path if path.is_file() else None
+
+
+def _is_idle(frame) -> bool:
+    # Threads parked in the event loop's select() or on a lock/queue wait
+    filename = frame.f_code.co_filename
+    return filename.endswith(("selectors.py", "threading.py"))
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(REPO_ROOT):
+        filename = filename[len(REPO_ROOT):]
+    else:
+        filename = "/".join(filename.split(os.sep)[-2:])
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Wall-clock sampler. Every `interval` seconds it records the stack of each
+    thread that isn't idle, as folded stacks ("thread;outer;...;inner count",
+    the input format of flamegraph.pl and speedscope). Every `flush_seconds`
+    the counts are saved as jobs-<pid>-<time>-<id>.folded (see save_sampler_dump)
+    and reset.
+    """
+
+    def __init__(self, interval: float, flush_seconds: float):
+        self.interval = interval
+        self.flush_seconds = flush_seconds
+        self._counts: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        logger.info("stack_sampler_started", interval_ms=round(self.interval * 1000, 1))
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while not self._stop.wait(self.interval):
+            self.sample()
+            if time.monotonic() - last_flush >= self.flush_seconds:
+                self.flush()
+                last_flush = time.monotonic()
+
+    def sample(self):
+        me = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident == me or _is_idle(frame):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(names.get(ident, "thread"))
+            stacks.append(";".join(reversed(stack)))
+        with self._lock:
+            self._counts.update(stacks)
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._counts.most_common())
+
+    def flush(self):
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+        if not counts:
+            return
+        name = f"jobs-{os.getpid()}-{new_profile_id()}.folded"
+        try:
+            save_sampler_dump(name, "".join(f"{stack} {count}\n" for stack, count in counts.most_common()))
+        except Exception as e:
+            logger.warning("stack_sampler_flush_failed", name=name, error=str(e))
+
+
+_sampler: Optional[StackSampler] = None
+
+
+def get_sampler() -> Optional[StackSampler]:
+    """The running job sampler in this process, if any"""
+    return _sampler
+
+
+def start_job_sampler():
+    """Start sampling when `job_sampler_interval_ms` is set"""
+    global _sampler
+    if settings.job_sampler_interval_ms <= 0 or _sampler is not None:
+        return
+    _sampler = StackSampler(settings.job_sampler_interval_ms / 1000, settings.job_sampler_flush_seconds)
+    _sampler.start()
+
+
+def stop_job_sampler():
+    global _sampler
+    if _sampler is not None:
+        _sampler.stop()
+        _sampler = None
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.services.profiling",
+                                     description="Print an X-Profile token (needs PROFILING_SECRET)")
+    parser.add_argument("--ttl", type=int, default=600, help="Seconds the token stays valid")
+    args = parser.parse_args()
+    if not profiling_enabled():
+        parser.error("PROFILING_SECRET is not set")
+    print(sign_profile_token(args.ttl))
+
+
+if __name__ == "__main__":
+    main()
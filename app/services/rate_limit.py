@@ -0,0 +1,121 @@
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+from fastapi import Depends, HTTPException
+from app.auth import get_current_user, get_supabase_client
+from config import get_settings
+from app.services.log import get_logger
+from app.services.metrics import RATE_LIMITED
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+
+def parse_limit(spec: str) -> Optional[Tuple[int, float]]:
+    """"5/60" -> (5, 60.0): bucket size and seconds to refill it from empty; "" -> None (no limit)"""
+    if not spec:
+        return None
+    capacity, seconds = spec.split("/")
+    return int(capacity), float(seconds)
+
+
+class RateLimiter(ABC):
+    """
+    Token buckets keyed by "<route>:<user_id>". A bucket holds up to `capacity`
+    tokens and refills continuously at capacity / period per second, so a user
+    can burst up to the capacity and then sustain one call per period / capacity.
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: int, period: float) -> float:
+        """Take one token; 0 if granted, else seconds until one is available"""
+
+
+class MemoryRateLimiter(RateLimiter):
+    """Per-process buckets; each uvicorn worker enforces its own copy of the limit"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: str, capacity: int, period: float) -> float:
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            granted = tokens >= 1
+            if granted:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            # Evicted buckets come back full, so the cap errs on the side of letting calls through
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return 0.0 if granted else (1 - tokens) / rate
+
+
+class SupabaseRateLimiter(RateLimiter):
+    """
+    Buckets in the rate_limit_buckets table, shared by every worker and host.
+    take_rate_limit_token() refills and takes in one locked statement, so
+    concurrent requests can't spend the same token.
+    """
+
+    def take(self, key: str, capacity: int, period: float) -> float:
+        supabase = get_supabase_client()
+        response = supabase.rpc("take_rate_limit_token", {
+            "bucket_key": key,
+            "capacity": capacity,
+            "refill_per_second": capacity / period,
+        }).execute()
+        return float(response.data or 0)
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """The configured limiter (`rate_limit_backend`: memory or supabase)"""
+    global _limiter
+    if _limiter is None:
+        if settings.rate_limit_backend == "memory":
+            _limiter = MemoryRateLimiter(settings.rate_limit_max_entries)
+        elif settings.rate_limit_backend == "supabase":
+            _limiter = SupabaseRateLimiter()
+        else:
+            raise ValueError(f"Unknown rate limit backend: {settings.rate_limit_backend}")
+    return _limiter
+
+
+def rate_limit(name: str):
+    """
+    Dependency charging one call to the user's `rate_limit_<name>` bucket.
+    Raises 429 with Retry-After once the bucket is empty. If the shared backend
+    can't be reached the call is let through rather than failing the request.
+    """
+    limit = parse_limit(getattr(settings, f"rate_limit_{name}"))
+
+    def check(current_user = Depends(get_current_user)):
+        if limit is None or settings.rate_limit_backend == "off":
+            return
+
+        try:
+            retry_after = get_rate_limiter().take(f"{name}:{current_user.id}", *limit)
+        except Exception as e:
+            logger.warning("rate_limit_check_failed", route=name, error=str(e))
+            return
+
+        if retry_after > 0:
+            RATE_LIMITED.labels(name).inc()
+            logger.info("rate_limited", route=name, user_id=current_user.id, retry_after=round(retry_after, 1))
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+    return check
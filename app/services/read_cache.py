@@ -0,0 +1,121 @@
+import multiprocessing
+import os
+import uuid
+from functools import lru_cache
+from typing import Any, Optional
+from config import get_settings
+from app.services.log import get_logger
+from app.services.state_store import get_state_store
+
+settings = get_settings()
+logger = get_logger(__name__)
+
+# Cached per user; each write path invalidates exactly the resources it touches
+GOALS = "goals"
+SOCIAL_ACCOUNTS = "social_accounts"
+# Generated posts aren't cached, but their version keys the single-flight fetches of them
+POSTS = "posts"
+
+# Version keys outlive the entries by far, and evict last in the bounded stores
+VERSION_TTL_SECONDS = 7 * 24 * 3600
+
+
+def multiple_workers() -> bool:
+    """True under `uvicorn --workers N` (spawned children) or WEB_CONCURRENCY > 1"""
+    return int(os.getenv("WEB_CONCURRENCY") or 1) > 1 or multiprocessing.parent_process() is not None
+
+
+@lru_cache()
+def backend() -> str:
+    """
+    The effective `read_cache_backend`. "auto" is memory for a single worker
+    and sqlite (shared on the host) for several, since an invalidation in
+    one worker's memory can't reach the others.
+    """
+    configured = settings.read_cache_backend
+    if configured == "auto":
+        return "sqlite" if multiple_workers() else "memory"
+    if configured == "memory" and multiple_workers():
+        logger.warning("read_cache_not_shared", backend=configured,
+                       detail="each worker caches separately; writes in one leave the others stale until the TTL")
+    return configured
+
+
+def _store():
+    return get_state_store(
+        "read_cache",
+        ttl_seconds=settings.read_cache_ttl_seconds,
+        backend=backend(),
+        max_entries=settings.read_cache_max_entries,
+    )
+
+
+def _version(store, user_id: str, resource: str) -> str:
+    """
+    Current version of (user, resource). A missing key (never written, expired
+    or evicted) gets a fresh random version rather than a constant, so an
+    entry stored under an earlier version can never become current again.
+    """
+    key = f"v:{resource}:{user_id}"
+    version = store.get(key)
+    if version is None:
+        version = uuid.uuid4().hex
+        store.set(key, version, ttl_seconds=VERSION_TTL_SECONDS)
+    return version
+
+
+class CachedRead:
+    """
+    Result of lookup(). On a miss, fill() caches the freshly loaded value under
+    the version seen at lookup time, so a load racing with a write is cached
+    under the old version and never served.
+    """
+
+    def __init__(self, key: Optional[str], value: Any = None):
+        self.key = key
+        self.value = value
+
+    def fill(self, value: Any) -> Any:
+        if self.key is not None:
+            _store().set(self.key, value)
+        self.value = value
+        return value
+
+
+def lookup(user_id: str, resource: str) -> CachedRead:
+    """Cached value for (user, resource); .value is None on a miss"""
+    if backend() == "off":
+        return CachedRead(None)
+
+    store = _store()
+    key = f"{resource}:{user_id}:{_version(store, user_id, resource)}"
+    return CachedRead(key, store.get(key))
+
+
+def current_version(user_id: str, *resources: str) -> Optional[str]:
+    """
+    The current versions of a user's resources, together; any write to one of
+    them changes it. None when the cache is off (versions aren't kept then).
+    """
+    if backend() == "off":
+        return None
+
+    store = _store()
+    return ":".join(_version(store, user_id, resource) for resource in resources)
+
+
+def invalidate(user_id: Optional[str], *resources: str):
+    """Drop the cached resources for a user after a write"""
+    if backend() == "off" or not user_id:
+        return
+
+    store = _store()
+    try:
+        for resource in resources:
+            old = store.get(f"v:{resource}:{user_id}")
+            store.set(f"v:{resource}:{user_id}", uuid.uuid4().hex, ttl_seconds=VERSION_TTL_SECONDS)
+            if old is not None:
+                store.delete(f"{resource}:{user_id}:{old}")
+    except Exception as e:
+        # A failed invalidation only means staleness until the TTL; never fail the write
+        logger.warning("read_cache_invalidate_failed", user_id=user_id, error=str(e))
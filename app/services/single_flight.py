@@ -0,0 +1,36 @@
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+from starlette.concurrency import run_in_threadpool
+from app.services.metrics import SINGLE_FLIGHT_CALLS
+
+# key -> the one fetch currently running for it
+_inflight: Dict[Hashable, asyncio.Task] = {}
+
+
+async def single_flight(name: str, key: Hashable, fn: Callable[..., Any], *args) -> Any:
+    """
+    Run blocking fn(*args) in the threadpool, sharing the call with every
+    concurrent caller using the same (name, key). Nothing is kept once the call
+    finishes: a request gets either the fetch already running when it arrived
+    or a new one. Callers must treat the shared result as read-only.
+
+    Keys should carry the version of the data read (see read_cache), so a
+    request made after a write never joins a fetch that started before it.
+    With key=None (no version known) the call is never shared.
+    """
+    if key is None:
+        SINGLE_FLIGHT_CALLS.labels(name, "leader").inc()
+        return await run_in_threadpool(fn, *args)
+
+    flight_key = (name, key)
+    task = _inflight.get(flight_key)
+    if task is None:
+        task = asyncio.ensure_future(run_in_threadpool(fn, *args))
+        _inflight[flight_key] = task
+        task.add_done_callback(lambda _: _inflight.pop(flight_key, None))
+        SINGLE_FLIGHT_CALLS.labels(name, "leader").inc()
+    else:
+        SINGLE_FLIGHT_CALLS.labels(name, "shared").inc()
+
+    # Shielded: a caller that disconnects doesn't cancel the fetch for the others
+    return await asyncio.shield(task)
@@ -0,0 +1,255 @@
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+from config import get_settings
+
+settings = get_settings()
+
+
+class StateStore(ABC):
+    """
+    Short-lived key/value store with per-entry TTL.
+    Keys are namespaced so several features can share one backend.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        ...
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def pop(self, key: str) -> Optional[Any]:
+        """Atomically read and remove an entry (each OAuth state is single use)"""
+
+    def delete(self, key: str):
+        self.pop(key)
+
+
+class MemoryStateStore(StateStore):
+    """
+    Per-process store. Bounded by max_entries; the oldest entries are evicted first.
+    Only safe with a single worker.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int):
+        super().__init__(namespace, ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _purge_expired(self, now: float):
+        # Entries are kept in insertion order, so expired ones sit at the front
+        # unless a custom TTL was used; stop at the first live entry.
+        while self._entries:
+            key, (expires_at, _) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        now = time.monotonic()
+        expires_at = now + (ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._purge_expired(now)
+            self._entries.pop(key, None)
+            self._entries[key] = (expires_at, value)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def pop(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteStateStore(StateStore):
+    """
+    Store backed by a local SQLite file, shared by every worker on the same host
+    (e.g. `uvicorn --workers N`).
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int, path: str):
+        super().__init__(namespace, ttl_seconds)
+        self.max_entries = max_entries
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS state_store (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS state_store_expires_at ON state_store (expires_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        now = time.time()
+        expires_at = now + (ttl_seconds or self.ttl_seconds)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM state_store WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "INSERT OR REPLACE INTO state_store (key, value, expires_at) VALUES (?, ?, ?)",
+                (self._key(key), json.dumps(value), expires_at)
+            )
+            # Evict the entries closest to expiry once the namespace is over its cap
+            conn.execute("""
+                DELETE FROM state_store WHERE key IN (
+                    SELECT key FROM state_store WHERE key LIKE ?
+                    ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (f"{self.namespace}:%", self.max_entries))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get(self, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "SELECT value FROM state_store WHERE key = ? AND expires_at > ?",
+            (self._key(key), time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def pop(self, key: str) -> Optional[Any]:
+        row = self._connect().execute(
+            "DELETE FROM state_store WHERE key = ? RETURNING value, expires_at",
+            (self._key(key),)
+        ).fetchone()
+        if not row or row[1] <= time.time():
+            return None
+        return json.loads(row[0])
+
+
+class SupabaseStateStore(StateStore):
+    """
+    Store backed by the `state_store` table, shared by every worker and host.
+    Expired rows are filtered on read and swept on write; the size cap is left
+    to the sweep since the table is shared across instances.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: int):
+        super().__init__(namespace, ttl_seconds)
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        from app.auth import get_supabase_client
+        supabase = get_supabase_client()
+        now = datetime.now(timezone.utc)
+        expires_at = now + timedelta(seconds=ttl_seconds or self.ttl_seconds)
+
+        supabase.table("state_store")\
+            .delete()\
+            .lte("expires_at", now.isoformat())\
+            .execute()
+
+        supabase.table("state_store")\
+            .upsert({
+                "key": self._key(key),
+                "value": value,
+                "expires_at": expires_at.isoformat()
+            }, on_conflict="key")\
+            .execute()
+
+    def get(self, key: str) -> Optional[Any]:
+        from app.auth import get_supabase_client
+        supabase = get_supabase_client()
+
+        response = supabase.table("state_store")\
+            .select("value")\
+            .eq("key", self._key(key))\
+            .gt("expires_at", datetime.now(timezone.utc).isoformat())\
+            .execute()
+
+        return response.data[0]["value"] if response.data else None
+
+    def pop(self, key: str) -> Optional[Any]:
+        from app.auth import get_supabase_client
+        supabase = get_supabase_client()
+
+        # DELETE ... RETURNING makes the read-and-remove atomic across workers
+        response = supabase.table("state_store")\
+            .delete()\
+            .eq("key", self._key(key))\
+            .execute()
+
+        if not response.data:
+            return None
+        row = response.data[0]
+        expires_at = datetime.fromisoformat(row["expires_at"].replace('Z', '+00:00'))
+        if expires_at <= datetime.now(timezone.utc):
+            return None
+        return row["value"]
+
+
+_stores: Dict[str, StateStore] = {}
+
+
+def get_state_store(
+    namespace: str,
+    ttl_seconds: Optional[int] = None,
+    backend: Optional[str] = None,
+    max_entries: Optional[int] = None,
+) -> StateStore:
+    """
+    Get the store for a namespace using the configured backend
+    (`state_store_backend`: memory, sqlite or supabase) unless `backend` is given
+    """
+    store = _stores.get(namespace)
+    if store is not None:
+        return store
+
+    ttl_seconds = ttl_seconds or settings.state_store_ttl_seconds
+    max_entries = max_entries or settings.state_store_max_entries
+    backend = backend or settings.state_store_backend
+
+    if backend == "memory":
+        store = MemoryStateStore(namespace, ttl_seconds, max_entries)
+    elif backend == "sqlite":
+        store = SQLiteStateStore(namespace, ttl_seconds, max_entries, settings.state_store_sqlite_path)
+    elif backend == "supabase":
+        store = SupabaseStateStore(namespace, ttl_seconds)
+    else:
+        raise ValueError(f"Unknown state store backend: {backend}")
+
+    _stores[namespace] = store
+    return store
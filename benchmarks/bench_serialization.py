@@ -0,0 +1,160 @@
+"""
+Serialization and compression micro-benchmark for the heaviest read
+endpoints: GET /goals/goals/history and GET /goals/goals/{goal_id}/posts.
+
+    python -m benchmarks.bench_serialization --history-goals 500 --output serialization.json
+
+Payloads are produced by the real endpoints running in-process against the
+fake database, then re-encoded in a loop the way FastAPI did before
+(jsonable_encoder + json.dumps) and does now (typed route + orjson), and
+compressed with gzip and brotli. Reports microseconds per response and
+bytes on the wire for each.
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from cryptography.fernet import Fernet
+
+from benchmarks.fakes.inprocess import mount_database
+from benchmarks.fakes.postgrest import FakeDatabase
+from benchmarks.fakes.seed import seed_database
+from benchmarks.loadtest import FAKE_SERVICE_KEY
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def per_call_us(fn: Callable[[], Any], iterations: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return round((time.perf_counter() - started) / iterations * 1e6, 1)
+
+
+def fetch_payloads(client, headers: Dict[str, str], goal_id: str) -> Dict[str, Any]:
+    """One history page, the whole history (what the unpaged endpoint used to return) and one goal's posts"""
+    identity = {**headers, "Accept-Encoding": "identity"}
+    page = client.get("/goals/goals/history", params={"limit": 100}, headers=identity)
+    page.raise_for_status()
+
+    full, cursor = [], None
+    while True:
+        params = {"limit": 100, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/goals/goals/history", params=params, headers=identity)
+        full += response.json()
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+
+    posts = client.get(f"/goals/goals/{goal_id}/posts", headers=identity)
+    posts.raise_for_status()
+    return {
+        "history_page": page.json(),
+        "history_full": full,
+        "goal_posts": posts.json(),
+    }
+
+
+def measure(data: List[Dict[str, Any]], iterations: int, gzip_level: int, brotli_quality: int) -> Dict:
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from starlette.responses import JSONResponse
+
+    from app.responses import ORJSONResponse
+
+    adapter = TypeAdapter(List[Dict[str, Any]])
+
+    def fastapi_default() -> bytes:
+        return JSONResponse(jsonable_encoder(data)).body
+
+    def typed_orjson() -> bytes:
+        # What FastAPI does for a route annotated -> List[Dict[str, Any]] with ORJSONResponse as default
+        return ORJSONResponse(adapter.dump_python(adapter.validate_python(data), mode="json")).body
+
+    body = typed_orjson()
+    assert json.loads(body) == json.loads(fastapi_default())
+
+    result = {
+        "rows": len(data),
+        "json_bytes": len(body),
+        "encode_us": {
+            "jsonable_encoder+json": per_call_us(fastapi_default, iterations),
+            "typed+orjson": per_call_us(typed_orjson, iterations),
+        },
+        "compression": {},
+    }
+    encoders = {f"gzip-{gzip_level}": lambda: gzip.compress(body, compresslevel=gzip_level, mtime=0)}
+    if brotli is not None:
+        encoders[f"br-{brotli_quality}"] = lambda: brotli.compress(body, quality=brotli_quality)
+    for name, encode in encoders.items():
+        compressed = encode()
+        result["compression"][name] = {
+            "bytes": len(compressed),
+            "ratio": round(len(compressed) / len(body), 3) if body else 1.0,
+            "us": per_call_us(encode, iterations),
+        }
+    return result
+
+
+def print_report(report: Dict):
+    for name, result in report["payloads"].items():
+        encode = result["encode_us"]
+        print(f"{name}: {result['rows']} rows, {result['json_bytes']} bytes")
+        print(f"  encode    jsonable_encoder+json {encode['jsonable_encoder+json']}us  "
+              f"typed+orjson {encode['typed+orjson']}us")
+        for codec, stats in result["compression"].items():
+            print(f"  {codec:<9} {stats['bytes']} bytes ({stats['ratio']:.0%}) in {stats['us']}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history-goals", type=int, default=500, help="Completed goals for the user")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=4)
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    encryption_key = Fernet.generate_key().decode()
+    os.environ.update({
+        "SUPABASE_URL": "http://supabase.bench",
+        "SUPABASE_SERVICE_KEY": FAKE_SERVICE_KEY,
+        "ENCRYPTION_KEY": encryption_key,
+        "OPENAI_API_KEY": "sk-bench",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+    })
+    from fastapi.testclient import TestClient
+
+    import main as app_main
+
+    db = FakeDatabase()
+    user = seed_database(db, 1, 1, encryption_key, seed=args.seed, completed_per_user=args.history_goals)[0]
+    mount_database(db.handle)
+
+    # No `with`: skips the lifespan so the background jobs don't start
+    client = TestClient(app_main.app)
+    payloads = fetch_payloads(client, {"Authorization": f"Bearer {user['token']}"}, user["goal_ids"][0])
+
+    report = {
+        "config": vars(args),
+        "payloads": {
+            name: measure(data, args.iterations, args.gzip_level, args.brotli_quality)
+            for name, data in payloads.items()
+        },
+    }
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Cold start benchmark: how long a fresh process takes to import the app and
+how long a new uvicorn worker takes to answer its first GET /health.
+
+    python -m benchmarks.bench_startup --runs 5 --output startup.json
+
+Import time comes from `python -X importtime -c "import main"` in a fresh
+interpreter, with the slowest top-level imports listed. The /health timing
+starts uvicorn against the local fakes (so the background jobs have
+something to talk to) and polls until the first 200.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from cryptography.fernet import Fernet
+
+from benchmarks.loadtest import REPO_ROOT, app_environment, free_port, start_fakes, wait_for
+
+
+def import_profile(env: Dict[str, str]) -> Dict[str, int]:
+    """Cumulative microseconds per module from -X importtime, for one fresh interpreter"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    # Lines come children-first; keep the direct imports listed just before `main`
+    cumulative, pending = {}, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        if not cumulative_us.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            pending[name.strip()] = int(cumulative_us)
+        elif depth == 0:
+            if name.strip() == "main":
+                cumulative = {**pending, "main": int(cumulative_us)}
+            pending = {}
+    return cumulative
+
+
+def time_to_health(env: Dict[str, str], timeout: float) -> float:
+    """Seconds from spawning uvicorn to the first 200 from /health"""
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=REPO_ROOT, env=env,
+    )
+    try:
+        url = f"http://127.0.0.1:{port}/health"
+        deadline = started + timeout
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with {process.returncode}")
+            try:
+                if httpx.get(url, timeout=1.0).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"Timed out waiting for {url}")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "min": round(min(values), 1),
+        "median": round(statistics.median(values), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to list")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--env", action="append", help="KEY=VALUE passed to the app (repeatable)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    encryption_key = Fernet.generate_key().decode()
+    fakes_port = free_port()
+    fakes_args = argparse.Namespace(
+        users=1, goals_per_user=1, completed_per_user=0, seed=1, fault=["db=latency=0"],
+    )
+    fakes = start_fakes(fakes_args, encryption_key, fakes_port)
+    try:
+        fakes_url = f"http://127.0.0.1:{fakes_port}"
+        wait_for(f"{fakes_url}/health", args.timeout, fakes)
+        env = app_environment(argparse.Namespace(env=args.env), encryption_key, fakes_url)
+        env.setdefault("PYTHONDONTWRITEBYTECODE", "1")
+
+        profiles = [import_profile(env) for _ in range(args.runs)]
+        health_ms = [time_to_health(env, args.timeout) * 1000 for _ in range(args.runs)]
+    finally:
+        fakes.terminate()
+        fakes.wait(timeout=10)
+
+    modules = {name for profile in profiles for name in profile} - {"main"}
+    slowest = sorted(
+        ((name, statistics.median(p.get(name, 0) for p in profiles) / 1000) for name in modules),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+
+    report = {
+        "config": vars(args),
+        "python": sys.version.split()[0],
+        "import_main_ms": summarize([p["main"] / 1000 for p in profiles]),
+        "first_health_ms": summarize(health_ms),
+        "slowest_imports_ms": {name: round(ms, 1) for name, ms in slowest},
+    }
+
+    print(f"import main      {report['import_main_ms']['median']}ms median "
+          f"({report['import_main_ms']['min']}-{report['import_main_ms']['max']})")
+    print(f"first /health    {report['first_health_ms']['median']}ms median "
+          f"({report['first_health_ms']['min']}-{report['first_health_ms']['max']})")
+    for name, ms in report["slowest_imports_ms"].items():
+        print(f"  {name:<40} {ms}ms")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
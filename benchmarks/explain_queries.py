@@ -0,0 +1,311 @@
+"""
+Index check for the hot queries: applies migrations/ to a scratch schema in a
+local Postgres, seeds it with a realistic skew (mostly completed history, a
+thin band of open goals) and runs EXPLAIN on the SQL each job and read path
+sends through PostgREST. Fails if any of them doesn't scan the table it filters
+through the index meant for it (tests/test_explain_queries.py runs the same
+check under pytest when DATABASE_URL is set).
+
+    python -m benchmarks.explain_queries --dsn postgresql://localhost/postgres
+    python -m benchmarks.explain_queries --users 5000 --output plans.json
+
+Needs `psycopg` (not an app dependency) and a Postgres 13+ to talk to; the
+scratch schema is dropped afterwards unless --keep is given. The tables the
+Supabase project manages itself (goals, generated_posts, ...) are created here
+with the columns the app uses (and its anon/authenticated/service_role roles,
+if the server lacks them), then every migration runs in filename order.
+"""
+import argparse
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+from benchmarks.loadtest import REPO_ROOT
+
+MIGRATIONS_DIR = REPO_ROOT / "migrations"
+
+# Supabase-managed tables, reduced to the columns the app reads and writes
+BASE_SCHEMA = """
+CREATE TABLE goals (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT,
+    deadline TIMESTAMPTZ NOT NULL,
+    original_deadline TIMESTAMPTZ,
+    completed BOOLEAN NOT NULL DEFAULT false,
+    completed_at TIMESTAMPTZ,
+    notification_sent BOOLEAN NOT NULL DEFAULT false,
+    total_postponed_minutes INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE social_accounts (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    platform TEXT NOT NULL,
+    platform_user_id TEXT,
+    username TEXT,
+    access_token_encrypted TEXT,
+    refresh_token_encrypted TEXT,
+    token_expires_at TIMESTAMPTZ,
+    connected_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE goal_social_selections (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    goal_id UUID NOT NULL REFERENCES goals(id) ON DELETE CASCADE,
+    social_account_id UUID NOT NULL REFERENCES social_accounts(id) ON DELETE CASCADE
+);
+
+CREATE TABLE generated_posts (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    goal_id UUID NOT NULL REFERENCES goals(id) ON DELETE CASCADE,
+    social_account_id UUID REFERENCES social_accounts(id) ON DELETE CASCADE,
+    content TEXT NOT NULL,
+    edited_content TEXT,
+    posted_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE user_devices (
+    user_id UUID PRIMARY KEY,
+    apns_token TEXT,
+    fcm_token TEXT,
+    platform TEXT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+# The API roles every Supabase project has, which the migrations grant to and
+# revoke from. Roles are cluster-wide, so they're only created when missing
+API_ROLES = """
+DO $$
+DECLARE
+    role_name TEXT;
+BEGIN
+    FOREACH role_name IN ARRAY ARRAY['anon', 'authenticated'] LOOP
+        IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = role_name) THEN
+            EXECUTE format('CREATE ROLE %I NOLOGIN', role_name);
+        END IF;
+    END LOOP;
+    IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+        CREATE ROLE service_role NOLOGIN BYPASSRLS;
+    END IF;
+END
+$$;
+"""
+
+# Per user: two accounts, a device, `open_goals` upcoming goals (one overdue
+# for every 50 users) and `completed_goals` of history, each with a post and
+# a selection per account. Job tables get mostly finished rows.
+SEED = """
+INSERT INTO social_accounts (user_id, platform, platform_user_id, username)
+SELECT u.id, p.platform, p.platform || '-' || u.n, 'user_' || u.n
+FROM (SELECT n, md5('user' || n)::uuid AS id FROM generate_series(1, %(users)s) n) u
+CROSS JOIN (VALUES ('twitter'), ('linkedin')) p(platform);
+
+INSERT INTO user_devices (user_id, apns_token, platform)
+SELECT md5('user' || n)::uuid, md5('device' || n), 'ios' FROM generate_series(1, %(users)s) n;
+
+INSERT INTO goals (user_id, title, description, deadline, original_deadline, completed, completed_at, notification_sent)
+SELECT md5('user' || u)::uuid, 'Goal ' || g, 'Ship the thing',
+       d, d, completed, CASE WHEN completed THEN d END, completed OR d < now() + interval '2 hours'
+FROM generate_series(1, %(users)s) u
+CROSS JOIN generate_series(1, %(open_goals)s + %(completed_goals)s) g
+CROSS JOIN LATERAL (SELECT g > %(open_goals)s AS completed) c
+CROSS JOIN LATERAL (
+    SELECT CASE
+        WHEN completed THEN now() - (random() * interval '365 days')
+        WHEN g = 1 AND u %% 50 = 0 THEN now() - interval '5 minutes'
+        ELSE now() + interval '1 hour' + (random() * interval '47 hours')
+    END AS d
+) t;
+
+INSERT INTO goal_social_selections (goal_id, social_account_id)
+SELECT g.id, s.id FROM goals g JOIN social_accounts s ON s.user_id = g.user_id;
+
+INSERT INTO generated_posts (goal_id, social_account_id, content, posted_at)
+SELECT g.id, s.id, 'Locked in', CASE WHEN g.completed THEN g.deadline END
+FROM goals g JOIN social_accounts s ON s.user_id = g.user_id;
+
+INSERT INTO generation_jobs (goal_id, user_id, status, finished_at)
+SELECT id, user_id, CASE WHEN completed THEN 'completed' ELSE 'pending' END,
+       CASE WHEN completed THEN deadline END
+FROM goals WHERE completed OR random() < 0.01;
+
+INSERT INTO account_deletion_jobs (user_id, status, finished_at)
+SELECT md5('gone' || n)::uuid, 'completed', now() FROM generate_series(1, %(users)s / 10) n;
+
+INSERT INTO account_deletion_jobs (user_id) VALUES (gen_random_uuid());
+
+ANALYZE;
+"""
+
+# (name, table the query filters, index it should use, SQL as PostgREST sends
+# it). %(user_id)s, %(goal_id)s and %(goal_ids)s are filled from the seeded data.
+QUERIES: List[Tuple[str, str, str, str]] = [
+    ("deadline_checker: due goals", "goals", "goals_open_deadline", """
+        SELECT id, user_id, title, deadline FROM goals
+        WHERE completed = false AND notification_sent = false
+          AND deadline >= now() + interval '119 minutes' AND deadline <= now() + interval '121 minutes'
+    """),
+    ("deadline_checker: devices", "user_devices", "user_devices_pkey", """
+        SELECT user_id, apns_token FROM user_devices WHERE user_id = ANY(%(user_ids)s)
+    """),
+    ("deadline_checker: previews", "generated_posts", "generated_posts_goal_account", """
+        SELECT goal_id, content, edited_content FROM generated_posts WHERE goal_id = ANY(%(goal_ids)s)
+    """),
+    ("auto_poster: expired goals", "goals", "goals_open_deadline", """
+        SELECT id, user_id, deadline FROM goals WHERE completed = false AND deadline <= now()
+    """),
+    ("auto_poster / get_goal_posts: posts of a goal", "generated_posts", "generated_posts_goal_account", """
+        SELECT id, content, edited_content, posted_at FROM generated_posts WHERE goal_id = %(goal_id)s
+    """),
+    ("get_goals: open goals by deadline", "goals", "goals_user_open_deadline", """
+        SELECT id, title, deadline FROM goals
+        WHERE user_id = %(user_id)s AND completed = false ORDER BY deadline
+    """),
+    ("get_goals: selections of a goal", "goal_social_selections", "goal_social_selections_goal_id", """
+        SELECT social_account_id FROM goal_social_selections WHERE goal_id = %(goal_id)s
+    """),
+    ("history: first page", "goals", "goals_user_history", """
+        SELECT id, title, completed_at FROM goals
+        WHERE user_id = %(user_id)s AND completed = true AND completed_at IS NOT NULL
+        ORDER BY completed_at DESC, id DESC LIMIT 21
+    """),
+    ("social accounts of a user", "social_accounts", "social_accounts_user_platform", """
+        SELECT id, platform, username FROM social_accounts WHERE user_id = %(user_id)s
+    """),
+    ("account_deletion: goals of a user", "goals", "goals_user_id", """
+        SELECT id FROM goals WHERE user_id = %(user_id)s LIMIT 500
+    """),
+    ("post_generation: job sweep", "generation_jobs", "generation_jobs_status_created", """
+        SELECT id, goal_id, user_id, created_at FROM generation_jobs
+        WHERE (status = 'pending' OR (status = 'running' AND updated_at < now() - interval '10 minutes'))
+          AND (next_attempt_at IS NULL OR next_attempt_at <= now())
+        ORDER BY created_at LIMIT 8
+    """),
+    ("account_deletion: job sweep", "account_deletion_jobs", "account_deletion_jobs_active_user", """
+        SELECT id, user_id, status FROM account_deletion_jobs
+        WHERE status = 'pending' OR (status = 'running' AND updated_at < now() - interval '10 minutes')
+        ORDER BY created_at LIMIT 10
+    """),
+]
+
+INDEX_NODES = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+
+
+def plan_nodes(plan: Dict) -> Iterator[Dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def scan_of(plan: Dict, table: str) -> Tuple[str, str]:
+    """(node type, index name) of the node that reads `table`"""
+    for node in plan_nodes(plan):
+        if node.get("Relation Name") != table:
+            continue
+        index = node.get("Index Name")
+        if node["Node Type"] == "Bitmap Heap Scan":
+            index = ", ".join(n["Index Name"] for n in plan_nodes(node) if n.get("Index Name"))
+        return node["Node Type"], index or ""
+    return "missing", ""
+
+
+def apply_migrations(cursor):
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        cursor.execute(path.read_text())
+
+
+@contextmanager
+def scratch_schema(cursor, schema: str, keep: bool = False):
+    """Run the block with `schema` (dropped and recreated) first on the search_path"""
+    cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+    cursor.execute(f"CREATE SCHEMA {schema}")
+    cursor.execute(f"SET search_path TO {schema}, public")
+    try:
+        yield
+    finally:
+        if not keep:
+            cursor.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+
+
+def explain_queries(cursor, users: int, open_goals: int, completed_goals: int) -> List[Dict]:
+    """
+    Create and seed the tables in the current schema, then EXPLAIN every query.
+    The cursor must bind client-side (psycopg.ClientCursor): the seed is
+    several statements in one execute.
+    """
+    cursor.execute(API_ROLES)
+    cursor.execute(BASE_SCHEMA)
+    apply_migrations(cursor)
+    cursor.execute(SEED, {"users": users, "open_goals": open_goals, "completed_goals": completed_goals})
+
+    cursor.execute("SELECT user_id, id FROM goals WHERE completed = false ORDER BY deadline LIMIT 20")
+    sample = cursor.fetchall()
+    params = {
+        "user_id": sample[0][0],
+        "goal_id": sample[0][1],
+        "user_ids": [row[0] for row in sample],
+        "goal_ids": [row[1] for row in sample],
+    }
+
+    results = []
+    for name, table, expected, sql in QUERIES:
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        plan = cursor.fetchone()[0][0]["Plan"]
+        node_type, index = scan_of(plan, table)
+        results.append({
+            "query": name,
+            "table": table,
+            "scan": node_type,
+            "index": index,
+            "expected": expected,
+            "ok": node_type in INDEX_NODES and set(index.split(", ")) == {expected},
+            "plan": plan,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", default=os.getenv("DATABASE_URL"), help="Postgres to use (default: $DATABASE_URL)")
+    parser.add_argument("--schema", default="lockin_explain", help="Scratch schema, dropped and recreated")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--open-goals", type=int, default=3, help="Open goals per user")
+    parser.add_argument("--completed-goals", type=int, default=40, help="Completed goals per user")
+    parser.add_argument("--keep", action="store_true", help="Leave the scratch schema in place")
+    parser.add_argument("--output", help="Write the plans as JSON here")
+    args = parser.parse_args()
+    if not args.dsn:
+        parser.error("--dsn or DATABASE_URL is required")
+
+    try:
+        import psycopg
+    except ImportError:
+        sys.exit("explain_queries needs psycopg: pip install 'psycopg[binary]'")
+
+    with psycopg.connect(args.dsn, autocommit=True, cursor_factory=psycopg.ClientCursor) as connection, \
+            connection.cursor() as cursor, scratch_schema(cursor, args.schema, keep=args.keep):
+        print(f"seeding {args.users} users ...", flush=True)
+        results = explain_queries(cursor, args.users, args.open_goals, args.completed_goals)
+
+    for result in results:
+        status = "ok  " if result["ok"] else "FAIL"
+        print(f"{status} {result['query']:<46} {result['scan']:<17} {result['index']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2, default=str))
+
+    failed = [result["query"] for result in results if not result["ok"]]
+    if failed:
+        sys.exit(f"{len(failed)} queries not using their index: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""
+Point the app's Supabase client at a FakeDatabase (or any httpx handler)
+in-process, without a server, for benchmarks that import the app directly.
+"""
+from typing import Callable
+
+import httpx
+
+
+def mount_database(handler: Callable[[httpx.Request], httpx.Response]):
+    """Route the app's PostgREST and GoTrue traffic to `handler` via httpx.MockTransport"""
+    from app.auth import get_supabase_client
+
+    supabase = get_supabase_client()
+    client = getattr(supabase, "_client", supabase)
+    transport = httpx.MockTransport(handler)
+    client.postgrest.session._transport = transport
+    client.auth._http_client._transport = transport
@@ -0,0 +1,490 @@
+"""
+In-memory stand-in for the Supabase REST (PostgREST) and auth APIs.
+
+Implements the subset of PostgREST the app uses: embedded selects (including
+`!inner` joins and aliases), eq/neq/gt/gte/lt/lte/in/is filters, or=(...)
+groups, order/limit/offset, single-object responses, inserts, upserts,
+updates, deletes and exact counts. It is exposed as a plain
+`handle(request) -> response` function over httpx types so the same engine
+can back an HTTP server (load tests) or be mounted in-process with
+httpx.MockTransport (scale benchmarks).
+"""
+import json
+import re
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+# Columns parsed/compared as timestamps
+TIMESTAMP_COLUMNS = {
+    "deadline", "original_deadline", "completed_at", "created_at", "updated_at",
+    "posted_at", "connected_at", "token_expires_at", "expires_at", "enqueued_at",
+    "started_at", "finished_at", "next_attempt_at",
+}
+
+# Defaults applied on insert (callables are evaluated per row)
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "goals": {
+        "completed": False,
+        "completed_at": None,
+        "notification_sent": False,
+        "total_postponed_minutes": 0,
+    },
+    "generated_posts": {"edited_content": None, "posted_at": None},
+    "social_accounts": {},
+    "goal_social_selections": {},
+    "user_devices": {"apns_token": None, "fcm_token": None, "platform": None},
+    "generation_jobs": {
+        "status": "pending",
+        "attempts": 0,
+        "error": None,
+        "next_attempt_at": None,
+        "finished_at": None,
+    },
+    "account_deletion_jobs": {
+        "status": "pending",
+        "step": None,
+        "deleted_rows": 0,
+        "attempts": 0,
+        "error": None,
+        "finished_at": None,
+    },
+}
+
+# Tables whose updated_at is bumped by a trigger on every write
+VERSIONED_TABLES = ("goals", "generated_posts", "social_accounts", "account_deletion_jobs", "generation_jobs")
+
+# Tables with a bigserial id instead of a uuid
+SERIAL_TABLES = {"user_events"}
+
+# (parent table, embedded table) -> (parent column, embedded column, many)
+RELATIONS: Dict[Tuple[str, str], Tuple[str, str, bool]] = {
+    ("goals", "goal_social_selections"): ("id", "goal_id", True),
+    ("goals", "generated_posts"): ("id", "goal_id", True),
+    ("goal_social_selections", "social_accounts"): ("social_account_id", "id", False),
+    ("goal_social_selections", "goals"): ("goal_id", "id", False),
+    ("generated_posts", "social_accounts"): ("social_account_id", "id", False),
+    ("generated_posts", "goals"): ("goal_id", "id", False),
+    ("social_accounts", "generated_posts"): ("id", "social_account_id", True),
+}
+
+# Primary keys used for upserts without an explicit on_conflict
+PRIMARY_KEYS = {"user_devices": "user_id", "state_store": "key"}
+
+# Immutable columns kept in hash indexes so eq/in lookups stay O(1) on large seeds
+INDEXED_COLUMNS = {"id", "user_id", "goal_id", "social_account_id", "key"}
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def parse_timestamp(value: Any) -> Any:
+    if value is None or isinstance(value, datetime):
+        return value
+    parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _split_top_level(text: str, sep: str = ",") -> List[str]:
+    parts, depth, current = [], 0, []
+    for ch in text:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == sep and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def parse_select(select: str) -> List[Dict[str, Any]]:
+    """
+    "*, goal_social_selections(social_accounts(id, platform))" ->
+    [{"column": "*"}, {"embed": "goal_social_selections", "alias": ..., "inner": False, "select": [...]}]
+    """
+    items = []
+    for part in _split_top_level(select.replace(" ", "")):
+        match = re.match(r"^(?:(\w+):)?([\w]+)(?:!(\w+))?\((.*)\)$", part)
+        if match:
+            alias, name, hint, inner = match.groups()
+            items.append({
+                "embed": name,
+                "alias": alias or name,
+                "inner": hint == "inner",
+                "select": parse_select(inner),
+            })
+        else:
+            alias, _, column = part.rpartition(":")
+            items.append({"column": column, "alias": alias or column})
+    return items
+
+
+def _coerce(raw: str, sample: Any, column: str) -> Any:
+    if column in TIMESTAMP_COLUMNS:
+        return parse_timestamp(raw)
+    if isinstance(sample, bool):
+        return raw == "true"
+    if isinstance(sample, int):
+        return int(raw)
+    if isinstance(sample, float):
+        return float(raw)
+    return raw
+
+
+def _compare(value: Any, op: str, raw: str, column: str) -> bool:
+    if op == "is":
+        if raw == "null":
+            return value is None
+        return value is (raw == "true")
+    if op == "in":
+        options = [o.strip().strip('"') for o in _split_top_level(raw.strip("()"))]
+        return any(value == _coerce(o, value, column) for o in options)
+    if value is None:
+        return False
+    target = _coerce(raw, value, column)
+    if op == "eq":
+        return value == target
+    if op == "neq":
+        return value != target
+    if op == "gt":
+        return value > target
+    if op == "gte":
+        return value >= target
+    if op == "lt":
+        return value < target
+    if op == "lte":
+        return value <= target
+    raise ValueError(f"Unsupported operator: {op}")
+
+
+def _matches_condition(row: Dict[str, Any], condition: str) -> bool:
+    """Condition inside or=(...): 'col.op.value' or nested 'and(...)' / 'or(...)'"""
+    if condition.startswith("and(") or condition.startswith("or("):
+        kind, _, inner = condition.partition("(")
+        parts = _split_top_level(inner[:-1])
+        results = (_matches_condition(row, p) for p in parts)
+        return all(results) if kind == "and" else any(results)
+    column, op, raw = condition.split(".", 2)
+    negate = op == "not"
+    if negate:
+        op, raw = raw.split(".", 1)
+    # Values may be double-quoted to protect reserved characters
+    result = _compare(row.get(column), op, raw.strip('"'), column)
+    return not result if negate else result
+
+
+def _update_post_edits(db: "FakeDatabase", args: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """migrations/0009_update_post_edits.sql"""
+    edits = {edit["id"]: edit["edited_content"] for edit in args["edits"]}
+    rows = db._candidates("generated_posts", [("id", f"in.({','.join(edits)})")])
+    for row in rows:
+        row["edited_content"] = edits[row["id"]]
+        row["updated_at"] = utcnow()
+    return [{k: _to_json(v) for k, v in row.items()} for row in rows]
+
+
+class FakeDatabase:
+    """Tables of dict rows plus a tiny PostgREST/GoTrue HTTP surface"""
+
+    def __init__(self):
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.rpcs: Dict[str, Callable[["FakeDatabase", Dict[str, Any]], Any]] = {
+            "update_post_edits": _update_post_edits,
+        }
+        self.request_count = 0
+        self._indexes: Dict[Tuple[str, str], Dict[Any, List[Dict[str, Any]]]] = {}
+        self._lock = threading.RLock()
+
+    # ---- data helpers -------------------------------------------------
+
+    def table(self, name: str) -> List[Dict[str, Any]]:
+        return self.tables.setdefault(name, [])
+
+    def insert_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        stored = {}
+        for key, value in TABLE_DEFAULTS.get(table, {}).items():
+            stored[key] = value() if callable(value) else value
+        stored.update(row)
+        if table in SERIAL_TABLES:
+            rows = self.table(table)
+            stored.setdefault("id", rows[-1]["id"] + 1 if rows else 1)
+        elif table != "user_devices" and table != "state_store":
+            stored.setdefault("id", str(uuid.uuid4()))
+        stored.setdefault("created_at", utcnow())
+        if table in VERSIONED_TABLES:
+            stored["updated_at"] = utcnow()
+        if table == "social_accounts":
+            stored.setdefault("connected_at", utcnow())
+        for column in list(stored):
+            if column in TIMESTAMP_COLUMNS:
+                stored[column] = parse_timestamp(stored[column])
+        self.table(table).append(stored)
+        for (indexed_table, column), index in self._indexes.items():
+            if indexed_table == table:
+                index.setdefault(stored.get(column), []).append(stored)
+        return stored
+
+    def _index(self, table: str, column: str) -> Dict[Any, List[Dict[str, Any]]]:
+        index = self._indexes.get((table, column))
+        if index is None:
+            index = {}
+            for row in self.table(table):
+                index.setdefault(row.get(column), []).append(row)
+            self._indexes[(table, column)] = index
+        return index
+
+    def _candidates(self, table: str, own: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        for column, expr in own:
+            if column not in INDEXED_COLUMNS:
+                continue
+            if expr.startswith("eq."):
+                return self._index(table, column).get(expr[3:], [])
+            if expr.startswith("in."):
+                index = self._index(table, column)
+                values = [o.strip().strip('"') for o in _split_top_level(expr[3:].strip("()"))]
+                return [row for value in dict.fromkeys(values) for row in index.get(value, [])]
+        return self.table(table)
+
+    def add_user(self, user_id: str, email: str) -> str:
+        """Register an auth user; returns the bearer token the fake accepts"""
+        self.users[user_id] = {
+            "id": user_id,
+            "aud": "authenticated",
+            "role": "authenticated",
+            "email": email,
+            "app_metadata": {"provider": "email"},
+            "user_metadata": {},
+            "created_at": utcnow().isoformat(),
+        }
+        return f"user-{user_id}"
+
+    # ---- query evaluation ---------------------------------------------
+
+    def _filter_rows(self, table: str, filters: List[Tuple[str, str]]):
+        own = [(k, v) for k, v in filters if "." not in k and k != "or"]
+        rows = self._candidates(table, own)
+        ors = [v for k, v in filters if k == "or"]
+        result = []
+        for row in rows:
+            ok = True
+            for column, expr in own:
+                negate = expr.startswith("not.")
+                if negate:
+                    expr = expr[4:]
+                op, _, raw = expr.partition(".")
+                matched = _compare(row.get(column), op, raw, column)
+                if matched == negate:
+                    ok = False
+                    break
+            if ok:
+                for group in ors:
+                    if not any(_matches_condition(row, c) for c in _split_top_level(group.strip("()"))):
+                        ok = False
+                        break
+            if ok:
+                result.append(row)
+        return result
+
+    def _embed(self, table: str, row: Dict[str, Any], item: Dict[str, Any], filters: List[Tuple[str, str]]):
+        relation = RELATIONS.get((table, item["embed"]))
+        if relation is None:
+            raise ValueError(f"No relationship between {table} and {item['embed']}")
+        local, foreign, many = relation
+        prefix = item["alias"] + "."
+        nested_filters = [(k[len(prefix):], v) for k, v in filters if k.startswith(prefix)]
+        own_filters = [(k, v) for k, v in nested_filters if "." not in k]
+        key = row.get(local)
+        if foreign in INDEXED_COLUMNS:
+            candidates = list(self._index(item["embed"], foreign).get(key, []))
+        else:
+            candidates = [r for r in self.table(item["embed"]) if r.get(foreign) == key]
+        if own_filters:
+            allowed = {id(r) for r in self._filter_rows(item["embed"], own_filters)}
+            candidates = [r for r in candidates if id(r) in allowed]
+        projected = [self._project(item["embed"], r, item["select"], nested_filters) for r in candidates]
+        projected = [p for p in projected if p is not None]
+        if many:
+            return projected
+        return projected[0] if projected else None
+
+    def _project(self, table: str, row: Dict[str, Any], select: List[Dict[str, Any]], filters):
+        out = {}
+        for item in select:
+            if "embed" in item:
+                value = self._embed(table, row, item, filters)
+                if item["inner"] and (value is None or value == []):
+                    return None
+                out[item["alias"]] = value
+            elif item["column"] == "*":
+                out.update({k: _to_json(v) for k, v in row.items()})
+            else:
+                out[item["alias"]] = _to_json(row.get(item["column"]))
+        return out
+
+    def _order(self, rows: List[Dict[str, Any]], order: str) -> List[Dict[str, Any]]:
+        for term in reversed(order.split(",")):
+            parts = term.split(".")
+            column = parts[0]
+            desc = "desc" in parts[1:]
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r[column], reverse=desc)
+            nulls_first = "nullsfirst" in parts[1:] or (desc and "nullslast" not in parts[1:])
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def select(self, table: str, params: httpx.QueryParams) -> Tuple[List[Dict[str, Any]], int]:
+        select = parse_select(params.get("select", "*"))
+        filters = [(k, v) for k, v in params.multi_items()
+                   if k not in ("select", "order", "limit", "offset", "on_conflict", "columns")]
+        rows = self._filter_rows(table, filters)
+        if "order" in params:
+            rows = self._order(rows, params["order"])
+        projected = []
+        for row in rows:
+            p = self._project(table, row, select, filters)
+            if p is not None:
+                projected.append(p)
+        total = len(projected)
+        offset = int(params.get("offset", 0))
+        if "limit" in params:
+            projected = projected[offset:offset + int(params["limit"])]
+        elif offset:
+            projected = projected[offset:]
+        return projected, total
+
+    def write(self, method: str, table: str, params: httpx.QueryParams, body: Any, prefer: str):
+        filters = [(k, v) for k, v in params.multi_items()
+                   if k not in ("select", "order", "limit", "offset", "on_conflict", "columns")]
+        if method == "POST":
+            rows = body if isinstance(body, list) else [body]
+            upsert = "resolution=merge-duplicates" in prefer
+            ignore = "resolution=ignore-duplicates" in prefer
+            conflict = params.get("on_conflict") or PRIMARY_KEYS.get(table, "id")
+            conflict_cols = [c.strip() for c in conflict.split(",")]
+            written = []
+            for row in rows:
+                existing = None
+                if (upsert or ignore) and all(c in row for c in conflict_cols):
+                    lookup = [(c, f"eq.{row[c]}") for c in conflict_cols]
+                    for candidate in self._candidates(table, lookup):
+                        if all(str(candidate.get(c)) == str(row[c]) for c in conflict_cols):
+                            existing = candidate
+                            break
+                if existing is not None:
+                    if ignore:
+                        continue
+                    for column, value in row.items():
+                        existing[column] = parse_timestamp(value) if column in TIMESTAMP_COLUMNS else value
+                    if "updated_at" in existing or table in VERSIONED_TABLES:
+                        existing["updated_at"] = utcnow()
+                    written.append(existing)
+                else:
+                    written.append(self.insert_row(table, row))
+            return written
+        matched = self._filter_rows(table, filters)
+        if method == "PATCH":
+            for row in matched:
+                for column, value in body.items():
+                    row[column] = parse_timestamp(value) if column in TIMESTAMP_COLUMNS else value
+                if table in VERSIONED_TABLES:
+                    row["updated_at"] = utcnow()
+            return matched
+        if method == "DELETE":
+            ids = {id(r) for r in matched}
+            self.tables[table] = [r for r in self.table(table) if id(r) not in ids]
+            for indexed in [k for k in self._indexes if k[0] == table]:
+                del self._indexes[indexed]
+            return matched
+        raise ValueError(f"Unsupported method {method}")
+
+    # ---- HTTP surface -------------------------------------------------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Serve one PostgREST/GoTrue request"""
+        self.request_count += 1
+        path = request.url.path
+        try:
+            with self._lock:
+                if path.startswith("/auth/v1/"):
+                    return self._handle_auth(request, path[len("/auth/v1/"):])
+                if path.startswith("/rest/v1/rpc/"):
+                    fn = self.rpcs.get(path[len("/rest/v1/rpc/"):])
+                    if fn is None:
+                        return _error(404, "PGRST202", "function not found")
+                    args = json.loads(request.content or b"{}")
+                    return httpx.Response(200, json=fn(self, args))
+                if path.startswith("/rest/v1/"):
+                    return self._handle_rest(request, path[len("/rest/v1/"):])
+        except ValueError as e:
+            return _error(400, "PGRST100", str(e))
+        return _error(404, "PGRST000", f"unknown path {path}")
+
+    def _handle_auth(self, request: httpx.Request, path: str) -> httpx.Response:
+        if path == "user":
+            token = request.headers.get("authorization", "").removeprefix("Bearer ").strip()
+            user = self.users.get(token.removeprefix("user-")) if token.startswith("user-") else None
+            if user is None:
+                return httpx.Response(401, json={"code": 401, "msg": "invalid JWT"})
+            return httpx.Response(200, json=user)
+        if path.startswith("admin/users/") and request.method == "DELETE":
+            self.users.pop(path.rsplit("/", 1)[-1], None)
+            return httpx.Response(200, json={})
+        return httpx.Response(404, json={"msg": "not found"})
+
+    def _handle_rest(self, request: httpx.Request, table: str) -> httpx.Response:
+        params = request.url.params
+        prefer = request.headers.get("prefer", "")
+        accept = request.headers.get("accept", "")
+        headers = {"content-type": "application/json"}
+
+        if request.method in ("GET", "HEAD"):
+            rows, total = self.select(table, params)
+        else:
+            body = json.loads(request.content) if request.content else {}
+            rows = self.write(request.method, table, params, body, prefer)
+            total = len(rows)
+            if params.get("select"):
+                select = parse_select(params["select"])
+                rows = [self._project(table, r, select, []) for r in rows]
+            else:
+                rows = [{k: _to_json(v) for k, v in r.items()} for r in rows]
+            if "return=minimal" in prefer:
+                rows = []
+
+        if "count=" in prefer:
+            end = max(len(rows) - 1, 0)
+            headers["content-range"] = f"0-{end}/{total}"
+        else:
+            headers["content-range"] = f"0-{max(len(rows) - 1, 0)}/*"
+
+        if "application/vnd.pgrst.object+json" in accept:
+            if len(rows) != 1:
+                return _error(406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                              details=f"The result contains {len(rows)} rows")
+            return httpx.Response(200, content=json.dumps(rows[0]), headers=headers)
+
+        status = 200 if request.method in ("GET", "HEAD", "PATCH", "DELETE") else 201
+        return httpx.Response(status, content=json.dumps(rows), headers=headers)
+
+
+def _error(status: int, code: str, message: str, details: str = None) -> httpx.Response:
+    return httpx.Response(status, json={"code": code, "message": message, "details": details, "hint": None})
@@ -0,0 +1,96 @@
+"""
+Deterministic seed data for the fake database: users with connected Twitter
+and LinkedIn accounts, an APNs device, open goals with social selections
+and generated posts, and some completed history.
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
+
+from cryptography.fernet import Fernet
+
+from benchmarks.fakes.postgrest import FakeDatabase
+
+
+def seed_database(
+    db: FakeDatabase,
+    users: int,
+    goals_per_user: int,
+    encryption_key: str,
+    seed: int = 1,
+    completed_per_user: int = 0,
+    now: Optional[datetime] = None,
+    deadline_for: Optional[Callable[[random.Random, int], datetime]] = None,
+) -> List[Dict]:
+    """
+    Populate `db` and return [{"user_id", "token", "goal_ids"}] per user.
+    deadline_for(rng, goal_index) picks each open goal's deadline
+    (default: spread over the next 1-48 hours).
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    cipher = Fernet(encryption_key.encode())
+    # Every account gets the same encrypted token; Fernet is the slow part of seeding
+    access_token = cipher.encrypt(b"bench-access-token").decode()
+    refresh_token = cipher.encrypt(b"bench-refresh-token").decode()
+
+    if deadline_for is None:
+        def deadline_for(rng, _index):
+            return now + timedelta(minutes=rng.randint(60, 48 * 60))
+
+    seeded = []
+    goal_index = 0
+    for u in range(users):
+        user_id = f"00000000-0000-4000-8000-{u:012d}"
+        token = db.add_user(user_id, f"bench{u}@lockin.test")
+
+        accounts = []
+        for platform in ("twitter", "linkedin"):
+            accounts.append(db.insert_row("social_accounts", {
+                "user_id": user_id,
+                "platform": platform,
+                "platform_user_id": f"{platform}-{u}",
+                "username": f"bench_{platform}_{u}",
+                "access_token_encrypted": access_token,
+                "refresh_token_encrypted": refresh_token,
+                "token_expires_at": now + timedelta(days=30),
+            }))
+
+        db.insert_row("user_devices", {
+            "user_id": user_id,
+            "apns_token": f"{u:064x}",
+            "platform": "ios",
+            "updated_at": now,
+        })
+
+        goal_ids = []
+        for g in range(goals_per_user + completed_per_user):
+            completed = g >= goals_per_user
+            deadline = (now - timedelta(days=rng.randint(1, 365))) if completed else deadline_for(rng, goal_index)
+            goal = db.insert_row("goals", {
+                "user_id": user_id,
+                "title": f"Goal {g} for user {u}",
+                "description": "Ship the thing, write about it, lock in. " * rng.randint(1, 4),
+                "deadline": deadline,
+                "original_deadline": deadline,
+                "completed": completed,
+                "completed_at": deadline if completed else None,
+                "notification_sent": False,
+            })
+            goal_index += 1
+            if not completed:
+                goal_ids.append(goal["id"])
+            for account in accounts:
+                db.insert_row("goal_social_selections", {
+                    "goal_id": goal["id"],
+                    "social_account_id": account["id"],
+                })
+                db.insert_row("generated_posts", {
+                    "goal_id": goal["id"],
+                    "social_account_id": account["id"],
+                    "content": f"Finished '{goal['title']}' today. Locked in the whole way 🔒✨",
+                    "posted_at": deadline if completed else None,
+                })
+
+        seeded.append({"user_id": user_id, "token": token, "goal_ids": goal_ids})
+    return seeded
@@ -0,0 +1,104 @@
+"""
+One local HTTP server hosting every fake, for load tests:
+
+    /rest/v1/..., /auth/v1/...   Supabase (PostgREST + GoTrue)
+    /twitter/2/...               Twitter v2
+    /linkedin/v2/...             LinkedIn
+    /apns/3/device/...           APNs
+    /openai/v1/...               OpenAI
+    /__bench/users, /__bench/stats
+
+    python -m benchmarks.fakes.server --port 9100 --encryption-key KEY \\
+        --fault db=latency=3 --fault twitter=latency=150,jitter=50,errors=0.02
+"""
+import argparse
+import random
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from benchmarks.fakes.postgrest import FakeDatabase
+from benchmarks.fakes.seed import seed_database
+from benchmarks.fakes.upstreams import UPSTREAM_HANDLERS, FaultInjector, FaultProfile
+
+PREFIXES = ("twitter", "linkedin", "apns", "openai")
+
+
+def build_app(db: FakeDatabase, seeded, faults, rng: random.Random) -> Starlette:
+    injectors = {
+        name: FaultInjector(handler, faults.get(name, FaultProfile()), rng)
+        for name, handler in UPSTREAM_HANDLERS.items()
+    }
+    # PostgREST retries GET on 503 with multi-second backoff; fail DB calls with 500 instead
+    injectors["db"] = FaultInjector(db.handle, faults.get("db", FaultProfile(error_status=500)), rng)
+
+    async def dispatch(request: Request):
+        path = request.url.path
+        prefix = path.strip("/").split("/", 1)[0]
+        service = prefix if prefix in PREFIXES else "db"
+        upstream = httpx.Request(
+            request.method,
+            str(request.url),
+            headers=request.headers.raw,
+            content=await request.body(),
+        )
+        response = await injectors[service](upstream)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in ("content-length", "content-encoding")}
+        return Response(content=response.content, status_code=response.status_code, headers=headers)
+
+    async def bench_users(request: Request):
+        return JSONResponse(seeded)
+
+    async def bench_stats(request: Request):
+        return JSONResponse({
+            name: {"calls": injector.calls, "errors": injector.errors}
+            for name, injector in injectors.items()
+        })
+
+    methods = ["GET", "POST", "PATCH", "DELETE", "HEAD", "PUT"]
+    return Starlette(routes=[
+        Route("/__bench/users", bench_users),
+        Route("/__bench/stats", bench_stats),
+        Route("/{path:path}", dispatch, methods=methods),
+    ])
+
+
+def parse_faults(specs):
+    faults = {}
+    for spec in specs or []:
+        name, _, options = spec.partition("=")
+        profile = FaultProfile.parse(options)
+        if name == "db" and "status=" not in options:
+            profile.error_status = 500
+        faults[name] = profile
+    return faults
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fakes for Supabase, Twitter, LinkedIn, APNs and OpenAI")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--goals-per-user", type=int, default=5)
+    parser.add_argument("--completed-per-user", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--encryption-key", required=True)
+    parser.add_argument("--fault", action="append", metavar="SERVICE=latency=MS,jitter=MS,errors=RATE,status=CODE",
+                        help="Per-service fault profile (db, twitter, linkedin, apns, openai); repeatable")
+    args = parser.parse_args()
+
+    db = FakeDatabase()
+    seeded = seed_database(
+        db, args.users, args.goals_per_user, args.encryption_key,
+        seed=args.seed, completed_per_user=args.completed_per_user,
+    )
+    app = build_app(db, seeded, parse_faults(args.fault), random.Random(args.seed))
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
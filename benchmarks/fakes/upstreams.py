@@ -0,0 +1,140 @@
+"""
+Stand-ins for the external services the app calls: Twitter v2, LinkedIn
+ugcPosts, APNs and OpenAI chat completions, plus a fault-injecting wrapper
+(latency, jitter, error rate) used for every fake including PostgREST.
+
+Handlers take and return httpx types so they can run behind the HTTP server
+in benchmarks.fakes.server or in-process through httpx.MockTransport.
+"""
+import asyncio
+import json
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional, Union
+
+import httpx
+
+Handler = Callable[[httpx.Request], Union[httpx.Response, Awaitable[httpx.Response]]]
+
+
+@dataclass
+class FaultProfile:
+    """Latency is drawn uniformly from latency_ms +/- jitter_ms"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+
+    @classmethod
+    def parse(cls, spec: str) -> "FaultProfile":
+        """'latency=80,jitter=20,errors=0.01,status=500' -> FaultProfile"""
+        profile = cls()
+        for part in filter(None, spec.split(",")):
+            key, _, value = part.partition("=")
+            if key == "latency":
+                profile.latency_ms = float(value)
+            elif key == "jitter":
+                profile.jitter_ms = float(value)
+            elif key == "errors":
+                profile.error_rate = float(value)
+            elif key == "status":
+                profile.error_status = int(value)
+            else:
+                raise ValueError(f"Unknown fault option: {key}")
+        return profile
+
+
+class FaultInjector:
+    """Wrap a handler with simulated network latency and random failures"""
+
+    def __init__(self, handler: Handler, profile: FaultProfile, rng: Optional[random.Random] = None,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        self.handler = handler
+        self.profile = profile
+        self.rng = rng or random.Random()
+        self.sleep = sleep
+        self.calls = 0
+        self.errors = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        profile = self.profile
+        delay = profile.latency_ms + self.rng.uniform(-profile.jitter_ms, profile.jitter_ms)
+        if delay > 0:
+            await self.sleep(delay / 1000)
+        if profile.error_rate and self.rng.random() < profile.error_rate:
+            self.errors += 1
+            return httpx.Response(profile.error_status, json={"error": "injected failure"})
+        response = self.handler(request)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+
+def twitter_handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.endswith("/2/tweets") and request.method == "POST":
+        text = json.loads(request.content).get("text", "")
+        return httpx.Response(201, json={"data": {"id": str(time.time_ns()), "text": text}})
+    if path.endswith("/2/oauth2/token"):
+        return httpx.Response(200, json={
+            "token_type": "bearer",
+            "access_token": f"tw-access-{uuid.uuid4().hex}",
+            "refresh_token": f"tw-refresh-{uuid.uuid4().hex}",
+            "expires_in": 7200,
+        })
+    if path.endswith("/2/users/me"):
+        return httpx.Response(200, json={"data": {"id": "1", "username": "bench"}})
+    return httpx.Response(404, json={"title": "Not Found"})
+
+
+def linkedin_handler(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.endswith("/v2/ugcPosts") and request.method == "POST":
+        return httpx.Response(201, json={"id": f"urn:li:share:{time.time_ns()}"})
+    if path.endswith("/oauth/v2/accessToken"):
+        return httpx.Response(200, json={
+            "access_token": f"li-access-{uuid.uuid4().hex}",
+            "refresh_token": f"li-refresh-{uuid.uuid4().hex}",
+            "expires_in": 5184000,
+        })
+    if path.endswith("/v2/userinfo"):
+        return httpx.Response(200, json={"sub": "bench", "name": "Bench User"})
+    return httpx.Response(404, json={"message": "Not Found"})
+
+
+def apns_handler(request: httpx.Request) -> httpx.Response:
+    if "/3/device/" in request.url.path and request.method == "POST":
+        return httpx.Response(200, headers={"apns-id": str(uuid.uuid4())})
+    return httpx.Response(404, json={"reason": "BadPath"})
+
+
+def openai_handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/chat/completions"):
+        body = json.loads(request.content)
+        return httpx.Response(200, json={
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {
+                    "role": "assistant",
+                    "content": "Just locked in and shipped it. On to the next one 🚀",
+                },
+            }],
+            "usage": {"prompt_tokens": 60, "completion_tokens": 20, "total_tokens": 80},
+        })
+    return httpx.Response(404, json={"error": {"message": "not found"}})
+
+
+UPSTREAM_HANDLERS = {
+    "twitter": twitter_handler,
+    "linkedin": linkedin_handler,
+    "apns": apns_handler,
+    "openai": openai_handler,
+}
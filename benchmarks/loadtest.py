@@ -0,0 +1,332 @@
+"""
+Offline load test: starts the local fakes (benchmarks.fakes.server) and the
+API under uvicorn pointed at them, drives a weighted mix of goal endpoints
+with N concurrent clients and reports throughput and p50/p95/p99 latency.
+
+    python -m benchmarks.loadtest --duration 30 --concurrency 32
+    python -m benchmarks.loadtest --mix get_goals=50,post_now=20,generate_posts=15,postpone=15 \\
+        --fault twitter=latency=200,jitter=50,errors=0.05 --output report.json
+
+Everything runs on 127.0.0.1; no network access or credentials are needed.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from cryptography.fernet import Fernet
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = "get_goals=70,postpone=15,generate_posts=10,post_now=5"
+DEFAULT_FAULTS = [
+    "db=latency=4,jitter=2",
+    "twitter=latency=150,jitter=50",
+    "linkedin=latency=200,jitter=60",
+    "apns=latency=40,jitter=10",
+    "openai=latency=700,jitter=200",
+]
+# Any syntactically valid JWT works; the fake GoTrue only checks user tokens
+FAKE_SERVICE_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic2VydmljZV9yb2xlIn0.bench"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def apns_test_key() -> str:
+    """Throwaway ES256 key so APNs JWT signing runs exactly as in production"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    return base64.b64encode(pem).decode()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def wait_for(url: str, timeout: float, process: subprocess.Popen):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args[:3])} exited with {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def start_fakes(args, encryption_key: str, port: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "benchmarks.fakes.server",
+        "--port", str(port),
+        "--users", str(args.users),
+        "--goals-per-user", str(args.goals_per_user),
+        "--completed-per-user", str(args.completed_per_user),
+        "--seed", str(args.seed),
+        "--encryption-key", encryption_key,
+    ]
+    for fault in DEFAULT_FAULTS + (args.fault or []):
+        command += ["--fault", fault]
+    return subprocess.Popen(command, cwd=REPO_ROOT)
+
+
+def app_environment(args, encryption_key: str, fakes_url: str) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "SUPABASE_URL": fakes_url,
+        "SUPABASE_SERVICE_KEY": FAKE_SERVICE_KEY,
+        "ENCRYPTION_KEY": encryption_key,
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_BASE_URL": f"{fakes_url}/openai/v1",
+        "TWITTER_API_BASE_URL": f"{fakes_url}/twitter",
+        "TWITTER_CLIENT_ID": "bench",
+        "TWITTER_CLIENT_SECRET": "bench",
+        "LINKEDIN_API_BASE_URL": f"{fakes_url}/linkedin",
+        "APNS_PRODUCTION_URL": f"{fakes_url}/apns",
+        "APNS_SANDBOX_URL": f"{fakes_url}/apns",
+        "APNS_KEY_BASE64": apns_test_key(),
+        "APNS_KEY_ID": "BENCHKEY01",
+        "APNS_TEAM_ID": "BENCHTEAM1",
+        "LOG_LEVEL": "WARNING",
+    })
+    for item in args.env or []:
+        key, _, value = item.partition("=")
+        env[key] = value
+    return env
+
+
+def start_app(args, env: Dict[str, str], port: int) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1",
+        "--port", str(port),
+        "--workers", str(args.app_workers),
+        "--log-level", "warning",
+        "--no-access-log",
+        # Keep pooled client connections open across slow requests so the
+        # report shows server latency, not reconnect races
+        "--timeout-keep-alive", "60",
+    ]
+    return subprocess.Popen(command, cwd=REPO_ROOT, env=env)
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown operation in --mix: {name} (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight)
+    return mix
+
+
+async def op_get_goals(client, user, rng):
+    return await client.get("/goals/goals")
+
+
+async def op_postpone(client, user, rng):
+    if not user["goal_ids"]:
+        return await op_get_goals(client, user, rng)
+    goal_id = rng.choice(user["goal_ids"])
+    return await client.post(f"/goals/goals/{goal_id}/postpone", params={"minutes": 5})
+
+
+async def op_generate_posts(client, user, rng):
+    if not user["goal_ids"]:
+        return await op_get_goals(client, user, rng)
+    goal_id = rng.choice(user["goal_ids"])
+    return await client.post(f"/goals/goals/{goal_id}/generate-posts")
+
+
+async def op_post_now(client, user, rng):
+    if not user["goal_ids"]:
+        return await op_get_goals(client, user, rng)
+    goal_id = user["goal_ids"].pop(rng.randrange(len(user["goal_ids"])))
+    return await client.post(f"/goals/goals/{goal_id}/post-now")
+
+
+OPERATIONS = {
+    "get_goals": op_get_goals,
+    "postpone": op_postpone,
+    "generate_posts": op_generate_posts,
+    "post_now": op_post_now,
+}
+
+
+async def drive(base_url: str, users: List[Dict], mix: Dict[str, float], args) -> Dict:
+    names = list(mix)
+    weights = [mix[n] for n in names]
+    samples: Dict[str, List[float]] = defaultdict(list)
+    statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.request_timeout)
+    started = time.monotonic()
+    measure_from = started + args.warmup
+    stop_at = measure_from + args.duration
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        async def worker(worker_id: int):
+            worker_rng = random.Random(args.seed * 1000 + worker_id)
+            while time.monotonic() < stop_at:
+                user = worker_rng.choice(users)
+                name = worker_rng.choices(names, weights)[0]
+                headers = {"Authorization": f"Bearer {user['token']}"}
+                request_started = time.monotonic()
+                try:
+                    response = await OPERATIONS[name](
+                        _UserClient(client, headers), user, worker_rng
+                    )
+                    status = str(response.status_code)
+                except httpx.HTTPError as e:
+                    status = type(e).__name__
+                finished = time.monotonic()
+                if request_started >= measure_from:
+                    samples[name].append(finished - request_started)
+                    statuses[name][status] += 1
+
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+
+    elapsed = args.duration
+    report = {"duration_seconds": elapsed, "concurrency": args.concurrency, "operations": {}}
+    all_latencies = []
+    for name in names:
+        latencies = sorted(samples[name])
+        all_latencies.extend(latencies)
+        ok = sum(n for s, n in statuses[name].items() if s.isdigit() and int(s) < 400)
+        report["operations"][name] = _summary(latencies, elapsed, ok, dict(statuses[name]))
+    all_latencies.sort()
+    total_ok = sum(op["ok"] for op in report["operations"].values())
+    report["overall"] = _summary(all_latencies, elapsed, total_ok, {})
+    return report
+
+
+class _UserClient:
+    """Per-request auth headers on a shared connection pool"""
+
+    def __init__(self, client: httpx.AsyncClient, headers: Dict[str, str]):
+        self._client = client
+        self._headers = headers
+
+    async def get(self, url, **kwargs):
+        return await self._client.get(url, headers=self._headers, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self._client.post(url, headers=self._headers, **kwargs)
+
+
+def _summary(latencies: List[float], elapsed: float, ok: int, statuses: Dict[str, int]) -> Dict:
+    summary = {
+        "requests": len(latencies),
+        "ok": ok,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_ms": round((latencies[-1] if latencies else 0.0) * 1000, 2),
+    }
+    if statuses:
+        summary["statuses"] = statuses
+    return summary
+
+
+def print_report(report: Dict):
+    header = f"{'operation':<16}{'requests':>10}{'ok':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["operations"].items()) + [("overall", report["overall"])]
+    for name, op in rows:
+        print(f"{name:<16}{op['requests']:>10}{op['ok']:>8}{op['throughput_rps']:>10}"
+              f"{op['p50_ms']:>10}{op['p95_ms']:>10}{op['p99_ms']:>10}{op['max_ms']:>10}")
+    for name, op in report["operations"].items():
+        if op.get("statuses"):
+            print(f"  {name}: {op['statuses']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual clients")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Weighted operations (default {DEFAULT_MIX})")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--goals-per-user", type=int, default=5)
+    parser.add_argument("--completed-per-user", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--app-workers", type=int, default=1, help="uvicorn --workers for the API")
+    parser.add_argument("--request-timeout", type=float, default=30.0)
+    parser.add_argument("--fault", action="append",
+                        help="Override a fake's profile, e.g. openai=latency=1500,errors=0.1 (repeatable)")
+    parser.add_argument("--env", action="append", help="Extra KEY=VALUE for the API process (repeatable)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    encryption_key = Fernet.generate_key().decode()
+    fakes_port, app_port = free_port(), free_port()
+    fakes_url = f"http://127.0.0.1:{fakes_port}"
+    app_url = f"http://127.0.0.1:{app_port}"
+
+    processes = []
+    try:
+        fakes = start_fakes(args, encryption_key, fakes_port)
+        processes.append(fakes)
+        wait_for(f"{fakes_url}/__bench/stats", 60, fakes)
+
+        app = start_app(args, app_environment(args, encryption_key, fakes_url), app_port)
+        processes.append(app)
+        wait_for(f"{app_url}/health", 60, app)
+
+        users = httpx.get(f"{fakes_url}/__bench/users", timeout=30).json()
+        report = asyncio.run(drive(app_url, users, mix, args))
+        report["config"] = {
+            "mix": mix,
+            "users": args.users,
+            "goals_per_user": args.goals_per_user,
+            "app_workers": args.app_workers,
+            "faults": DEFAULT_FAULTS + (args.fault or []),
+            "env": args.env or [],
+        }
+        report["upstream_calls"] = httpx.get(f"{fakes_url}/__bench/stats", timeout=10).json()
+
+        print_report(report)
+        if args.output:
+            Path(args.output).write_text(json.dumps(report, indent=2))
+    finally:
+        for process in reversed(processes):
+            process.send_signal(signal.SIGINT)
+        for process in reversed(processes):
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+
+if __name__ == "__main__":
+    main()
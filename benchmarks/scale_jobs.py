@@ -0,0 +1,401 @@
+"""
+Scale benchmark for the background jobs: seeds the in-memory database with a
+large number of open goals whose deadlines cluster on the hour, then runs the
+real deadline checker and auto-poster loops side by side on a simulated clock.
+
+    python -m benchmarks.scale_jobs --goals 100000 --hours 3 --output scale.json
+    python -m benchmarks.scale_jobs --goals 20000 --fault apns=latency=300 --tracemalloc
+
+Time is virtual: the event loop skips ahead whenever every task is waiting
+(the jobs' 60 s sleeps, modelled upstream latency), while CPU time spent in
+the app is counted as it happens. The fake database's own CPU is excluded
+and replaced with its modelled latency, so a cycle's duration is what the
+job would take against the real services. Hours of schedule run in minutes.
+
+Reported per run: cycle durations for both jobs, notification lag against
+each goal's T-2h mark, missed T-2h windows, posting lag against each
+deadline, goals still open at the end, and peak memory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import selectors
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+from cryptography.fernet import Fernet
+
+from benchmarks.fakes.inprocess import mount_database
+from benchmarks.fakes.postgrest import FakeDatabase
+from benchmarks.fakes.seed import seed_database
+from benchmarks.fakes.server import parse_faults
+from benchmarks.fakes.upstreams import UPSTREAM_HANDLERS, FaultInjector, FaultProfile
+from benchmarks.loadtest import FAKE_SERVICE_KEY, apns_test_key, percentile
+
+DEFAULT_FAULTS = [
+    "db=latency=4,jitter=2",
+    "twitter=latency=150,jitter=50",
+    "linkedin=latency=200,jitter=60",
+    "apns=latency=40,jitter=10",
+]
+# Fixed start so runs are comparable; deadlines are placed relative to it
+SIM_START = datetime(2030, 1, 7, 6, 0)
+NOTIFY_LEAD = timedelta(hours=2)
+
+
+class VirtualClock:
+    """
+    Monotonic seconds since the simulation started: real elapsed time plus
+    skipped idle time, minus time excluded from the model (fake database CPU)
+    """
+
+    def __init__(self, start: datetime):
+        self.start = start
+        self._origin = time.monotonic()
+        self._shift = 0.0
+        self.skipped = 0.0
+
+    def monotonic(self) -> float:
+        return time.monotonic() - self._origin + self._shift
+
+    def skip(self, seconds: float):
+        self._shift += seconds
+        self.skipped += seconds
+
+    def exclude(self, seconds: float):
+        self._shift -= seconds
+
+    def utcnow(self) -> datetime:
+        return self.start + timedelta(seconds=self.monotonic())
+
+
+class _SkippingSelector:
+    """Poll real file descriptors without blocking; jump the clock instead of waiting"""
+
+    def __init__(self, clock: VirtualClock):
+        self._clock = clock
+        self._selector = selectors.DefaultSelector()
+
+    def select(self, timeout=None):
+        events = self._selector.select(0)
+        if not events:
+            if timeout is None:
+                raise RuntimeError("simulation stalled: no timers and no I/O pending")
+            if timeout > 0:
+                self._clock.skip(timeout)
+        return events
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    def __init__(self, clock: VirtualClock):
+        super().__init__(_SkippingSelector(clock))
+        self._virtual_clock = clock
+
+    def time(self) -> float:
+        return self._virtual_clock.monotonic()
+
+
+def _stats(values: List[float]) -> Dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(values[-1], 3) if values else 0.0,
+    }
+
+
+def _rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def clustered_deadlines(first_cluster: datetime, hours: int, on_the_hour: float, jitter_minutes: int):
+    """Most deadlines land exactly on the hour (how people pick them); the rest scatter nearby"""
+    def deadline_for(rng: random.Random, _index: int) -> datetime:
+        slot = first_cluster + timedelta(hours=rng.randrange(hours))
+        if rng.random() < on_the_hour:
+            return slot
+        return slot + timedelta(minutes=rng.randint(-jitter_minutes, jitter_minutes))
+    return deadline_for
+
+
+class Observer:
+    """
+    Wraps the fake database to timestamp (in simulated time) each goal's
+    notification, each post's publish and each goal's completion
+    """
+
+    def __init__(self, db: FakeDatabase, clock: VirtualClock, profile: FaultProfile, rng: random.Random):
+        self.db = db
+        self.clock = clock
+        self.profile = profile
+        self.rng = rng
+        self.notified: Dict[str, datetime] = {}
+        self.published: Dict[str, datetime] = {}
+        self.completed: Dict[str, datetime] = {}
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        started = time.monotonic()
+        response = self.db.handle(request)
+        # The supabase client is synchronous, so modelled latency blocks the loop like real I/O would
+        self.clock.exclude(time.monotonic() - started)
+        delay = self.profile.latency_ms + self.rng.uniform(-self.profile.jitter_ms, self.profile.jitter_ms)
+        if delay > 0:
+            self.clock.skip(delay / 1000)
+        if request.method == "PATCH" and response.status_code < 300:
+            self._observe(request)
+        return response
+
+    def _observe(self, request: httpx.Request):
+        table = request.url.path.rsplit("/", 1)[-1]
+        row_filter = request.url.params.get("id", "")
+        if row_filter.startswith("in.("):
+            # Batched update, e.g. every goal covered by one summary push
+            row_ids = [i.strip('"') for i in row_filter[len("in.("):-1].split(",")]
+        else:
+            row_ids = [row_filter.removeprefix("eq.")]
+        row_id = row_ids[0]
+        body = json.loads(request.content or b"{}")
+        now = self.clock.utcnow()
+        if table == "goals" and body.get("notification_sent"):
+            for notified_id in row_ids:
+                self.notified.setdefault(notified_id, now)
+        elif table == "goals" and body.get("completed"):
+            self.completed.setdefault(row_id, now)
+        elif table == "generated_posts" and body.get("posted_at"):
+            self.published.setdefault(row_id, now)
+
+
+def _timed(job: str, fn, clock: VirtualClock, cycles: Dict[str, List[Dict]]):
+    async def wrapper():
+        started_virtual, started_real = clock.monotonic(), time.perf_counter()
+        try:
+            return await fn()
+        finally:
+            cycles[job].append({
+                "at": round(started_virtual, 3),
+                "seconds": clock.monotonic() - started_virtual,
+                "real_seconds": time.perf_counter() - started_real,
+            })
+    return wrapper
+
+
+async def simulate(horizon: float, cycles: Dict[str, List[Dict]], clock: VirtualClock):
+    from app.jobs import auto_poster, deadline_checker
+
+    deadline_checker.check_deadlines = _timed("deadline_checker", deadline_checker.check_deadlines, clock, cycles)
+    auto_poster.auto_post_expired_goals = _timed("auto_poster", auto_poster.auto_post_expired_goals, clock, cycles)
+    tasks = [
+        asyncio.create_task(deadline_checker.run_scheduler()),
+        asyncio.create_task(auto_poster.run_auto_poster()),
+    ]
+    try:
+        await asyncio.sleep(horizon)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _job_summary(records: List[Dict]) -> Dict:
+    busy = [r for r in records if r["seconds"] >= 1.0]
+    longest = max(records, key=lambda r: r["seconds"], default=None)
+    return {
+        "cycles": len(records),
+        "busy_cycles": len(busy),
+        "cycle_seconds": _stats([r["seconds"] for r in busy or records]),
+        "cycle_real_seconds": _stats([r["real_seconds"] for r in busy or records]),
+        "longest_cycle": {
+            "started": (SIM_START + timedelta(seconds=longest["at"])).isoformat(),
+            "seconds": round(longest["seconds"], 3),
+        } if longest else None,
+    }
+
+
+def build_report(db: FakeDatabase, observer: Observer, cycles: Dict[str, List[Dict]], end: datetime) -> Dict:
+    open_goals = [g for g in db.table("goals") if g["deadline"] > SIM_START.replace(tzinfo=timezone.utc)]
+    devices = {d["user_id"] for d in db.table("user_devices") if d.get("apns_token")}
+
+    notify_lag, missed = [], 0
+    post_lag, goal_lag, unfinished = [], [], 0
+    posts_by_goal: Dict[str, List[Dict]] = {}
+    for post in db.table("generated_posts"):
+        posts_by_goal.setdefault(post["goal_id"], []).append(post)
+
+    for goal in open_goals:
+        deadline = goal["deadline"].astimezone(timezone.utc).replace(tzinfo=None)
+        notify_at = deadline - NOTIFY_LEAD
+        if notify_at <= end and goal["user_id"] in devices:
+            sent = observer.notified.get(goal["id"])
+            if sent is None:
+                missed += 1
+            else:
+                notify_lag.append((sent - notify_at).total_seconds())
+        if deadline <= end:
+            completed = observer.completed.get(goal["id"])
+            if completed is None:
+                unfinished += 1
+                continue
+            goal_lag.append((completed - deadline).total_seconds())
+            for post in posts_by_goal.get(goal["id"], []):
+                published = observer.published.get(post["id"])
+                if published is not None:
+                    post_lag.append((published - deadline).total_seconds())
+
+    return {
+        "jobs": {job: _job_summary(records) for job, records in cycles.items()},
+        "notifications": {
+            "due": len(notify_lag) + missed,
+            "sent": len(notify_lag),
+            "missed_windows": missed,
+            "late_over_60s": sum(1 for lag in notify_lag if lag > 60),
+            "lag_seconds": _stats(notify_lag),
+        },
+        "posting": {
+            "goals_due": len(goal_lag) + unfinished,
+            "goals_completed": len(goal_lag),
+            "goals_open_at_end": unfinished,
+            "goal_lag_seconds": _stats(goal_lag),
+            "post_lag_seconds": _stats(post_lag),
+        },
+    }
+
+
+def print_report(report: Dict):
+    for job, summary in report["jobs"].items():
+        cycle = summary["cycle_seconds"]
+        print(f"{job:<18} cycles={summary['cycles']:<5} busy={summary['busy_cycles']:<4} "
+              f"p50={cycle['p50']}s p95={cycle['p95']}s max={cycle['max']}s")
+    notifications = report["notifications"]
+    print(f"notifications      sent={notifications['sent']}/{notifications['due']} "
+          f"missed={notifications['missed_windows']} late>60s={notifications['late_over_60s']} "
+          f"lag p50={notifications['lag_seconds']['p50']}s p99={notifications['lag_seconds']['p99']}s")
+    posting = report["posting"]
+    print(f"posting            completed={posting['goals_completed']}/{posting['goals_due']} "
+          f"open_at_end={posting['goals_open_at_end']} lag p50={posting['goal_lag_seconds']['p50']}s "
+          f"p99={posting['goal_lag_seconds']['p99']}s max={posting['goal_lag_seconds']['max']}s")
+    memory = report["memory"]
+    print(f"memory             rss_after_seed={memory['rss_after_seed_mb']}MB peak_rss={memory['peak_rss_mb']}MB"
+          + (f" tracemalloc_peak={memory['tracemalloc_peak_mb']}MB" if "tracemalloc_peak_mb" in memory else ""))
+    print(f"simulated {report['simulated_hours']}h in {report['wall_seconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--goals", type=int, default=100_000, help="Open goals to seed")
+    parser.add_argument("--goals-per-user", type=int, default=4)
+    parser.add_argument("--hours", type=int, default=3, help="Hourly deadline clusters")
+    parser.add_argument("--on-the-hour", type=float, default=0.8,
+                        help="Fraction of deadlines exactly on the hour (the rest within +/- --jitter-minutes)")
+    parser.add_argument("--jitter-minutes", type=int, default=20)
+    parser.add_argument("--grace-minutes", type=int, default=120,
+                        help="Simulated time after the last cluster before stopping")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--fault", action="append",
+                        help="Override a fake's profile, e.g. apns=latency=300,errors=0.02 (repeatable)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also track the Python allocation peak (slows CPU-bound parts of each cycle)")
+    parser.add_argument("--output", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    encryption_key = Fernet.generate_key().decode()
+    # Settings are read at import time, so configure before the app is imported
+    os.environ.update({
+        "SUPABASE_URL": "http://supabase.bench",
+        "SUPABASE_SERVICE_KEY": FAKE_SERVICE_KEY,
+        "ENCRYPTION_KEY": encryption_key,
+        "OPENAI_API_KEY": "sk-bench",
+        "APNS_KEY_ID": "BENCHKEY01",
+        "APNS_TEAM_ID": "BENCHTEAM1",
+        "APNS_KEY_BASE64": apns_test_key(),
+        # Per-goal job logs would dominate the run; set LOG_LEVEL=INFO to see them
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "ERROR"),
+    })
+    from app.services import clock as app_clock
+    from app.services.log import configure_logging
+    from app.services.outbound import set_transport_factory
+
+    configure_logging()
+    rng = random.Random(args.seed)
+    faults = parse_faults(DEFAULT_FAULTS + (args.fault or []))
+    first_cluster = SIM_START + NOTIFY_LEAD + timedelta(hours=1)
+    users = max(1, -(-args.goals // args.goals_per_user))
+
+    print(f"seeding {users * args.goals_per_user} goals across {users} users ...", flush=True)
+    db = FakeDatabase()
+    seed_database(
+        db, users, args.goals_per_user, encryption_key, seed=args.seed,
+        now=SIM_START.replace(tzinfo=timezone.utc),
+        deadline_for=clustered_deadlines(
+            first_cluster.replace(tzinfo=timezone.utc), args.hours, args.on_the_hour, args.jitter_minutes,
+        ),
+    )
+    rss_after_seed = _rss_mb()
+
+    clock = VirtualClock(SIM_START)
+    observer = Observer(db, clock, faults.get("db", FaultProfile()), rng)
+    mount_database(observer.handle)
+    injectors = {
+        name: FaultInjector(handler, faults.get(name, FaultProfile()), rng)
+        for name, handler in UPSTREAM_HANDLERS.items()
+    }
+    set_transport_factory(lambda service: httpx.MockTransport(injectors[service]))
+    app_clock.set_clock(clock.utcnow)
+
+    last_cluster = first_cluster + timedelta(hours=args.hours - 1, minutes=args.jitter_minutes)
+    end = last_cluster + timedelta(minutes=args.grace_minutes)
+    horizon = (end - SIM_START).total_seconds()
+    cycles: Dict[str, List[Dict]] = {"deadline_checker": [], "auto_poster": []}
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    wall_started = time.perf_counter()
+    loop = VirtualTimeLoop(clock)
+    try:
+        loop.run_until_complete(simulate(horizon, cycles, clock))
+    finally:
+        loop.close()
+        app_clock.set_clock(None)
+        set_transport_factory(None)
+    wall = time.perf_counter() - wall_started
+
+    report = build_report(db, observer, cycles, SIM_START + timedelta(seconds=horizon))
+    report["memory"] = {"rss_after_seed_mb": rss_after_seed, "peak_rss_mb": _rss_mb()}
+    if args.tracemalloc:
+        report["memory"]["tracemalloc_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 2**20, 1)
+        tracemalloc.stop()
+    report["simulated_hours"] = round(horizon / 3600, 2)
+    report["wall_seconds"] = round(wall, 1)
+    report["upstream_calls"] = {name: {"calls": i.calls, "errors": i.errors} for name, i in injectors.items()}
+    report["config"] = {
+        "goals": users * args.goals_per_user,
+        "users": users,
+        "hours": args.hours,
+        "on_the_hour": args.on_the_hour,
+        "jitter_minutes": args.jitter_minutes,
+        "grace_minutes": args.grace_minutes,
+        "seed": args.seed,
+        "faults": DEFAULT_FAULTS + (args.fault or []),
+    }
+
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
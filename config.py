@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     encryption_key: str
     
     # OAuth - Twitter
+    twitter_api_base_url: str = "https://api.twitter.com"
     twitter_client_id: str = ""
     twitter_client_secret: str = ""
     twitter_redirect_uri: str = ""
@@ -21,6 +22,7 @@ class Settings(BaseSettings):
     reddit_redirect_uri: str = ""
     
     # OAuth - LinkedIn
+    linkedin_api_base_url: str = "https://api.linkedin.com"
     linkedin_client_id: str = ""
     linkedin_client_secret: str = ""
     linkedin_redirect_uri: str = ""
@@ -28,8 +30,100 @@ class Settings(BaseSettings):
     # App
     frontend_url: str = "lockin://oauth/callback"  # Flutter deep link
     
+    # Short-lived state (OAuth state/PKCE). Use "sqlite" or "supabase" with multiple workers
+    state_store_backend: str = "memory"
+    state_store_sqlite_path: str = "/tmp/lockin_state.db"
+    state_store_ttl_seconds: int = 600
+    state_store_max_entries: int = 10000
+    
+    # Per-user read cache for goal lists and social accounts: "memory" (per worker),
+    # "sqlite" (shared by workers on one host), "supabase" (shared across hosts) or "off".
+    # "auto" is memory with one uvicorn worker and sqlite with several
+    read_cache_backend: str = "auto"
+    read_cache_ttl_seconds: int = 300
+    read_cache_max_entries: int = 10000
+    
+    # goal -> owner and post -> goal lookups for authorization (per worker LRU)
+    ownership_cache_size: int = 50000
+    
+    # Background jobs. Turn off in the web service when `python -m app.jobs` runs them
+    # as a separate worker; otherwise every uvicorn worker runs its own copy
+    run_jobs_in_web: bool = True
+    job_start_delay_seconds: float = 2.0  # lets the first /health through before the first cycle
+    worker_metrics_port: int = 0  # Prometheus endpoint for the job worker; 0 disables
+    
+    # Live goal events (GET /goals/goals/events): "memory" reaches streams in the publishing
+    # process only; "supabase" goes through the user_events table, for a separate job
+    # worker or several uvicorn workers
+    event_broker_backend: str = "memory"
+    event_queue_size: int = 100  # per open stream; oldest events dropped beyond this
+    event_heartbeat_seconds: int = 15
+    event_poll_seconds: float = 2.0
+    event_retention_seconds: int = 3600
+    
+    # Per-user token buckets on the endpoints that start paid or slow outbound work.
+    # "<calls>/<seconds>": burst size and the time to refill it from empty; "" disables one.
+    # "memory" keeps buckets per worker; "supabase" shares them (migration 0007); "off" disables all
+    rate_limit_backend: str = "memory"
+    rate_limit_max_entries: int = 50000  # memory backend; least recently used buckets dropped
+    rate_limit_generate_posts: str = "5/300"
+    rate_limit_post_now: str = "5/60"
+    rate_limit_oauth_complete: str = "10/300"
+    
+    # Circuit breakers per external service (twitter, linkedin, apns, openai)
+    circuit_failure_rate: float = 0.5  # of the last circuit_window calls
+    circuit_min_calls: int = 10
+    circuit_window: int = 20
+    circuit_open_seconds: float = 30.0  # then one probe call decides
+    circuit_max_defer_minutes: int = 60  # auto-poster holds goals this long past deadline for an open circuit
+    
+    # Post generation: fixed worker pool fed by a bounded queue; jobs that don't
+    # fit wait in generation_jobs and are picked up as workers free up
+    generation_workers: int = 4  # concurrent LLM calls per process
+    generation_queue_size: int = 100
+    generation_poll_seconds: float = 5.0
+    generation_stale_seconds: int = 600  # running jobs untouched this long are resumed
+    generation_max_attempts: int = 3
+    generation_retry_base_seconds: int = 30  # a failed job waits base * 2^(attempts - 1) before its retry
+    
+    # Deadline pushes: a user with at least this many goals due in the same T-2h window
+    # gets one summary push instead of one per goal (0 turns coalescing off)
+    push_coalesce_min_goals: int = 2
+    push_coalesce_max_titles: int = 3  # goal titles listed in the summary body
+    
+    # Account deletion runs as a chunked background job
+    account_deletion_chunk_size: int = 100  # goal ids per IN (...) filter; keeps URLs short
+    account_deletion_poll_seconds: int = 30
+    account_deletion_stale_seconds: int = 300  # running jobs untouched this long are resumed
+    account_deletion_max_attempts: int = 5
+    
+    # Response compression (brotli when the package is installed, else gzip)
+    compression_minimum_size: int = 1024  # bytes
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    
+    # Admin-only profiling: requests with a valid X-Profile token (python -m app.services.profiling)
+    # run under cProfile; results and job sampler dumps are served from /debug/profiles
+    profiling_secret: str = ""  # empty disables profiling and the /debug routes
+    profile_dir: str = "/tmp/lockin_profiles"
+    profile_keep: int = 50  # newest files kept
+    job_sampler_interval_ms: int = 0  # stack sampling period wherever the jobs run; 0 disables
+    job_sampler_flush_seconds: int = 300
+    # Where sampler dumps go: "file" (profile_dir of the process running the jobs) or
+    # "supabase" (job_profiles table, so the web service can serve a separate worker's dumps)
+    job_sampler_store: str = "file"
+    
+    # Logging
+    log_level: str = "INFO"
+    log_debug_sample_rate: float = 0.01  # fraction of DEBUG events kept
+    
+    # Query instrumentation: flag a query shape repeated this many times in one request/job cycle
+    n_plus_one_threshold: int = 3
+    n_plus_one_raise: bool = False  # raise NPlusOneError instead of only logging (tests/CI)
+    
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""  # empty = SDK default; point at a local stand-in for load tests
     
     # Railway auto-detects PORT, default to 8000 for local dev
     port: int = int(os.getenv("PORT", "8000"))
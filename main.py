@@ -1,46 +1,53 @@
 import json
-from fastapi import FastAPI, Response
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-import asyncio
-from app.routes import oauth_routes, social_routes, goal_routes, user_routes
-from app.jobs.deadline_checker import run_scheduler
-from app.jobs.auto_poster import run_auto_poster  # NEW
+from app.routes import oauth_routes, social_routes, goal_routes, user_routes, debug_routes
+from app.jobs.runner import start_jobs, stop_jobs
+from app.middleware import (
+    CompressionMiddleware, MetricsMiddleware, ProfilingMiddleware, QueryRecorderMiddleware, RequestContextMiddleware
+)
+from app.responses import ORJSONResponse
+from app.services.log import configure_logging, get_logger, shutdown_logging
+from app.services.metrics import metrics_payload
+from app.services.circuit_breaker import CircuitOpenError
 from config import get_settings
 
 settings = get_settings()
+configure_logging()
+logger = get_logger("main")
 
-# Background tasks
-scheduler_task = None
-auto_poster_task = None  # NEW
+# Background jobs (None when they run in a separate `python -m app.jobs` worker)
+job_tasks = None
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Start both background jobs
-    global scheduler_task, auto_poster_task
-    
-    scheduler_task = asyncio.create_task(run_scheduler())
-    print("✅ Deadline checker started")
+    global job_tasks
     
-    auto_poster_task = asyncio.create_task(run_auto_poster())  # NEW
-    print("✅ Auto-poster started")  # NEW
+    if settings.run_jobs_in_web:
+        job_tasks = start_jobs(delay=settings.job_start_delay_seconds)
     
     yield
     
-    # Shutdown: Cancel both tasks
-    if scheduler_task:
-        scheduler_task.cancel()
-        print("✅ Deadline checker stopped")
+    if job_tasks:
+        await stop_jobs(job_tasks)
     
-    if auto_poster_task:  # NEW
-        auto_poster_task.cancel()  # NEW
-        print("✅ Auto-poster stopped")  # NEW
+    shutdown_logging()
 
 app = FastAPI(
     title="lockin API",
     description="Backend API for lockin accountability app",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# gzip/brotli for larger bodies (history and post listings)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    gzip_level=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
 )
 
 # CORS middleware
@@ -50,13 +57,36 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-Profile-Id"],
 )
 
+# Per-request query recording / N+1 detection
+app.add_middleware(QueryRecorderMiddleware)
+
+# cProfile for requests with a signed X-Profile header (admin only, off without PROFILING_SECRET)
+app.add_middleware(ProfilingMiddleware)
+
+# Route latency histograms (exposed on /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Request correlation ID for structured logs (outermost)
+app.add_middleware(RequestContextMiddleware)
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_handler(request: Request, exc: CircuitOpenError):
+    """An upstream the request needs is failing; tell the client when to retry"""
+    return ORJSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(1, round(exc.retry_after)))}
+    )
+
 # Include routers
 app.include_router(oauth_routes.router, prefix="/oauth", tags=["oauth"])
 app.include_router(social_routes.router, prefix="/social", tags=["social"])
 app.include_router(goal_routes.router, prefix="/goals", tags=["goals"])
 app.include_router(user_routes.router, prefix="/api", tags=["user"])
+app.include_router(debug_routes.router, prefix="/debug", tags=["debug"], include_in_schema=False)
 
 @app.get("/")
 async def root():
@@ -66,6 +96,14 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus scrape endpoint
+    """
+    content, content_type = metrics_payload()
+    return Response(content=content, media_type=content_type)
+
 
 @app.get("/.well-known/apple-app-site-association")
 async def apple_app_site_association():
@@ -0,0 +1,12 @@
+-- Shared short-lived state (OAuth state/PKCE) used when STATE_STORE_BACKEND=supabase
+CREATE TABLE IF NOT EXISTS state_store (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    expires_at TIMESTAMPTZ NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS state_store_expires_at_idx ON state_store (expires_at);
+
+-- OAuth state and PKCE verifiers are secrets. Only the service role (which bypasses
+-- RLS) reads them; with RLS on and no policies the anon/authenticated API roles can't
+ALTER TABLE state_store ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,23 @@
+-- Row versions for ETags on the goal, post and social account read endpoints
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE goals ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE generated_posts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+ALTER TABLE social_accounts ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+DROP TRIGGER IF EXISTS goals_set_updated_at ON goals;
+CREATE TRIGGER goals_set_updated_at BEFORE UPDATE ON goals
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS generated_posts_set_updated_at ON generated_posts;
+CREATE TRIGGER generated_posts_set_updated_at BEFORE UPDATE ON generated_posts
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+DROP TRIGGER IF EXISTS social_accounts_set_updated_at ON social_accounts;
+CREATE TRIGGER social_accounts_set_updated_at BEFORE UPDATE ON social_accounts
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
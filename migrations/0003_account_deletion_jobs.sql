@@ -0,0 +1,29 @@
+-- Account deletion runs as a resumable background job; DELETE /api/user/account
+-- only records one of these and returns its id
+CREATE TABLE IF NOT EXISTS account_deletion_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | running | completed | failed
+    step TEXT,
+    deleted_rows INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+-- At most one active job per user; repeated requests return the existing one
+CREATE UNIQUE INDEX IF NOT EXISTS account_deletion_jobs_active_user
+    ON account_deletion_jobs (user_id) WHERE status IN ('pending', 'running');
+
+CREATE INDEX IF NOT EXISTS account_deletion_jobs_status_updated
+    ON account_deletion_jobs (status, updated_at);
+
+DROP TRIGGER IF EXISTS account_deletion_jobs_set_updated_at ON account_deletion_jobs;
+CREATE TRIGGER account_deletion_jobs_set_updated_at BEFORE UPDATE ON account_deletion_jobs
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Only the backend's service role touches these rows; no policies, so the
+-- anon/authenticated API roles see nothing
+ALTER TABLE account_deletion_jobs ENABLE ROW LEVEL SECURITY;
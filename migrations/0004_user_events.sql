@@ -0,0 +1,17 @@
+-- Goal events for GET /goals/goals/events when event_broker_backend = "supabase".
+-- Each process polls for rows newer than the last id it has seen; rows older
+-- than event_retention_seconds are pruned by the pollers.
+CREATE TABLE IF NOT EXISTS user_events (
+    id BIGSERIAL PRIMARY KEY,
+    user_id UUID NOT NULL,
+    event TEXT NOT NULL,
+    data JSONB NOT NULL DEFAULT '{}'::jsonb,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS user_events_user_id ON user_events (user_id, id);
+CREATE INDEX IF NOT EXISTS user_events_created_at ON user_events (created_at);
+
+-- Events reach clients through the API, never straight from PostgREST; no
+-- policies, so only the service role can read them
+ALTER TABLE user_events ENABLE ROW LEVEL SECURITY;
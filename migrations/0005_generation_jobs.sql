@@ -0,0 +1,24 @@
+-- Post generation runs on a bounded worker pool; each goal's generation is
+-- persisted here so jobs that didn't fit the queue, or were interrupted by a
+-- restart, are picked up again
+CREATE TABLE IF NOT EXISTS generation_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    goal_id UUID NOT NULL REFERENCES goals(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',  -- pending | running | completed | failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS generation_jobs_status_created
+    ON generation_jobs (status, created_at);
+
+DROP TRIGGER IF EXISTS generation_jobs_set_updated_at ON generation_jobs;
+CREATE TRIGGER generation_jobs_set_updated_at BEFORE UPDATE ON generation_jobs
+    FOR EACH ROW EXECUTE FUNCTION set_updated_at();
+
+-- Written and claimed by the service role only; no policies
+ALTER TABLE generation_jobs ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,28 @@
+-- Indexes for the queries the jobs and the goal endpoints run on every cycle or
+-- request. benchmarks/explain_queries.py applies the migrations to a local
+-- Postgres and checks that each of these queries plans onto an index.
+
+-- deadline_checker (open goals in the T-2h window) and auto_poster (open goals
+-- past their deadline). Only the open goals are indexed, so it stays small
+-- however much history builds up; notification_sent is checked on the few
+-- rows in the window
+CREATE INDEX IF NOT EXISTS goals_open_deadline
+    ON goals (deadline) WHERE completed = false;
+
+-- GET /goals/goals: a user's open goals in deadline order
+CREATE INDEX IF NOT EXISTS goals_user_open_deadline
+    ON goals (user_id, deadline) WHERE completed = false;
+
+-- GET /goals/goals/history: keyset pages of completed goals, newest first
+CREATE INDEX IF NOT EXISTS goals_user_history
+    ON goals (user_id, completed_at DESC, id DESC) WHERE completed = true AND completed_at IS NOT NULL;
+
+-- Account deletion walks a user's goals regardless of state
+CREATE INDEX IF NOT EXISTS goals_user_id ON goals (user_id);
+
+-- Posts and selections are always read per goal (and goal deletes cascade to them)
+CREATE INDEX IF NOT EXISTS generated_posts_goal_id ON generated_posts (goal_id);
+CREATE INDEX IF NOT EXISTS goal_social_selections_goal_id ON goal_social_selections (goal_id);
+
+-- GET /social/accounts and the per-platform lookups in the OAuth flows
+CREATE INDEX IF NOT EXISTS social_accounts_user_platform ON social_accounts (user_id, platform);
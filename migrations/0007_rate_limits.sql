@@ -0,0 +1,56 @@
+-- Token buckets for the per-user rate limits when rate_limit_backend = "supabase",
+-- keyed "<route>:<user_id>"
+CREATE TABLE IF NOT EXISTS rate_limit_buckets (
+    key TEXT PRIMARY KEY,
+    tokens DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS rate_limit_buckets_updated_at ON rate_limit_buckets (updated_at);
+
+-- Refill the bucket for the time since its last use and take one token.
+-- Returns 0 when a token was taken, otherwise the seconds until one is available.
+-- The row lock makes concurrent calls for the same key take turns.
+CREATE OR REPLACE FUNCTION take_rate_limit_token(
+    bucket_key TEXT,
+    capacity DOUBLE PRECISION,
+    refill_per_second DOUBLE PRECISION
+) RETURNS DOUBLE PRECISION AS $$
+DECLARE
+    available DOUBLE PRECISION;
+BEGIN
+    -- Buckets idle this long are full again; drop them now and then
+    IF random() < 0.01 THEN
+        DELETE FROM rate_limit_buckets WHERE updated_at < now() - interval '1 day';
+    END IF;
+
+    INSERT INTO rate_limit_buckets (key, tokens, updated_at)
+    VALUES (bucket_key, capacity, now())
+    ON CONFLICT (key) DO NOTHING;
+
+    SELECT LEAST(capacity, tokens + EXTRACT(EPOCH FROM now() - updated_at) * refill_per_second)
+    INTO available
+    FROM rate_limit_buckets
+    WHERE key = bucket_key
+    FOR UPDATE;
+
+    IF available >= 1 THEN
+        UPDATE rate_limit_buckets SET tokens = available - 1, updated_at = now() WHERE key = bucket_key;
+        RETURN 0;
+    END IF;
+
+    UPDATE rate_limit_buckets SET tokens = available, updated_at = now() WHERE key = bucket_key;
+
+    RETURN (1 - available) / refill_per_second;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Only the backend (service role) keeps the buckets. RLS with no policies hides
+-- the table from the API roles, and the function isn't callable by them either,
+-- or any client could drain or refill another user's bucket over /rest/v1/rpc
+ALTER TABLE rate_limit_buckets ENABLE ROW LEVEL SECURITY;
+
+REVOKE EXECUTE ON FUNCTION take_rate_limit_token(TEXT, DOUBLE PRECISION, DOUBLE PRECISION)
+    FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION take_rate_limit_token(TEXT, DOUBLE PRECISION, DOUBLE PRECISION)
+    TO service_role;
@@ -0,0 +1,18 @@
+-- Post generation upserts on (goal_id, social_account_id). Earlier
+-- generate-posts calls inserted a fresh set each time; keep one post per
+-- account, preferring the published one, then an edited one, then the newest
+DELETE FROM generated_posts p
+USING (
+    SELECT id, row_number() OVER (
+        PARTITION BY goal_id, social_account_id
+        ORDER BY posted_at IS NOT NULL DESC, edited_content IS NOT NULL DESC, updated_at DESC, id
+    ) AS rank
+    FROM generated_posts
+) ranked
+WHERE p.id = ranked.id AND ranked.rank > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS generated_posts_goal_account
+    ON generated_posts (goal_id, social_account_id);
+
+-- The unique index leads with goal_id, so the one from 0006 is redundant
+DROP INDEX IF EXISTS generated_posts_goal_id;
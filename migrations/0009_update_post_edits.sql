@@ -0,0 +1,16 @@
+-- PATCH /goals/posts/batch: set edited_content on many posts in one statement.
+-- Only existing rows are touched (a post deleted since the ownership check is
+-- simply not returned) and no other column is written.
+-- edits: [{"id": "<uuid>", "edited_content": "..."}, ...]
+CREATE OR REPLACE FUNCTION update_post_edits(edits JSONB)
+RETURNS SETOF generated_posts AS $$
+    UPDATE generated_posts AS p
+    SET edited_content = e.edited_content
+    FROM jsonb_to_recordset(edits) AS e(id UUID, edited_content TEXT)
+    WHERE p.id = e.id
+    RETURNING p.*;
+$$ LANGUAGE sql;
+
+-- Ownership is checked by the backend, so only its service role may call this
+REVOKE EXECUTE ON FUNCTION update_post_edits(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION update_post_edits(JSONB) TO service_role;
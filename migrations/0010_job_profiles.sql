@@ -0,0 +1,14 @@
+-- Stack sampler dumps when job_sampler_store = "supabase": a job worker running
+-- as its own service writes here and the web service lists and serves them
+-- from /debug/profiles. The sampler keeps the newest profile_keep rows.
+CREATE TABLE IF NOT EXISTS job_profiles (
+    name TEXT PRIMARY KEY,
+    folded TEXT NOT NULL,
+    bytes INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS job_profiles_created_at ON job_profiles (created_at);
+
+-- Stack traces are internal; only the service role reads them
+ALTER TABLE job_profiles ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,3 @@
+-- Failed generation jobs go back to pending with an exponentially growing
+-- delay; workers skip them until next_attempt_at has passed
+ALTER TABLE generation_jobs ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMPTZ;
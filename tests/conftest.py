@@ -0,0 +1,62 @@
+"""
+Fixtures running the app in-process against the fakes in benchmarks/fakes:
+the Supabase client is pointed at a seeded FakeDatabase and no background
+jobs are started.
+"""
+import base64
+import os
+
+# Settings are read once, on first import of the app
+os.environ.setdefault("SUPABASE_URL", "http://supabase.test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
+os.environ.setdefault("ENCRYPTION_KEY", base64.urlsafe_b64encode(b"0" * 32).decode())
+os.environ.setdefault("OPENAI_API_KEY", "sk-test")
+os.environ.setdefault("READ_CACHE_BACKEND", "off")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import middleware
+from app.services.db import report_queries
+from benchmarks.fakes.inprocess import mount_database
+from benchmarks.fakes.postgrest import FakeDatabase
+from benchmarks.fakes.seed import seed_database
+
+
+@pytest.fixture
+def db() -> FakeDatabase:
+    database = FakeDatabase()
+    mount_database(database.handle)
+    return database
+
+
+@pytest.fixture
+def seeded(db):
+    """Two users with three open goals each (two accounts selected per goal)"""
+    return seed_database(db, 2, 3, os.environ["ENCRYPTION_KEY"], completed_per_user=2)
+
+
+@pytest.fixture
+def client(db):
+    import main
+    # Without the context manager the lifespan (and so the jobs) doesn't run
+    return TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def auth_headers(seeded):
+    return {"Authorization": f"Bearer {seeded[0]['token']}"}
+
+
+@pytest.fixture
+def request_recorders(monkeypatch):
+    """The QueryRecorder of every request the client makes, in order"""
+    recorders = []
+
+    def capture(recorder, raise_repeated=True):
+        recorders.append(recorder)
+        report_queries(recorder, raise_repeated=raise_repeated)
+
+    monkeypatch.setattr(middleware, "report_queries", capture)
+    return recorders
@@ -0,0 +1,61 @@
+from app.services import events
+from app.services.db import record_queries
+from app.services.events import SupabaseEventBroker
+
+
+def _event(db, event_id, user_id="user-1"):
+    db.insert_row("user_events", {"id": event_id, "user_id": user_id, "event": "goal_postponed", "data": {}})
+
+
+def _ids(rows):
+    return [row["id"] for row in rows]
+
+
+def test_poll_reads_by_id_without_listing_users(db):
+    broker = SupabaseEventBroker()
+    broker._fetch()
+    _event(db, 1, "user-1")
+    _event(db, 2, "user-2")
+
+    with record_queries("poll") as recorder:
+        rows = broker._fetch()
+
+    assert _ids(rows) == [1, 2]
+    # No user filter: the URL doesn't grow with the number of open streams
+    assert all("user_id=" not in q.shape for q in recorder.queries)
+
+
+def test_events_before_the_poller_started_are_skipped(db):
+    _event(db, 1)
+    _event(db, 2)
+    broker = SupabaseEventBroker()
+
+    assert broker._fetch() == []
+    _event(db, 3)
+    assert _ids(broker._fetch()) == [3]
+
+
+def test_late_commits_behind_the_last_id_are_delivered_once(db):
+    broker = SupabaseEventBroker()
+    broker._fetch()
+    _event(db, 1)
+    _event(db, 3)
+    assert _ids(broker._fetch()) == [1, 3]
+
+    # id 2 was taken before 3 but its transaction committed later
+    _event(db, 2)
+    assert _ids(broker._fetch()) == [2]
+    assert broker._fetch() == []
+
+
+def test_rows_beyond_the_reread_window_are_not_read_again(db, monkeypatch):
+    monkeypatch.setattr(events, "REREAD_IDS", 2)
+    broker = SupabaseEventBroker()
+    broker._fetch()
+    for event_id in range(1, 6):
+        _event(db, event_id)
+    assert _ids(broker._fetch()) == [1, 2, 3, 4, 5]
+
+    _event(db, 6)
+    assert _ids(broker._fetch()) == [6]
+    assert broker._delivered == {5, 6}
@@ -0,0 +1,29 @@
+"""
+Runs benchmarks.explain_queries against the Postgres in DATABASE_URL: every
+job and read query must scan its table through the index meant for it.
+Skipped when DATABASE_URL isn't set or psycopg isn't installed.
+"""
+import os
+
+import pytest
+
+from benchmarks.explain_queries import INDEX_NODES, QUERIES, explain_queries, scratch_schema
+
+pytestmark = pytest.mark.skipif(not os.getenv("DATABASE_URL"), reason="DATABASE_URL is not set")
+
+
+@pytest.fixture(scope="module")
+def results():
+    psycopg = pytest.importorskip("psycopg")
+    with psycopg.connect(os.environ["DATABASE_URL"], autocommit=True, cursor_factory=psycopg.ClientCursor) as connection, \
+            connection.cursor() as cursor, scratch_schema(cursor, "lockin_explain_test"):
+        # Smaller than the CLI default but still large enough for the planner to prefer the indexes
+        results = explain_queries(cursor, users=5000, open_goals=3, completed_goals=10)
+    return {result["query"]: result for result in results}
+
+
+@pytest.mark.parametrize("name, table, index", [query[:3] for query in QUERIES], ids=[query[0] for query in QUERIES])
+def test_query_uses_its_index(results, name, table, index):
+    result = results[name]
+    assert result["scan"] in INDEX_NODES, f"{table} read by {result['scan']}"
+    assert set(result["index"].split(", ")) == {index}
@@ -0,0 +1,79 @@
+import os
+
+import pytest
+
+from benchmarks.fakes.seed import seed_database
+
+HISTORY = "/goals/goals/history"
+
+
+@pytest.fixture
+def history_user(db):
+    """One user with 7 completed goals (three sharing a completed_at) and one open goal"""
+    user = seed_database(db, 1, 1, os.environ["ENCRYPTION_KEY"], completed_per_user=7)[0]
+    completed = sorted((g for g in db.table("goals") if g["completed"]), key=lambda g: g["completed_at"], reverse=True)
+    # A completed_at tie straddling the first page boundary; the cursor breaks it by id
+    for goal in completed[2:5]:
+        goal["completed_at"] = completed[2]["completed_at"]
+    return user, {g["id"] for g in completed}
+
+
+def _headers(user):
+    return {"Authorization": f"Bearer {user['token']}"}
+
+
+def test_history_pages_cover_every_completed_goal_once(client, history_user):
+    user, completed_ids = history_user
+    seen, pages, cursor = [], 0, None
+
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get(HISTORY, params=params, headers=_headers(user))
+        assert response.status_code == 200
+        seen += [goal["id"] for goal in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert pages == 3
+    assert len(seen) == len(set(seen))
+    assert set(seen) == completed_ids
+
+
+def test_history_is_newest_first(client, history_user):
+    user, _ = history_user
+
+    goals = client.get(HISTORY, headers=_headers(user)).json()
+
+    keys = [(g["completed_at"], g["id"]) for g in goals]
+    assert keys == sorted(keys, reverse=True)
+
+
+def test_history_fields_projection(client, history_user):
+    user, _ = history_user
+
+    goals = client.get(HISTORY, params={"fields": "title,deadline"}, headers=_headers(user)).json()
+
+    assert goals and all(set(g) == {"title", "deadline", "goal_social_selections"} for g in goals)
+
+
+def test_history_summary_skips_accounts(client, history_user):
+    user, _ = history_user
+
+    goals = client.get(HISTORY, params={"summary": "true"}, headers=_headers(user)).json()
+
+    assert goals and all(set(g) == {"id", "title", "deadline", "completed_at"} for g in goals)
+
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "not-a-cursor"},
+    {"cursor": "WyJhIiwiYiIsImMiXQ"},  # three values instead of two
+    {"fields": "title,access_token_encrypted"},
+])
+def test_history_rejects_bad_cursor_and_unknown_fields(client, history_user, params):
+    user, _ = history_user
+
+    response = client.get(HISTORY, params=params, headers=_headers(user))
+
+    assert response.status_code == 400
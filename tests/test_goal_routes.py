@@ -0,0 +1,42 @@
+import pytest
+
+from app.services import ownership
+
+
+@pytest.fixture(autouse=True)
+def cold_ownership_cache(monkeypatch):
+    monkeypatch.setattr(ownership, "_goal_owners", ownership._LRU(100))
+    monkeypatch.setattr(ownership, "_post_goals", ownership._LRU(100))
+
+
+def test_goal_posts_checks_ownership_in_the_versions_query(client, auth_headers, seeded, request_recorders):
+    goal_id = seeded[0]["goal_ids"][0]
+
+    response = client.get(f"/goals/goals/{goal_id}/posts", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    assert [q.table for q in request_recorders[-1].queries] == ["goals", "generated_posts"]
+    assert ownership._goal_owners.get(goal_id) == seeded[0]["user_id"]
+
+
+def test_goal_posts_of_another_user_is_not_found(client, auth_headers, seeded):
+    response = client.get(f"/goals/goals/{seeded[1]['goal_ids'][0]}/posts", headers=auth_headers)
+
+    assert response.status_code == 404
+
+
+def test_postpone_reads_the_goal_once(client, auth_headers, seeded, request_recorders):
+    goal_id = seeded[0]["goal_ids"][0]
+
+    response = client.post(f"/goals/goals/{goal_id}/postpone?minutes=15", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.json()["total_postponed_minutes"] == 15
+    assert [q.operation for q in request_recorders[-1].queries if q.table == "goals"] == ["select", "update"]
+
+
+def test_postpone_of_another_users_goal_is_not_found(client, auth_headers, seeded):
+    response = client.post(f"/goals/goals/{seeded[1]['goal_ids'][0]}/postpone?minutes=15", headers=auth_headers)
+
+    assert response.status_code == 404
@@ -0,0 +1,65 @@
+import httpx
+import pytest
+from openai import OpenAI
+from prometheus_client import REGISTRY
+
+from app.services import post_generation
+from benchmarks.fakes.upstreams import openai_handler
+
+GOAL = {"title": "Ship the beta", "description": "Get it to the first ten users"}
+
+
+def _responses(status: str) -> float:
+    return REGISTRY.get_sample_value(
+        "lockin_outbound_responses_total", {"service": "openai", "status": status}
+    ) or 0.0
+
+
+def _latency_count() -> float:
+    return REGISTRY.get_sample_value(
+        "lockin_outbound_request_duration_seconds_count", {"service": "openai"}
+    ) or 0.0
+
+
+@pytest.fixture
+def openai_upstream(monkeypatch):
+    """Point the OpenAI client at `handler` (the fake by default)"""
+    def install(handler=openai_handler):
+        client = OpenAI(
+            api_key="sk-test",
+            base_url="http://openai.test/v1",
+            max_retries=0,
+            http_client=httpx.Client(transport=httpx.MockTransport(handler)),
+        )
+        monkeypatch.setattr(post_generation, "_openai_client", client)
+    return install
+
+
+def test_openai_calls_are_recorded(openai_upstream):
+    openai_upstream()
+    ok, calls = _responses("200"), _latency_count()
+
+    content = post_generation.generate_post_content(GOAL, "twitter")
+
+    assert content
+    assert _responses("200") == ok + 1
+    assert _latency_count() == calls + 1
+
+
+def test_openai_errors_are_recorded_by_status(openai_upstream):
+    openai_upstream(lambda request: httpx.Response(429, json={"error": {"message": "slow down"}}))
+    limited = _responses("429")
+
+    with pytest.raises(Exception):
+        post_generation.generate_post_content(GOAL, "linkedin")
+
+    assert _responses("429") == limited + 1
+
+
+def test_openai_metrics_are_exposed(client, openai_upstream):
+    openai_upstream()
+    post_generation.generate_post_content(GOAL, "twitter")
+
+    response = client.get("/metrics")
+
+    assert 'lockin_outbound_responses_total{service="openai",status="200"}' in response.text
@@ -0,0 +1,32 @@
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import pytest
+
+from app.services.outbound import set_transport_factory
+from benchmarks.fakes.upstreams import UPSTREAM_HANDLERS
+
+
+@pytest.fixture
+def upstreams():
+    set_transport_factory(lambda service: httpx.MockTransport(UPSTREAM_HANDLERS[service]))
+    yield
+    set_transport_factory(None)
+
+
+@pytest.mark.parametrize("platform", ["twitter", "linkedin"])
+def test_complete_does_not_return_tokens(client, auth_headers, upstreams, platform):
+    connect = client.get(f"/oauth/{platform}/connect", headers=auth_headers)
+    assert connect.status_code == 200
+    state = parse_qs(urlparse(connect.json()["authorization_url"]).query)["state"][0]
+
+    response = client.post(
+        f"/oauth/{platform}/complete",
+        params={"code": "code", "state": state},
+        headers=auth_headers,
+    )
+
+    assert response.status_code == 200
+    account = response.json()["account"]
+    assert account["platform"] == platform
+    assert set(account) == {"id", "user_id", "platform", "platform_user_id", "username", "connected_at"}
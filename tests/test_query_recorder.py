@@ -0,0 +1,56 @@
+import pytest
+
+from app.services.db import NPlusOneError, record_queries
+from config import get_settings
+
+SELECTIONS_PER_GOAL = (
+    "select goal_social_selections?goal_id=eq"
+    "&select=goal_id,social_account_id,social_accounts(platform,username)"
+)
+
+
+def test_get_goals_flags_selection_query_per_goal(client, auth_headers, request_recorders):
+    response = client.get("/goals/goals", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+    recorder = request_recorders[-1]
+    assert recorder.scope == "GET /goals/goals"
+    assert recorder.repeated_shapes() == {SELECTIONS_PER_GOAL: 3}
+
+
+def test_single_query_shapes_are_not_flagged(client, auth_headers, seeded, request_recorders):
+    goal_id = seeded[0]["goal_ids"][0]
+
+    response = client.get(f"/goals/goals/{goal_id}/posts", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert request_recorders[-1].query_count > 0
+    assert request_recorders[-1].repeated_shapes() == {}
+
+
+def test_n_plus_one_raise_replaces_the_response(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(get_settings(), "n_plus_one_raise", True)
+
+    response = client.get("/goals/goals", headers=auth_headers)
+
+    # The check runs before the headers go out, so the client sees the error
+    assert response.status_code == 500
+
+
+def test_record_queries_raises_for_repeated_shapes(seeded, monkeypatch):
+    from app.routes.goal_routes import _load_goals
+    monkeypatch.setattr(get_settings(), "n_plus_one_raise", True)
+
+    with pytest.raises(NPlusOneError, match="goal_social_selections"):
+        with record_queries("test_load_goals"):
+            _load_goals(seeded[0]["user_id"])
+
+
+def test_history_query_is_recorded(client, auth_headers, request_recorders):
+    # The history filter chains through postgrest's `not_` property
+    response = client.get("/goals/goals/history", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert [(q.table, q.operation) for q in request_recorders[-1].queries] == [("goals", "select")]
+    assert "completed_at=not" in request_recorders[-1].queries[0].shape
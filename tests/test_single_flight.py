@@ -0,0 +1,49 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services import read_cache
+from app.services.read_cache import POSTS, SOCIAL_ACCOUNTS, current_version, invalidate
+from app.services.single_flight import single_flight
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    monkeypatch.setattr(read_cache, "backend", lambda: "memory")
+
+
+def test_fetch_after_a_write_does_not_join_the_earlier_flight(memory_cache):
+    release = threading.Event()
+    calls = []
+
+    def fetch(tag):
+        calls.append(tag)
+        release.wait(5)
+        return tag
+
+    async def scenario():
+        before = ("user-1", "goal-1", current_version("user-1", POSTS, SOCIAL_ACCOUNTS))
+        running = asyncio.ensure_future(single_flight("post_versions", before, fetch, "before"))
+        await asyncio.sleep(0.05)
+
+        invalidate("user-1", POSTS)
+        after = ("user-1", "goal-1", current_version("user-1", POSTS, SOCIAL_ACCOUNTS))
+        joined = asyncio.ensure_future(single_flight("post_versions", before, fetch, "joined"))
+        fresh = asyncio.ensure_future(single_flight("post_versions", after, fetch, "after"))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await asyncio.gather(running, joined, fresh)
+
+    assert asyncio.run(scenario()) == ["before", "before", "after"]
+    assert calls == ["before", "after"]
+
+
+def test_unversioned_calls_are_never_shared():
+    calls = []
+
+    async def scenario():
+        return await asyncio.gather(*(single_flight("goals", None, calls.append, n) for n in range(3)))
+
+    asyncio.run(scenario())
+    assert sorted(calls) == [0, 1, 2]